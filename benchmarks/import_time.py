@@ -0,0 +1,91 @@
+"""
+Import-time benchmark for the CLI and API entry points.
+
+Each target is imported in a fresh interpreter several times; the median
+wall time is compared against the stored baseline, and the run fails if a
+target got slower than the allowed threshold or eagerly imports a heavy
+dependency that should only load when a command needs it.
+
+Usage:
+    python benchmarks/import_time.py              # check against baseline
+    python benchmarks/import_time.py --update     # record a new baseline
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_FILE = Path(__file__).resolve().parent / "baselines" / "import_time.json"
+
+# Modules that must not be imported just by loading an entry point.
+HEAVY_MODULES = ["pandas", "playwright", "fake_useragent", "dns", "rich", "pyarrow"]
+
+TARGETS = {
+    "src.main": HEAVY_MODULES,
+    "src.api": HEAVY_MODULES,
+    "src.pipeline": HEAVY_MODULES,
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "modules": sorted({{m.split('.')[0] for m in sys.modules}})}}))
+"""
+
+def measure(target: str, runs: int) -> dict:
+    samples = []
+    loaded = set()
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(target=target)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+            env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        )
+        data = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(data["ms"])
+        loaded.update(data["modules"])
+    return {"median_ms": statistics.median(samples), "loaded": loaded}
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per target")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--update", action="store_true", help="Write measured medians as the new baseline")
+    args = parser.parse_args()
+
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    measured = {}
+    failed = False
+
+    for target, forbidden in TARGETS.items():
+        result = measure(target, args.runs)
+        measured[target] = round(result["median_ms"], 1)
+        leaked = sorted(set(forbidden) & result["loaded"])
+
+        status = "ok"
+        reference = baseline.get(target)
+        if reference and result["median_ms"] > reference * (1 + args.threshold):
+            status = f"REGRESSION (baseline {reference:.1f} ms)"
+            failed = True
+        if leaked:
+            status = f"EAGER IMPORT: {', '.join(leaked)}"
+            failed = True
+
+        print(f"{target:<16} {result['median_ms']:8.1f} ms   {status}")
+
+    if args.update:
+        BASELINE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE_FILE.write_text(json.dumps(measured, indent=2) + "\n")
+        print(f"Baseline written to {BASELINE_FILE}")
+        return 0
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
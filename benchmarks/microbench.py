@@ -0,0 +1,221 @@
+"""
+Microbenchmarks for the CPU-bound hot paths: email extraction, syntax
+validation, pattern/alias generation and export flattening.
+
+Each case runs on a fixed fixture (the bundled debug_dump.html, seeded
+synthetic address lists, and pathological inputs for the regexes). Timing
+follows timeit: the loop count is calibrated so a repeat takes at least
+--min-time, and the best of --repeat repeats gives ops/sec. Allocations are
+measured separately with tracemalloc (peak KiB during one call, and the
+memory blocks still held when it returns, i.e. mostly its result), so
+tracing never skews the timings.
+
+The run fails if a case got slower than the allowed threshold, or its
+allocations grew past it, compared with the stored baseline.
+
+Usage:
+    python benchmarks/microbench.py               # check against baseline
+    python benchmarks/microbench.py -k extract    # only cases matching a substring
+    python benchmarks/microbench.py --update      # record a new baseline
+"""
+import argparse
+import json
+import random
+import string
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_FILE = Path(__file__).resolve().parent / "baselines" / "microbench.json"
+
+sys.path.insert(0, str(ROOT))
+
+from src.core.records import LeadRecord # noqa: E402
+from src.modules.enrichment.extractor import extract_emails_from_text # noqa: E402
+from src.modules.enrichment.patterns import generate_common_aliases, generate_name_patterns # noqa: E402
+from src.modules.export.exporter import flatten_lead_data # noqa: E402
+from src.modules.verification.syntax import validate_email_syntax # noqa: E402
+
+SEED = 1234
+
+# Fixtures
+
+def _random_local(rng: random.Random) -> str:
+    first = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+    last = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+    return rng.choice([first, f"{first}.{last}", f"{first[0]}{last}", f"{first}_{last}", f"{first}+news"])
+
+def synthetic_emails(count: int) -> List[str]:
+    """Mostly valid addresses with a realistic share of malformed ones."""
+    rng = random.Random(SEED)
+    domains = ["example.com", "empresa.com.br", "mail.co.uk", "startup.io", "loja-online.com.br"]
+    emails = []
+    for _ in range(count):
+        email = f"{_random_local(rng)}@{rng.choice(domains)}"
+        roll = rng.random()
+        if roll < 0.05:
+            email = email.replace("@", "@@")
+        elif roll < 0.10:
+            email = email.rsplit(".", 1)[0] # No TLD
+        elif roll < 0.12:
+            email = email.replace(".", "..", 1)
+        emails.append(email)
+    return emails
+
+def synthetic_page(count: int) -> str:
+    """Plain-text page body with addresses scattered through filler prose."""
+    rng = random.Random(SEED)
+    words = ["contato", "equipe", "sobre", "vendas", "suporte", "the", "team", "reach", "us", "at", "or", "call"]
+    chunks = []
+    for email in synthetic_emails(count):
+        chunks.append(" ".join(rng.choices(words, k=rng.randint(5, 30))))
+        chunks.append(rng.choice([email, f"<{email}>", f"({email}).", f"mailto:{email}"]))
+    return " ".join(chunks)
+
+def synthetic_leads(count: int) -> List[dict]:
+    leads = []
+    for i, email in enumerate(synthetic_emails(count)):
+        leads.append({
+            "email": email,
+            "domain": email.rpartition("@")[2],
+            "found_at": f"2026-01-01T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}.{i * 997 % 1_000_000:06d}",
+            "status": ["valid", "invalid", "catch_all", "risky"][i % 4],
+            "verification": {"syntax": True, "mx": True, "smtp": ["valid", "invalid", "catch_all", "unknown"][i % 4]},
+            "provenance": {"originals": [email], "sources": {"scraper": "mailto", "patterns": "alias"}},
+        })
+    return leads
+
+NAMES = [
+    "João Silva", "Maria Conceição de Souza", "Ana", "José Carlos Pereira", "Françoise Dupont",
+    "Zoë O'Brien", "Renée Müller-Schmidt", "Li Wei", "Ôscar Ñúñez", "Mary-Jane Watson",
+]
+
+# Pathological inputs: long runs that make the regexes backtrack or rescan.
+PATHOLOGICAL_EXTRACT = {
+    "no_at": "a" * 5000, # Every start position scans the whole run looking for '@'
+    "many_ats": "a@" * 2500, # '@' without a dotted domain after it
+    "dotless_domain": "x@" + "a-" * 2500, # Domain part never reaches a '.'
+}
+PATHOLOGICAL_SYNTAX = [
+    "a" * 64 + "@" + "b" * 180, # Too long a label, no dot
+    "x@" + "a." * 120 + "1", # Many labels, fails on the numeric TLD
+    "a." * 60 + "@example.com", # Trailing dot in the dot-atom
+    '"' + "\\a" * 100 + "@example.com", # Unterminated quoted string
+]
+
+def build_cases() -> Dict[str, Callable[[], object]]:
+    html = (ROOT / "debug_dump.html").read_text(encoding="utf-8", errors="ignore")
+    page = synthetic_page(2000)
+    emails = synthetic_emails(10000)
+    leads = synthetic_leads(10000)
+    records = [LeadRecord.from_dict(lead) for lead in leads]
+
+    cases: Dict[str, Callable[[], object]] = {
+        "extract.debug_dump_html": lambda: extract_emails_from_text(html),
+        "extract.synthetic_page": lambda: extract_emails_from_text(page),
+        "syntax.10k_addresses": lambda: [validate_email_syntax(email) for email in emails],
+        "syntax.pathological": lambda: [validate_email_syntax(email) for email in PATHOLOGICAL_SYNTAX],
+        "patterns.names": lambda: [generate_name_patterns(name, "empresa.com.br") for name in NAMES],
+        "patterns.aliases": lambda: generate_common_aliases("empresa.com.br"),
+        "flatten.10k_dicts": lambda: flatten_lead_data(leads),
+        "flatten.10k_records": lambda: flatten_lead_data(records),
+    }
+    for label, text in PATHOLOGICAL_EXTRACT.items():
+        cases[f"extract.pathological_{label}"] = lambda text=text: extract_emails_from_text(text)
+    return cases
+
+# Measurement
+
+def time_case(func: Callable[[], object], min_time: float, repeat: int) -> float:
+    """Best-of-`repeat` seconds per call, with loops calibrated to last at least `min_time`."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9) * 1.2))
+
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+def allocations(func: Callable[[], object]) -> Tuple[float, int]:
+    """Peak KiB traced during one call, and the number of memory blocks still held when it returns."""
+    func() # Warm up caches (regex compilation, interning) outside the measurement
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    after, before = after.filter_traces(ignore), before.filter_traces(ignore)
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    return peak / 1024, blocks
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--filter", default="", help="Only run cases whose name contains this substring")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timing repeat")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats per case (best is kept)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown/allocation growth vs baseline (0.25 = 25%%)")
+    parser.add_argument("--update", action="store_true", help="Write the measured numbers as the new baseline")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON instead of a table")
+    args = parser.parse_args()
+
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    measured = {}
+    failed = False
+
+    cases = {name: func for name, func in build_cases().items() if args.filter in name}
+    if not args.json:
+        print(f"{'case':<38} {'ops/sec':>12} {'peak KiB':>10} {'blocks':>8}   status")
+
+    for name, func in cases.items():
+        seconds = time_case(func, args.min_time, args.repeat)
+        peak_kib, blocks = allocations(func)
+        result = {"ops_per_sec": round(1 / seconds, 1), "peak_kib": round(peak_kib, 1), "blocks": blocks}
+        measured[name] = result
+
+        problems = []
+        reference = baseline.get(name)
+        if reference:
+            if result["ops_per_sec"] < reference["ops_per_sec"] * (1 - args.threshold):
+                problems.append(f"SLOWER (baseline {reference['ops_per_sec']:.1f} ops/sec)")
+            if result["peak_kib"] > reference["peak_kib"] * (1 + args.threshold) + 1:
+                problems.append(f"MORE MEMORY (baseline {reference['peak_kib']:.1f} KiB)")
+        if problems:
+            failed = True
+
+        if not args.json:
+            status = "; ".join(problems) or ("ok" if reference else "no baseline")
+            print(f"{name:<38} {result['ops_per_sec']:>12,.1f} {result['peak_kib']:>10,.1f} {blocks:>8}   {status}")
+
+    if args.json:
+        print(json.dumps(measured, indent=2))
+
+    if args.update:
+        # Keep baselines of cases that were filtered out of this run
+        BASELINE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE_FILE.write_text(json.dumps({**baseline, **measured}, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {BASELINE_FILE}")
+        return 0
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -38,19 +38,17 @@ async def raw_debug(domain):
     from playwright.async_api import async_playwright
     
     from src.utils.browser import browser_utils # Import
+    from src.utils.request_policy import request_policy
     
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
+        browser = await p.chromium.launch(headless=True, args=request_policy.launch_args())
         # page = await browser.new_page() # OLD
         context = await browser_utils.new_safe_context(browser) # NEW
         
-        # Block resources for performance (LIKE SCRAPER.PY)
-        await context.route("**/*", lambda route: route.abort() 
-            if route.request.resource_type in ["image", "media", "stylesheet", "font"] 
-            else route.continue_()
-        )
-        
         page = await context.new_page()
+        
+        # Block resources for performance (LIKE SCRAPER.PY)
+        request_stats = await request_policy.apply(page, exclude_domain=domain)
         try:
             await page.goto(f"https://{domain}", timeout=30000, wait_until="domcontentloaded")
             
@@ -60,6 +58,9 @@ async def raw_debug(domain):
                 f.write(content)
             print("Saved debug_dump.html")
             
+            allowed, blocked = await request_stats.collect()
+            print(f"Requests: {allowed} allowed, {blocked} blocked")
+            
             # 2. Try to find mailto
             mailtos = await page.evaluate("() => Array.from(document.querySelectorAll('a[href^=\"mailto:\"]')).map(a => a.href)")
             print(f"Mailtos found: {mailtos}")
@@ -25,7 +25,7 @@ document.addEventListener('DOMContentLoaded', async () => {
                 const response = await fetch('http://localhost:8000/api/scrape', {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ domain: domain })
+                    body: JSON.stringify({ domain: domain, profile: 'fast' })
                 });
 
                 if (!response.ok) throw new Error('Falha na requisição API');
@@ -1,3 +1,4 @@
+import argparse
 import sys
 import asyncio
 import uvicorn
@@ -8,8 +9,34 @@ if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
 if __name__ == "__main__":
-    # We run Uvicorn programmatically. 
-    # Note: 'reload=True' might reset the policy in workers depending on how they spawn.
-    # If this fails with reload, we will try with reload=False.
-    print("--- Starting LeadScraper API with Windows Fix ---")
-    uvicorn.run("src.api:app", host="127.0.0.1", port=8000, reload=True)
+    parser = argparse.ArgumentParser(description="Run the LeadScraper API")
+    parser.add_argument("--production", action="store_true",
+                        help="Multiple workers, no auto-reload, bounded connections (settings: API_*)")
+    args = parser.parse_args()
+
+    if args.production:
+        from src.config.settings import settings
+
+        # Each worker runs its own browser and admission controller, so the host-wide
+        # limit is API_WORKERS * API_MAX_CONCURRENT pipelines. Connections past what
+        # the admission queue can hold (plus headroom for /health) get a 503 from uvicorn
+        # before any work is done.
+        per_worker_connections = settings.API_MAX_CONCURRENT + settings.API_MAX_QUEUE + 8
+        print(f"--- Starting LeadScraper API (production, {settings.API_WORKERS} workers) ---")
+        uvicorn.run(
+            "src.api:app",
+            host=settings.API_HOST,
+            port=settings.API_PORT,
+            workers=settings.API_WORKERS,
+            reload=False,
+            limit_concurrency=per_worker_connections,
+            backlog=256,
+            timeout_keep_alive=5,
+            access_log=False,
+        )
+    else:
+        # We run Uvicorn programmatically. 
+        # Note: 'reload=True' might reset the policy in workers depending on how they spawn.
+        # If this fails with reload, we will try with reload=False.
+        print("--- Starting LeadScraper API with Windows Fix ---")
+        uvicorn.run("src.api:app", host="127.0.0.1", port=8000, reload=True)
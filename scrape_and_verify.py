@@ -8,65 +8,35 @@ from datetime import datetime
 # Add src to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
 
-from src.modules.discovery.scraper import DomainScraper
-from src.modules.verification.syntax import extract_domain, validate_email_syntax
+from src.modules.discovery.sources import run_discovery
+from src.modules.enrichment.normalize import CandidatePool
+from src.modules.verification.syntax import extract_domain
 from src.modules.verification.mx import check_mx_record
 from src.modules.verification.smtp import verify_email_smtp
-from src.modules.enrichment.patterns import generate_common_aliases, generate_name_patterns
+from src.utils.browser_pool import close_browser_supervisors
 
 # Configure simple logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-async def process_domain(domain: str, input_name: str = None, output_file: str = "leads.json"):
+async def process_domain(domain: str, input_name: str = None, output_file: str = "leads.json", fresh: bool = False):
     logger.info(f"Starting process for domain: {domain}")
     
-    found_emails = set()
+    candidates = CandidatePool()
     
-    # 1. Direct Scrape
-    scraper = DomainScraper()
-    scraped_emails = await scraper.scrape_domain(domain)
-    found_emails.update(scraped_emails)
-    
-    # 2. Google Search (Dorking)
-    from src.modules.discovery.google_search import GoogleSearcher
-    
-    logger.info("Starting Google Search (Dorking)...")
-    google_searcher = GoogleSearcher()
-    dorks = [
-        f'site:linkedin.com "{domain}" "email"',
-        f'site:{domain} "email"',
-        f'"{domain}" "contact" email'
-    ]
-    google_emails = await google_searcher.search(dorks)
-    found_emails.update(google_emails)
-    
-    target_emails_count = len(found_emails)
-    logger.info(f"Total found via Scraping + Google: {target_emails_count}")
+    # 1. Discovery (scraper, Google dorks and pattern prediction run concurrently)
+    reports = await run_discovery(domain, input_name)
+    for report in reports:
+        for raw_email, kind in report.emails.items():
+            candidates.add(raw_email, report.name, kind)
 
-    # 3. Predict (Enrichment)
-    # Only if we have very fews results or explicitly requested, 
-    # but for this tool we always want to try predicting common aliases.
-    predicted_emails = []
-    
-    if input_name:
-        logger.info(f"Generating patterns for name: {input_name}")
-        predicted_emails.extend(generate_name_patterns(input_name, domain))
-        
-    # Add common aliases regardless (optional, but good for "LeadScraper")
-    predicted_emails.extend(generate_common_aliases(domain))
-    
-    # Verify predictions are syntactically valid (just in case)
-    for email in predicted_emails:
-        if validate_email_syntax(email):
-            found_emails.add(email)
-            
-    logger.info(f"Total candidates to verify: {len(found_emails)}")
+    logger.info(f"Total candidates to verify: {len(candidates)} ({candidates.duplicates} duplicate spellings merged)")
     
     results = []
     
-    # 3. Verify
-    for email in found_emails:
+    # 2. Verify
+    for candidate in candidates:
+        email = candidate.email
         lead_data = {
             "email": email,
             "source_domain": domain,
@@ -76,18 +46,19 @@ async def process_domain(domain: str, input_name: str = None, output_file: str =
                 "syntax": True,
                 "mx": False,
                 "smtp": "unchecked"
-            }
+            },
+            "provenance": candidate.provenance()
         }
         
         # MX Check
         email_domain = extract_domain(email)
         if email_domain:
-            mx_valid = await check_mx_record(email_domain)
+            mx_valid = await check_mx_record(email_domain, fresh=fresh)
             lead_data["verification"]["mx"] = mx_valid
             
             if mx_valid:
                 # SMTP Check
-                smtp_status = await verify_email_smtp(email)
+                smtp_status = await verify_email_smtp(email, fresh=fresh)
                 lead_data["verification"]["smtp"] = smtp_status
                 
                 # Final Status Determination
@@ -107,7 +78,7 @@ async def process_domain(domain: str, input_name: str = None, output_file: str =
         results.append(lead_data)
         logger.info(f"Processed: {email} -> {lead_data['status']} (SMTP: {lead_data['verification']['smtp']})")
 
-    # 4. Save
+    # 3. Save
     try:
         existing_data = []
         if os.path.exists(output_file):
@@ -142,7 +113,14 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Scrape and Verify Emails")
     parser.add_argument("domain", help="Target domain")
     parser.add_argument("--name", help="Person name for pattern prediction", default=None)
+    parser.add_argument("--fresh", action="store_true", help="Ignore cached verdicts and probe again")
     
     args = parser.parse_args()
     
-    asyncio.run(process_domain(args.domain, args.name))
+    async def main():
+        try:
+            await process_domain(args.domain, args.name, fresh=args.fresh)
+        finally:
+            await close_browser_supervisors()
+    
+    asyncio.run(main())
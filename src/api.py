@@ -1,16 +1,28 @@
-from fastapi import FastAPI, HTTPException, Body
+from fastapi import FastAPI, HTTPException, Body, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
+import json
 import logging
 import asyncio
 import sys
+import time
 
 # FIX: Force ProactorEventLoop on Windows for Playwright compatibility
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
+from src.config.settings import settings
+from src.core.admission import admission
+from src.core.deadline import Deadline
+from src.core.loop_monitor import loop_monitor
+from src.core.offload import offload_log_handlers, shutdown_offload
+from src.core.exceptions import Overloaded
+from src.modules.discovery.preflight import normalize_domain, triage_domains
 from src.pipeline import run_lead_pipeline
+from src.config.profiles import PipelineProfile, get_profile
+from src.utils.browser_pool import close_browser_supervisors, get_browser_supervisor
 
 # Logging Setup
 logger = logging.getLogger("api")
@@ -29,9 +41,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    """Fast 429 instead of letting the request time out in a pile-up."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc), "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 class ScrapeRequest(BaseModel):
     domain: str
     name: Optional[str] = None
+    timeout: Optional[float] = None # Seconds; defaults to settings.REQUEST_DEADLINE
+    refresh: bool = False # Incremental re-scan of a previously processed domain
+    profile: Optional[str] = None # fast, standard or thorough; defaults to settings.PIPELINE_PROFILE
+    fresh: bool = False # Ignore cached verdicts and probe again
+
+class BatchScrapeRequest(BaseModel):
+    domains: List[str]
+    timeout: Optional[float] = None # Seconds per domain; defaults to settings.REQUEST_DEADLINE
+    refresh: bool = False
+    profile: Optional[str] = None
+    fresh: bool = False
+
+def _resolve_profile(name: Optional[str]) -> PipelineProfile:
+    try:
+        return get_profile(name)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
 class LeadResult(BaseModel):
     email: str
@@ -39,21 +77,184 @@ class LeadResult(BaseModel):
     status: str
     verification: dict
     found_at: str
+    provenance: Optional[dict] = None
+
+async def _cancel_on_disconnect(http_request: Request, task: asyncio.Task) -> bool:
+    """
+    Polls the connection and cancels the pipeline task if the client goes away.
+    Returns True if it was the one that cancelled the task.
+    """
+    while not task.done():
+        if await http_request.is_disconnected():
+            logger.info("Client disconnected, cancelling in-flight work")
+            task.cancel()
+            return True
+        await asyncio.sleep(settings.DISCONNECT_POLL_INTERVAL)
+    return False
 
 @app.post("/api/scrape", response_model=List[LeadResult])
-async def scrape_domain(request: ScrapeRequest):
+async def scrape_domain(request: ScrapeRequest, http_request: Request, response: Response):
     """
     Endpoint to scrape and verify leads for a specific domain.
+    Runs under a request-scoped deadline; if it passes, the leads verified so far
+    are returned with an `X-Partial-Result: true` header.
+    Admission-controlled: when the server is saturated the request waits in a
+    bounded queue (`X-Queue-Wait-Ms` reports how long) or gets a 429 with Retry-After.
     """
     logger.info(f"Received scrape request for: {request.domain}")
+    profile = _resolve_profile(request.profile)
+    async with admission.slot() as waited:
+        response.headers["X-Queue-Wait-Ms"] = str(round(waited * 1000))
+        if waited and await http_request.is_disconnected():
+            logger.info(f"Request for {request.domain} abandoned while queued")
+            return Response(status_code=499)
+        return await _run_scrape(request, http_request, response, profile)
+
+async def _run_scrape(request: ScrapeRequest, http_request: Request, response: Response, profile: PipelineProfile):
+    # The deadline starts once admitted, so queueing doesn't eat into the scrape budget
+    deadline = Deadline(request.timeout or settings.REQUEST_DEADLINE)
+    task = asyncio.create_task(run_lead_pipeline(
+        request.domain, request.name, deadline=deadline, refresh=request.refresh, profile=profile,
+        fresh=request.fresh
+    ))
+    watcher = asyncio.create_task(_cancel_on_disconnect(http_request, task))
     try:
-        results = await run_lead_pipeline(request.domain, request.name)
+        # Stages stop on their own at the deadline; the grace period only
+        # catches work that ignores it.
+        results = await asyncio.wait_for(task, timeout=deadline.remaining() + settings.REQUEST_DEADLINE_GRACE)
+        if deadline.expired:
+            response.headers["X-Partial-Result"] = "true"
         if not results:
              return []
         return results
+    except asyncio.TimeoutError:
+        logger.error(f"Pipeline for {request.domain} ignored its deadline, cancelled")
+        raise HTTPException(status_code=504, detail="Deadline exceeded")
+    except asyncio.CancelledError:
+        if watcher.done() and not watcher.cancelled() and watcher.result():
+            # Client is gone; nobody is listening for a response
+            logger.info(f"Request for {request.domain} abandoned by client")
+            return Response(status_code=499)
+        task.cancel()
+        raise
     except Exception as e:
         logger.error(f"Error processing {request.domain}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        watcher.cancel()
+
+def _ndjson(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+async def _scrape_batch_domain(
+    domain: str, inputs: List[str], request: BatchScrapeRequest, fan_out: asyncio.Semaphore
+) -> dict:
+    """Runs one domain of a batch and turns any outcome into a result record."""
+    record = {"type": "result", "domain": domain, "inputs": inputs, "status": "ok", "leads": [], "sources": []}
+    start = time.perf_counter()
+    try:
+        # The batch bounds its own fan-out, so it waits for slots instead of getting 429s
+        async with fan_out, admission.slot(patient=True):
+            deadline = Deadline(request.timeout or settings.REQUEST_DEADLINE)
+            record["leads"] = await asyncio.wait_for(
+                run_lead_pipeline(
+                    domain, preflight=False, deadline=deadline, refresh=request.refresh, profile=request.profile,
+                    fresh=request.fresh, source_reports=record["sources"]
+                ),
+                timeout=deadline.remaining() + settings.REQUEST_DEADLINE_GRACE
+            )
+            if deadline.expired:
+                record["status"] = "partial"
+    except asyncio.TimeoutError:
+        record.update(status="error", error="Deadline exceeded")
+    except Exception as e:
+        logger.error(f"Batch item {domain} failed: {e}")
+        record.update(status="error", error=str(e))
+    record["elapsed"] = round(time.perf_counter() - start, 2)
+    return record
+
+async def _stream_batch(request: BatchScrapeRequest):
+    """
+    Yields one NDJSON line per domain as soon as it completes (invalid and
+    skipped domains first), then a summary line. Inputs that normalize to the
+    same domain ('www.' variants, URLs, duplicates) are run once; each record
+    lists the raw `inputs` it answers.
+    """
+    start = time.perf_counter()
+    counts = {}
+    lead_total = 0
+
+    def emit(record: dict) -> str:
+        nonlocal lead_total
+        counts[record["status"]] = counts.get(record["status"], 0) + 1
+        lead_total += len(record["leads"])
+        return _ndjson(record)
+
+    inputs: Dict[str, List[str]] = {}
+    for raw in request.domains:
+        domain = normalize_domain(raw)
+        if domain:
+            inputs.setdefault(domain, []).append(raw)
+        else:
+            yield emit({"type": "result", "domain": raw, "inputs": [raw], "status": "invalid", "leads": []})
+
+    if settings.PREFLIGHT_ENABLED:
+        verdicts = await triage_domains(list(inputs))
+        runnable = [verdict.domain for verdict in verdicts if verdict.runnable]
+        for verdict in verdicts:
+            if not verdict.runnable:
+                yield emit({
+                    "type": "result", "domain": verdict.domain, "inputs": inputs[verdict.domain],
+                    "status": "skipped", "reason": verdict.status, "leads": []
+                })
+    else:
+        runnable = list(inputs)
+
+    fan_out = asyncio.Semaphore(settings.API_BATCH_CONCURRENCY)
+    tasks = [
+        asyncio.create_task(_scrape_batch_domain(domain, inputs[domain], request, fan_out))
+        for domain in runnable
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield emit(await next_done)
+        yield _ndjson({
+            "type": "summary",
+            "domains": sum(counts.values()),
+            "by_status": counts,
+            "leads": lead_total,
+            "elapsed": round(time.perf_counter() - start, 2),
+        })
+    finally:
+        # Client went away (or the stream failed): stop the remaining work
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.info(f"Batch stream closed early, cancelled {len(pending)} domains")
+
+@app.post("/api/scrape/batch")
+async def scrape_batch(request: BatchScrapeRequest):
+    """
+    Scrapes many domains over one connection. Domains are scheduled on the
+    server (API_BATCH_CONCURRENCY at a time, sharing the admission limits and
+    browser with single requests) and streamed back as NDJSON as they finish:
+    one `{"type": "result", "domain", "inputs", "status", "leads", "sources", ...}`
+    line per normalized domain (`inputs` are the submitted strings it covers,
+    `sources` each discovery source's yield and latency),
+    where status is ok, partial, skipped, invalid or error, then a
+    `{"type": "summary", ...}` line. Skipped means the DNS pre-flight found
+    the domain dead or mail-less (only when PREFLIGHT_ENABLED).
+    """
+    if not request.domains:
+        raise HTTPException(status_code=422, detail="No domains given")
+    _resolve_profile(request.profile)
+    if len(request.domains) > settings.API_BATCH_MAX_DOMAINS:
+        raise HTTPException(
+            status_code=413, detail=f"Batch too large (max {settings.API_BATCH_MAX_DOMAINS} domains)"
+        )
+    logger.info(f"Received batch scrape request for {len(request.domains)} domains")
+    return StreamingResponse(_stream_batch(request), media_type="application/x-ndjson")
 
 @app.get("/")
 def read_root():
@@ -61,4 +262,23 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "service": "LeadScraper API"}
+    return {
+        "status": "ok",
+        "service": "LeadScraper API",
+        "admission": admission.snapshot(),
+        "event_loop": loop_monitor.snapshot(),
+        "browser": get_browser_supervisor().snapshot()
+    }
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    # Log output is formatted and written on a listener thread, not on the loop
+    offload_log_handlers()
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+
+@app.on_event("shutdown")
+async def shutdown_browsers():
+    loop_monitor.stop()
+    await close_browser_supervisors()
+    shutdown_offload()
@@ -0,0 +1,67 @@
+from typing import Dict, List, Optional, Union
+
+from src.config.settings import settings
+
+class PipelineProfile:
+    """
+    Named set of budgets for one pipeline run. Each stage stops when its budget
+    is spent: pages visited, search queries, role aliases guessed, candidates
+    verified over SMTP, and wall-clock time (overall and for discovery).
+    A budget of None means unbounded.
+    """
+
+    def __init__(self, name: str, sources: List[str], max_pages: int, max_queries: int, max_aliases: Optional[int],
+                 verify_budget: int, time_budget: Optional[float], discovery_time: Optional[float],
+                 extra_paths: bool = False):
+        self.name = name
+        self.sources = sources
+        self.max_pages = max_pages
+        self.extra_paths = extra_paths # Also try the less common pages (imprint, privacy, ...)
+        self.max_queries = max_queries
+        self.max_aliases = max_aliases
+        self.verify_budget = verify_budget
+        self.time_budget = time_budget # Seconds for the whole run
+        self.discovery_time = discovery_time # Seconds for discovery, leaving the rest for verification
+
+    def __repr__(self) -> str:
+        return f"PipelineProfile({self.name!r})"
+
+def _enabled(sources: List[str]) -> List[str]:
+    """A profile's sources minus any the operator disabled in DISCOVERY_SOURCES."""
+    return [source for source in sources if source in settings.DISCOVERY_SOURCES]
+
+def _build_profiles() -> Dict[str, PipelineProfile]:
+    return {
+        # Interactive scans (extension, single API calls): answer in seconds
+        "fast": PipelineProfile(
+            "fast", sources=_enabled(["scraper", "patterns"]), max_pages=2, max_queries=0, max_aliases=5,
+            verify_budget=5, time_budget=25, discovery_time=12
+        ),
+        # The historical behaviour; follows the existing settings
+        "standard": PipelineProfile(
+            "standard", sources=list(settings.DISCOVERY_SOURCES), max_pages=5, max_queries=3, max_aliases=None,
+            verify_budget=settings.SMTP_VERIFY_BUDGET_PER_DOMAIN, time_budget=None, discovery_time=None
+        ),
+        # Overnight batch jobs: more pages, more dorks, verify deeper
+        "thorough": PipelineProfile(
+            "thorough", sources=_enabled(["scraper", "google", "patterns"]), max_pages=12, max_queries=5,
+            max_aliases=None, verify_budget=50, time_budget=900, discovery_time=480, extra_paths=True
+        ),
+    }
+
+PROFILE_NAMES = ("fast", "standard", "thorough")
+
+def get_profile(profile: Union[str, PipelineProfile, None] = None) -> PipelineProfile:
+    """
+    Resolves a profile by name (defaults to settings.PIPELINE_PROFILE).
+
+    Raises:
+        ValueError: Unknown profile name.
+    """
+    if isinstance(profile, PipelineProfile):
+        return profile
+    name = profile or settings.PIPELINE_PROFILE
+    profiles = _build_profiles()
+    if name not in profiles:
+        raise ValueError(f"Unknown profile '{name}' (choose from {', '.join(PROFILE_NAMES)})")
+    return profiles[name]
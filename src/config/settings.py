@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -11,11 +12,120 @@ class Settings(BaseSettings):
     # Verification
     SMTP_TIMEOUT: int = 10
     DNS_TIMEOUT: int = 5
+    SMTP_VERIFY_BUDGET_PER_DOMAIN: int = 15 # Top-ranked candidates probed per domain; the rest stay 'unverified'
+    SMTP_RETRY_BASE_DELAY: float = 60.0 # Seconds before re-probing after a 4xx/timeout (greylisting)
+    SMTP_RETRY_BACKOFF: float = 2.0 # Delay multiplier per further tempfail from the same MX
+    SMTP_RETRY_MAX_ATTEMPTS: int = 4 # Total attempts (first probe included) before staying 'risky'
+    SMTP_RETRY_MAX_WAIT: float = 30.0 # Seconds a run waits for pending retries after its own checks (none if none is due by then); the rest come back 'risky'
+    SMTP_RETRY_BULK_MAX_WAIT: float = 600.0 # Same, at the end of a bulk run (retries run alongside all domains before that)
+
+    # Email format inference
+    FORMAT_TTL: int = 180 * 24 * 3600 # Seconds a domain's learned format is kept
+    FORMAT_MIN_EVIDENCE: int = 3 # Distinct verified addresses (net of rejected guesses) before only the dominant pattern is generated
+    FORMAT_MIN_SHARE: float = 0.6 # Share of verified addresses the dominant format must hold
     
+    # Request deadlines (API)
+    REQUEST_DEADLINE: int = 120 # Seconds a scrape request may run before returning partial results
+    REQUEST_DEADLINE_GRACE: int = 10 # Extra seconds before work that ignores the deadline is cancelled
+    DISCONNECT_POLL_INTERVAL: float = 1.0 # Seconds between client-disconnect checks
+
+    # Admission control (API, per worker process)
+    API_MAX_CONCURRENT: int = 4 # Pipelines running at once; each may hold two browser pages
+    API_MAX_QUEUE: int = 16 # Requests allowed to wait for a slot; beyond this they get 429
+    API_QUEUE_TIMEOUT: float = 30.0 # Seconds a request may wait for a slot before 429
+    API_BATCH_CONCURRENCY: int = 2 # Domains of one batch request running (or queued) at once
+    API_BATCH_MAX_DOMAINS: int = 500 # Largest accepted batch
+
+    # Production server (run_api.py --production)
+    API_HOST: str = "127.0.0.1"
+    API_PORT: int = 8000
+    API_WORKERS: int = 2 # Worker processes; each has its own browser and admission limits
+
     # Scraping
     PROXY_URL: str | None = None
     PROXIES: list[str] = [] # List of proxy URLs
 
+    # Browser supervisor
+    BROWSER_CONTEXT_MAX_NAVIGATIONS: int = 50 # Recycle a context after this many navigations
+    BROWSER_MAX_RSS_MB: int = 1500 # Drain and replace the browser above this total RSS
+    BROWSER_HEALTH_INTERVAL: float = 15.0 # Seconds between health checks
+    BROWSER_HEALTH_TIMEOUT: float = 5.0 # A browser that doesn't answer within this is restarted
+
+    # Request blocking (applied inside Chromium, see src/utils/request_policy.py)
+    BLOCKED_RESOURCE_TYPES: list[str] = ["image", "media", "stylesheet", "font"]
+    BLOCKED_HOST_CATEGORIES: list[str] = ["analytics", "ads", "chat", "video"]
+    BLOCKED_HOSTS: list[str] = [] # Extra third-party hosts to block
+
+    # Pre-flight triage
+    PREFLIGHT_ENABLED: bool = True
+    PREFLIGHT_CONCURRENCY: int = 50 # Parallel DNS triage lookups
+    PREFLIGHT_NEGATIVE_TTL: int = 3 * 24 * 3600 # Seconds a dead/mail-less verdict is remembered
+
+    # Pipeline
+    PIPELINE_PROFILE: str = "standard" # Default budget profile: fast, standard or thorough (src/config/profiles.py)
+
+    # Discovery
+    DISCOVERY_SOURCES: list[str] = ["scraper", "google", "patterns"] # Enabled sources, by registry name
+    DISCOVERY_SOURCE_TIMEOUT: int = 90 # Default per-source deadline (seconds)
+    DISCOVERY_SOURCE_TIMEOUTS: dict[str, int] = {"scraper": 90, "google": 120, "patterns": 5}
+    DISCOVERY_MAX_RESULTS: int = 100 # Default per-source result cap
+
+    # Caching
+    CACHE_DIR: str = os.path.join(BASE_DIR, ".cache")
+    QUERY_CACHE_ENABLED: bool = True
+    QUERY_CACHE_TTL: int = 7 * 24 * 3600 # Seconds a search result stays fresh
+    QUERY_CACHE_MAX_ENTRIES: int = 5000
+
+    # Incremental re-scan (--refresh)
+    PAGE_STATE_TTL: int = 90 * 24 * 3600 # Seconds per-URL ETag/hash state is kept
+    PAGE_STATE_MAX_ENTRIES: int = 50000
+
+    # Verification cache (always consulted; --fresh bypasses it)
+    VERDICT_TTLS: dict[str, int] = { # Seconds a verdict is reused, per lead status
+        "valid": 30 * 24 * 3600,
+        "invalid": 30 * 24 * 3600,
+        "catch_all": 14 * 24 * 3600,
+        "invalid_mx": 7 * 24 * 3600,
+        "risky": 24 * 3600,
+    }
+    VERDICT_CACHE_MAX_ENTRIES: int = 200000
+    MX_CACHE_TTL: int = 24 * 3600 # Seconds a domain's MX host is reused
+    MX_NEGATIVE_TTL: int = 6 * 3600 # Seconds a "no MX" answer is reused
+    CATCH_ALL_TTL: int = 7 * 24 * 3600 # Seconds a conclusive catch-all probe is reused
+    MAIL_DOMAIN_CACHE_MAX_ENTRIES: int = 50000
+
+    # Cross-domain dedup in bulk runs (bulk --dedup)
+    SEEN_SET_CAPACITY: int = 10_000_000 # Addresses the Bloom filter is sized for (~1.2 bytes each)
+    SEEN_SET_ERROR_RATE: float = 0.01 # Filter false-positive rate; false positives cost one disk lookup
+    SEEN_SET_BATCH_SIZE: int = 1000 # New addresses buffered before a write
+
+    # Event loop health
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL: float = 0.1 # Seconds between heartbeats
+    LOOP_STALL_THRESHOLD: float = 0.25 # Seconds overdue before the blocking stack is logged
+    LOOP_MONITOR_WINDOW: int = 3000 # Lag samples kept for percentiles (5 min at 0.1 s)
+    CPU_OFFLOAD: str = "process" # Where CPU-heavy steps run: process, thread or off
+    CPU_OFFLOAD_WORKERS: int = 2
+    CPU_OFFLOAD_MIN_SIZE: int = 100_000 # Smaller inputs (e.g. characters of HTML) run inline
+
+    # Distributed work queue (queue add / worker)
+    QUEUE_PATH: Optional[str] = None # SQLite file shared by workers; defaults to CACHE_DIR/queue.sqlite3
+    QUEUE_LEASE_SECONDS: float = 120.0 # A task is reclaimed if its worker stops heartbeating for this long
+    QUEUE_HEARTBEAT_INTERVAL: float = 30.0 # Seconds between lease renewals
+    QUEUE_MAX_ATTEMPTS: int = 3 # Claims per task before it is marked failed
+    QUEUE_POLL_INTERVAL: float = 5.0 # Seconds an idle worker waits before polling again
+    QUEUE_TASK_TIMEOUT: float = 900.0 # Deadline for one domain's pipeline inside a worker
+
+    # Tracing
+    TRACE_ENABLED: bool = False
+    TRACE_SAMPLE_RATE: float = 0.01 # Share of pipeline runs traced when enabled (0.0-1.0)
+    TRACE_DIR: str = os.path.join(BASE_DIR, "traces") # Chrome Trace Event JSON files, one per traced run
+
+    # Page archive (raw HTML for `replay`)
+    PAGE_ARCHIVE_ENABLED: bool = False
+    PAGE_ARCHIVE_DIR: str = os.path.join(BASE_DIR, "archive") # One gzip JSON-lines file per day
+    PAGE_ARCHIVE_COMPRESSION_LEVEL: int = 6
+
     model_config = SettingsConfigDict(
         env_file=os.path.join(BASE_DIR, ".env"),
         env_file_encoding="utf-8",
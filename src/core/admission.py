@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Optional
+
+from src.config.settings import settings
+from src.core.exceptions import Overloaded
+
+logger = logging.getLogger(__name__)
+
+class AdmissionController:
+    """
+    Caps how many pipelines run at once in this process, with a bounded FIFO
+    queue in front. When the queue is full, or a request has waited longer
+    than the queue timeout, it is rejected right away with `Overloaded`
+    (an HTTP 429) instead of piling more browsers onto the host.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None, max_queue: Optional[int] = None,
+                 queue_timeout: Optional[float] = None):
+        self.max_concurrent = max_concurrent or settings.API_MAX_CONCURRENT
+        self.max_queue = max_queue if max_queue is not None else settings.API_MAX_QUEUE
+        self.queue_timeout = queue_timeout or settings.API_QUEUE_TIMEOUT
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.avg_service: Optional[float] = None # Moving average of seconds a slot is held
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free, from queue depth and recent service times."""
+        service = self.avg_service or settings.REQUEST_DEADLINE / 2
+        return max(1, math.ceil(service * (self.queued + 1) / self.max_concurrent))
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        retry_after = self.retry_after()
+        logger.warning(f"Admission rejected ({reason}): {self.active} running, {self.queued} queued, retry in {retry_after}s")
+        raise Overloaded(f"Server busy ({reason}), retry later", retry_after=retry_after)
+
+    def _admit(self, waited: float) -> float:
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    async def acquire(self, patient: bool = False) -> float:
+        """
+        Takes a slot, waiting in the queue if needed.
+
+        Args:
+            patient (bool): Wait as long as it takes, ignoring the queue limit and
+                timeout. For server-scheduled work (batches) that bounds its own fan-out.
+
+        Returns:
+            float: Seconds spent queued.
+
+        Raises:
+            Overloaded: The queue is full or the wait exceeded the queue timeout.
+        """
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            return self._admit(0.0)
+        if self.queued >= self.max_queue and not patient:
+            self._reject("queue full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, timeout=None if patient else self.queue_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                self._hand_over() # A slot arrived just as we gave up: pass it on
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                self._reject("queue wait timed out")
+            raise
+        return self._admit(time.monotonic() - start)
+
+    def _hand_over(self):
+        """Gives a freed slot to the oldest waiter still interested, or frees it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def release(self, held: float):
+        held = max(held, 0.0)
+        self.avg_service = held if self.avg_service is None else 0.8 * self.avg_service + 0.2 * held
+        self._hand_over()
+
+    @asynccontextmanager
+    async def slot(self, patient: bool = False):
+        """Holds a slot for the duration of the block; yields the seconds spent queued."""
+        waited = await self.acquire(patient)
+        start = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.release(time.monotonic() - start)
+
+    def snapshot(self) -> dict:
+        """Current load and queueing figures for health reporting."""
+        return {
+            "running": self.active,
+            "queued": self.queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_ms": round(1000 * self.total_wait / self.admitted) if self.admitted else 0,
+            "max_wait_ms": round(1000 * self.max_wait),
+            "avg_service_s": round(self.avg_service, 1) if self.avg_service is not None else None,
+        }
+
+admission = AdmissionController()
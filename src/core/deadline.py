@@ -0,0 +1,45 @@
+import time
+from typing import Optional
+
+class Deadline:
+    """
+    A point in time by which a unit of work must finish.
+
+    Passed down from the entry point (API request, CLI command) so every stage
+    can cap its own timeouts to the time that is actually left. Stages don't
+    raise when it passes: they stop and hand back what they have.
+    A Deadline created without seconds never expires.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), or None if unbounded."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def cap(self, timeout: float) -> float:
+        """Returns `timeout` limited to the time remaining."""
+        remaining = self.remaining()
+        return timeout if remaining is None else min(timeout, remaining)
+
+    def cap_ms(self, timeout: float) -> int:
+        """Capped timeout in milliseconds for Playwright; never 0, which it treats as 'no timeout'."""
+        return max(1, int(self.cap(timeout) * 1000))
+
+    def child(self, seconds: Optional[float]) -> "Deadline":
+        """A deadline that expires after `seconds` or with this one, whichever is first."""
+        child = Deadline(seconds)
+        if self.expires_at is not None and (child.expires_at is None or self.expires_at < child.expires_at):
+            child.expires_at = self.expires_at
+        return child
+
+    def __repr__(self) -> str:
+        remaining = self.remaining()
+        return "Deadline(unbounded)" if remaining is None else f"Deadline({remaining:.1f}s left)"
@@ -13,3 +13,9 @@ class DNSLookupError(VerificationException):
 class ValidationTimeoutError(VerificationException):
     """Raised when validation times out"""
     pass
+
+class Overloaded(LeadScraperException):
+    """Raised when the server can't admit more work; retry after `retry_after` seconds"""
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
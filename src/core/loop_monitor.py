@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, Optional
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class LoopMonitor:
+    """
+    Measures event-loop lag and catches code that blocks the loop.
+
+    A heartbeat task wakes every LOOP_MONITOR_INTERVAL; how late it wakes is
+    the loop lag, kept over a sliding window for percentiles. A watchdog
+    thread checks the heartbeat from outside the loop: when it is overdue by
+    LOOP_STALL_THRESHOLD, the loop thread's current stack (the code holding
+    the loop) is logged, once per stall.
+    """
+
+    def __init__(self, interval: Optional[float] = None, stall_threshold: Optional[float] = None,
+                 window: Optional[int] = None):
+        self.interval = interval or settings.LOOP_MONITOR_INTERVAL
+        self.stall_threshold = stall_threshold or settings.LOOP_STALL_THRESHOLD
+        self._samples: Deque[float] = deque(maxlen=window or settings.LOOP_MONITOR_WINDOW)
+        self._last_beat = 0.0
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+        self.stalls = 0
+        self.worst_stall = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Starts monitoring the running loop (call from inside it)."""
+        if self.running:
+            return
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._beat())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        self._task = None
+        self._stopped.set()
+        if self._samples:
+            snapshot = self.snapshot()
+            logger.info(
+                f"Event loop lag: p50 {snapshot['p50_ms']} ms, p99 {snapshot['p99_ms']} ms, "
+                f"max {snapshot['max_ms']} ms, {self.stalls} stalls"
+            )
+
+    async def _beat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._samples.append(max(0.0, now - expected))
+            self._last_beat = now
+
+    def _watch(self):
+        reported = None
+        while not self._stopped.wait(self.interval):
+            beat = self._last_beat
+            overdue = time.monotonic() - beat - self.interval
+            if overdue < self.stall_threshold or beat == reported:
+                continue
+            reported = beat
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "  (stack unavailable)\n"
+            logger.warning(f"Event loop blocked for over {overdue * 1000:.0f} ms, currently in:\n{stack.rstrip()}")
+            # Wait for the stall to end to record its full length
+            while self._last_beat == beat and not self._stopped.wait(self.interval / 4):
+                pass
+            self.worst_stall = max(self.worst_stall, time.monotonic() - beat - self.interval)
+
+    def snapshot(self) -> dict:
+        """Lag percentiles (ms) over the window, for /health and logs."""
+        samples = sorted(self._samples)
+
+        def percentile(p: float) -> float:
+            if not samples:
+                return 0.0
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 1)
+
+        return {
+            "running": self.running,
+            "samples": len(samples),
+            "p50_ms": percentile(0.50),
+            "p90_ms": percentile(0.90),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(samples[-1] * 1000, 1) if samples else 0.0,
+            "stalls": self.stalls,
+            "worst_stall_ms": round(self.worst_stall * 1000, 1),
+        }
+
+loop_monitor = LoopMonitor()
@@ -0,0 +1,83 @@
+import asyncio
+import atexit
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[Executor] = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> Executor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if settings.CPU_OFFLOAD == "process":
+                # Spawned, not forked: the parent runs browser and executor threads
+                _pool = ProcessPoolExecutor(
+                    max_workers=settings.CPU_OFFLOAD_WORKERS, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                _pool = ThreadPoolExecutor(max_workers=settings.CPU_OFFLOAD_WORKERS, thread_name_prefix="cpu")
+        return _pool
+
+async def run_cpu_bound(func: Callable, *args, size: int = 0) -> Any:
+    """
+    Runs a CPU-heavy function off the event loop and awaits its result.
+
+    With CPU_OFFLOAD='process' (default) it runs in a worker process, the only
+    way to keep regex scans from holding the GIL the loop needs; 'thread' uses a
+    thread pool and 'off' runs inline. Work smaller than CPU_OFFLOAD_MIN_SIZE
+    (by the caller's `size` hint, e.g. characters of text) runs inline, where
+    it costs less than the hand-off. `func` and its arguments must be picklable
+    for the process pool.
+    """
+    if settings.CPU_OFFLOAD == "off" or size < settings.CPU_OFFLOAD_MIN_SIZE:
+        return func(*args)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_pool(), func, *args)
+    except BrokenProcessPool:
+        logger.warning(f"CPU worker pool broke, running {func.__name__} inline")
+        shutdown_offload(wait=False)
+        return func(*args)
+
+def shutdown_offload(wait: bool = True):
+    """Stops the worker pool; the next offloaded call starts a new one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+class _PassThroughQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the listener as they are, so handlers still see exc_info and args."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+def offload_log_handlers(target: Optional[logging.Logger] = None) -> Optional[logging.handlers.QueueListener]:
+    """
+    Moves a logger's handlers (default: root) behind a queue, so formatting,
+    console rendering and file writes happen on a listener thread instead of
+    whichever thread logged, usually the event loop.
+    """
+    target = target or logging.getLogger()
+    handlers = [h for h in target.handlers if not isinstance(h, logging.handlers.QueueHandler)]
+    if not handlers:
+        return None
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    for handler in handlers:
+        target.removeHandler(handler)
+    target.addHandler(_PassThroughQueueHandler(log_queue))
+    listener.start()
+    atexit.register(listener.stop) # Flushes what is still queued
+    return listener
@@ -0,0 +1,189 @@
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+from enum import IntEnum
+from functools import lru_cache
+from typing import List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_unknown_labels: Set[Tuple[str, str]] = set()
+
+def _warn_unknown(kind: str, label, default: str):
+    # Once per label: a stray label usually repeats across a whole file
+    if (kind, str(label)) not in _unknown_labels:
+        _unknown_labels.add((kind, str(label)))
+        logger.warning(f"Unknown {kind} label {label!r}, treating it as '{default}'")
+
+class LeadStatus(IntEnum):
+    """Lead status as a small integer code; `label` is the string used in dicts and exports."""
+    PROCESSING = 0
+    VALID = 1
+    CATCH_ALL = 2
+    RISKY = 3
+    UNVERIFIED = 4
+    INVALID = 5
+    INVALID_MX = 6
+    INVALID_FORMAT = 7
+    DEFERRED = 8 # SMTP tempfail, retry pending
+
+    @property
+    def label(self) -> str:
+        return _STATUS_LABELS[self]
+
+    @classmethod
+    def from_label(cls, label: str) -> "LeadStatus":
+        """Parses a status label; unknown ones (e.g. from another version) become UNVERIFIED."""
+        try:
+            return cls[label.upper()]
+        except (KeyError, AttributeError):
+            _warn_unknown("lead status", label, "unverified")
+            return cls.UNVERIFIED
+
+class SmtpResult(IntEnum):
+    """Outcome of the SMTP probe, as stored in `verification['smtp']`."""
+    UNCHECKED = 0
+    VALID = 1
+    INVALID = 2
+    CATCH_ALL = 3
+    UNKNOWN = 4
+    TEMPFAIL = 5
+
+    @property
+    def label(self) -> str:
+        return _SMTP_LABELS[self]
+
+    @classmethod
+    def from_label(cls, label: str) -> "SmtpResult":
+        """Parses an SMTP result label; unknown ones become UNKNOWN."""
+        try:
+            return cls[label.upper()]
+        except (KeyError, AttributeError):
+            _warn_unknown("SMTP result", label, "unknown")
+            return cls.UNKNOWN
+
+# Labels looked up by code: Enum.name goes through a descriptor on every access
+_STATUS_LABELS = {member: member.name.lower() for member in LeadStatus}
+_SMTP_LABELS = {member: member.name.lower() for member in SmtpResult}
+
+_EPOCH = datetime(1970, 1, 1)
+
+def _parse_timestamp(value) -> int:
+    """Microseconds since the epoch (UTC) from an ISO string or epoch seconds."""
+    if isinstance(value, (int, float)):
+        return int(value * 1_000_000)
+    if not value:
+        return 0
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None: # Pipeline timestamps are naive UTC
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return (parsed - _EPOCH) // timedelta(microseconds=1)
+
+def _format_timestamp(micros: int) -> str:
+    return (_EPOCH + timedelta(microseconds=micros)).isoformat()
+
+def iso_timestamps(records: Sequence["LeadRecord"]) -> List[str]:
+    """found_at of many records as ISO strings, formatted in one vectorized pass."""
+    import numpy as np
+    return np.datetime_as_string(np.array([r.found_at for r in records], dtype="datetime64[us]")).tolist()
+
+@lru_cache(maxsize=1024)
+def _join_source_names(sources: Tuple[str, ...]) -> str:
+    # Few distinct source combinations, so the joined column value is shared
+    return ",".join(source.split(":", 1)[0] for source in sources)
+
+class LeadRecord:
+    """
+    Compact, flat form of a lead for holding many of them in memory (bulk runs)
+    and for columnar export. Roughly a fifth of the size of the nested lead
+    dict: slots instead of per-instance dicts, integer status/SMTP codes,
+    an integer UTC timestamp (microseconds), and interned domain/evidence strings.
+
+    Provenance keeps each source with its evidence kind ('scraper:mailto'),
+    and the raw spellings the address was found under only when they differ
+    from the address itself. `from_dict`/`to_dict` round-trip a pipeline lead.
+    """
+
+    __slots__ = ("email", "domain", "status", "found_at", "syntax", "mx", "smtp", "sources", "originals", "name")
+
+    def __init__(self, email: str, domain: str, status: LeadStatus, found_at: int, syntax: bool = True,
+                 mx: bool = False, smtp: SmtpResult = SmtpResult.UNCHECKED, sources: Tuple[str, ...] = (),
+                 name: Optional[str] = None, originals: Tuple[str, ...] = ()):
+        self.email = email
+        self.domain = sys.intern(domain)
+        self.status = status
+        self.found_at = found_at
+        self.syntax = syntax
+        self.mx = mx
+        self.smtp = smtp
+        self.sources = sources
+        self.originals = originals # Empty when the only spelling was `email` itself
+        self.name = name
+
+    @classmethod
+    def from_dict(cls, lead: dict) -> "LeadRecord":
+        """Builds a record from a pipeline lead dict."""
+        verification = lead.get("verification") or {}
+        provenance = lead.get("provenance") or {}
+        sources = provenance.get("sources") or {}
+        originals = tuple(provenance.get("originals") or ())
+        return cls(
+            email=lead["email"],
+            domain=lead.get("domain") or "",
+            status=LeadStatus.from_label(lead.get("status")),
+            found_at=_parse_timestamp(lead.get("found_at")),
+            syntax=bool(verification.get("syntax", True)),
+            mx=bool(verification.get("mx")),
+            smtp=SmtpResult.from_label(verification.get("smtp") or "unchecked"),
+            sources=tuple(sys.intern(f"{source}:{kind}") for source, kind in sources.items()),
+            name=lead.get("name"),
+            originals=() if originals == (lead["email"],) else originals,
+        )
+
+    @property
+    def source_names(self) -> Tuple[str, ...]:
+        return tuple(source.split(":", 1)[0] for source in self.sources)
+
+    @property
+    def found_at_iso(self) -> str:
+        """Naive UTC ISO timestamp, as the pipeline writes it."""
+        return _format_timestamp(self.found_at)
+
+    def to_dict(self) -> dict:
+        """The record in the pipeline/API lead dict shape."""
+        lead = {
+            "email": self.email,
+            "domain": self.domain,
+            "found_at": self.found_at_iso,
+            "status": self.status.label,
+            "verification": {"syntax": self.syntax, "mx": self.mx, "smtp": self.smtp.label},
+            "provenance": {
+                "originals": list(self.originals) or [self.email],
+                "sources": dict(source.split(":", 1) for source in self.sources),
+            },
+        }
+        if self.name is not None:
+            lead["name"] = self.name
+        return lead
+
+    def as_row(self, found_at: Optional[str] = None) -> dict:
+        """
+        Flat row with the same columns as `flatten_lead_data`. Pass `found_at`
+        when it was already formatted in bulk (see `iso_timestamps`).
+        """
+        row = {
+            "email": self.email,
+            "domain": self.domain,
+            "status": _STATUS_LABELS[self.status],
+            "found_at": found_at or self.found_at_iso,
+            "valid_syntax": self.syntax,
+            "valid_mx": self.mx,
+            "valid_smtp": _SMTP_LABELS[self.smtp],
+            "sources": _join_source_names(self.sources),
+        }
+        if self.name is not None:
+            row["name"] = self.name
+        return row
+
+    def __repr__(self) -> str:
+        return f"LeadRecord({self.email!r}, {self.status.label})"
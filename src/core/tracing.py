@@ -0,0 +1,171 @@
+import asyncio
+import contextvars
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Span currently open in this task/thread (child spans attach to it).
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+class Trace:
+    """
+    All spans of one traced run, written out as a Chrome Trace Event file
+    (open it in chrome://tracing or https://ui.perfetto.dev).
+
+    Each asyncio task or executor thread gets its own lane (tid), so spans
+    running concurrently are shown side by side instead of overlapping.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = datetime.now()
+        self.origin = time.perf_counter()
+        self.events: List[dict] = []
+        self._lanes: Dict[object, int] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def lane(self) -> int:
+        try:
+            key = asyncio.current_task() or threading.get_ident()
+        except RuntimeError: # No running loop: executor thread
+            key = threading.get_ident()
+        with self._lock:
+            if key not in self._lanes:
+                self._lanes[key] = len(self._lanes) + 1
+            return self._lanes[key]
+
+    def next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def add(self, event: dict):
+        with self._lock:
+            self.events.append(event)
+
+    def write(self, directory: str) -> str:
+        """Writes the trace file and returns its path."""
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9._-]+", "_", self.name)[:80]
+        path = os.path.join(directory, f"{self.started_at:%Y%m%d-%H%M%S}-{slug}.json")
+        lanes = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": f"lane {tid}"}}
+            for tid in sorted(self._lanes.values())
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": lanes + self.events, "displayTimeUnit": "ms"}, f)
+        return path
+
+class Span:
+    """One timed operation; `set` attaches extra args shown in the trace viewer."""
+
+    def __init__(self, trace: Trace, name: str, parent: Optional["Span"], args: dict):
+        self.trace = trace
+        self.name = name
+        self.id = trace.next_id()
+        self.parent_id = parent.id if parent else None
+        self.args = args
+        self.tid = trace.lane()
+        self.start = time.perf_counter()
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def finish(self, error: Optional[BaseException] = None):
+        if error is not None:
+            self.args["error"] = f"{type(error).__name__}: {error}"
+        self.trace.add({
+            "name": self.name,
+            "cat": re.split(r"[. ]", self.name, maxsplit=1)[0],
+            "ph": "X",
+            "ts": round((self.start - self.trace.origin) * 1e6),
+            "dur": round((time.perf_counter() - self.start) * 1e6),
+            "pid": os.getpid(),
+            "tid": self.tid,
+            "args": {"span_id": self.id, "parent_id": self.parent_id, **{k: str(v) for k, v in self.args.items()}},
+        })
+
+@contextmanager
+def span(name: str, **args):
+    """
+    Times the enclosed block as a child of the current span.
+    A no-op (yields None) when the current run is not being traced.
+
+    Works in both sync and async code; spans opened in tasks started inside
+    the block (asyncio.gather, create_task) become its children.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    current = Span(parent.trace, name, parent, args)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.finish(e)
+        raise
+    else:
+        current.finish()
+    finally:
+        _current_span.reset(token)
+
+@contextmanager
+def start_trace(name: str, force: Optional[bool] = None, **args):
+    """
+    Opens the root span of a traced run and writes the trace file when it ends.
+
+    Args:
+        name (str): Root span name, also used in the file name (e.g. the domain).
+        force (bool | None): Trace regardless of TRACE_ENABLED/TRACE_SAMPLE_RATE
+            (True), never trace (False), or sample according to settings (None).
+
+    Yields:
+        Span | None: The root span, or None if this run is not sampled.
+    """
+    sampled = force if force is not None else (
+        settings.TRACE_ENABLED and random.random() < settings.TRACE_SAMPLE_RATE
+    )
+    if not sampled or _current_span.get() is not None:
+        # Not sampled, or already inside a traced run: nest as a plain span
+        with span(name, **args) as current:
+            yield current
+        return
+
+    trace = Trace(name)
+    try:
+        with _root(trace, name, args) as root:
+            yield root
+    finally:
+        # Written even when the run fails: that's when the timeline matters most
+        try:
+            path = trace.write(settings.TRACE_DIR)
+            logger.info(f"Trace for {name} written to {path} ({len(trace.events)} spans)")
+        except OSError as e:
+            logger.warning(f"Could not write trace for {name}: {e}")
+
+@contextmanager
+def _root(trace: Trace, name: str, args: dict):
+    root = Span(trace, name, None, args)
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.finish(e)
+        raise
+    else:
+        root.finish()
+    finally:
+        _current_span.reset(token)
@@ -1,102 +1,368 @@
 import asyncio
+import csv
 import typer
 import logging
 import json
 import os
-from typing import Optional
+import tempfile
+from datetime import date
+from functools import lru_cache
+from typing import List, Optional
 from pathlib import Path
-from rich.console import Console
-from rich.logging import RichHandler
-
-from src.pipeline import run_lead_pipeline
-from src.modules.export.exporter import export_to_csv, export_to_excel
-
-# Setup Rich Logging
-logging.basicConfig(
-    level="INFO",
-    format="%(message)s",
-    datefmt="[%X]",
-    handlers=[
-        RichHandler(rich_tracebacks=True),
-        logging.FileHandler("scraper.log", encoding="utf-8")
-    ]
-)
+
+from src.config.profiles import PROFILE_NAMES, get_profile
+from src.config.settings import settings
+from src.core.deadline import Deadline
+from src.core.loop_monitor import loop_monitor
+from src.core.offload import offload_log_handlers, shutdown_offload
+from src.core.records import LeadRecord, LeadStatus
+from src.pipeline import new_retry_queue, replay_archive, run_lead_pipeline, run_name_enrichment, verify_leads
+from src.modules.discovery.preflight import normalize_domains, triage_domains
+from src.modules.export.exporter import export_to_arrow, export_to_csv, export_to_excel, export_to_parquet
+from src.utils.browser_pool import close_browser_supervisors
+from src.utils.seen_set import SeenSet
+
 logger = logging.getLogger("leadscraper")
 
 app = typer.Typer(help="LeadScraper CLI - AI-Powered Lead Generation")
-console = Console()
+
+# Rich is only loaded once a command actually runs, so `--help` stays fast.
+@lru_cache(maxsize=None)
+def get_console():
+    from rich.console import Console
+    return Console()
+
+@app.callback()
+def setup_logging():
+    """Setup Rich Logging (runs before any command)."""
+    from rich.logging import RichHandler
+
+    logging.basicConfig(
+        level="INFO",
+        format="%(message)s",
+        datefmt="[%X]",
+        handlers=[
+            RichHandler(console=get_console(), rich_tracebacks=True),
+            logging.FileHandler("scraper.log", encoding="utf-8")
+        ]
+    )
+    offload_log_handlers()
+
+def run_async(coro):
+    """
+    Runs a coroutine on a fresh event loop (lag-monitored), shutting down shared
+    browsers and CPU workers before the loop closes.
+    """
+    async def _runner():
+        if settings.LOOP_MONITOR_ENABLED:
+            loop_monitor.start()
+        try:
+            return await coro
+        finally:
+            loop_monitor.stop()
+            await close_browser_supervisors()
+            shutdown_offload()
+    return asyncio.run(_runner())
+
+def check_profile(value: Optional[str]) -> Optional[str]:
+    """Typer callback rejecting unknown profile names up front."""
+    if value is not None:
+        try:
+            get_profile(value)
+        except ValueError as e:
+            raise typer.BadParameter(str(e))
+    return value
+
+PROFILE_HELP = f"Budget profile: {', '.join(PROFILE_NAMES)} (default: PIPELINE_PROFILE setting)"
+FRESH_HELP = "Ignore cached verdicts, MX and catch-all answers and probe again"
 
 @app.command()
 def scrape(
     domain: str = typer.Argument(..., help="The target domain to scrape (e.g. example.com)"),
     name: Optional[str] = typer.Option(None, help="Person name for pattern prediction (e.g. 'John Doe')"),
     output: str = typer.Option("leads", help="Output filename base (without extension)"),
-    format: str = typer.Option("csv", help="Output format: csv, json, excel")
+    format: str = typer.Option("csv", help="Output format: csv, json, excel, parquet, arrow (combine, e.g. csv,parquet)"),
+    timeout: Optional[float] = typer.Option(None, help="Overall time limit in seconds; partial results are saved when it passes"),
+    refresh: bool = typer.Option(False, "--refresh", help="Incremental re-scan: skip unchanged pages"),
+    trace: bool = typer.Option(False, "--trace", help="Write a span timeline of this run to TRACE_DIR"),
+    profile: Optional[str] = typer.Option(None, help=PROFILE_HELP, callback=check_profile),
+    fresh: bool = typer.Option(False, "--fresh", help=FRESH_HELP)
 ):
     """
     Scrape and verify emails for a single domain.
     """
-    console.print(f"[bold green]Starting scraping for {domain}...[/bold green]")
+    get_console().print(f"[bold green]Starting scraping for {domain}...[/bold green]")
     
-    results = asyncio.run(run_lead_pipeline(domain, name))
+    source_reports = []
+    results = run_async(run_lead_pipeline(
+        domain, name, deadline=Deadline(timeout), refresh=refresh, trace=True if trace else None,
+        profile=profile, fresh=fresh, source_reports=source_reports
+    ))
+    results = [LeadRecord.from_dict(lead) for lead in results]
+    print_source_table(source_reports)
     
     if not results:
-        console.print("[bold red]No leads found or pipeline failed.[/bold red]")
+        get_console().print("[bold red]No leads found or pipeline failed.[/bold red]")
         return
         
     save_results(results, output, format)
 
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskID
-from rich.table import Table
-
-# ... imports ...
-
 @app.command()
 def bulk(
     file: Path = typer.Argument(..., exists=True, help="Path to text file with domains (one per line)"),
     output: str = typer.Option("bulk_leads", help="Output filename base"),
-    format: str = typer.Option("csv", help="Output format: csv, json, excel")
+    format: str = typer.Option("csv", help="Output format: csv, json, excel, parquet, arrow (combine, e.g. csv,parquet)"),
+    refresh: bool = typer.Option(False, "--refresh", help="Incremental re-scan: skip unchanged pages"),
+    profile: Optional[str] = typer.Option(None, help=PROFILE_HELP, callback=check_profile),
+    fresh: bool = typer.Option(False, "--fresh", help=FRESH_HELP),
+    dedup: Optional[str] = typer.Option(
+        None, help="Named, persistent seen-set: also skip addresses already found by earlier runs that used it"
+    )
 ):
     """
     Bulk scrape multiple domains from a file (Sequential processing).
+    Each address is kept once, for the first domain it was found on.
     """
-    domains = file.read_text().splitlines()
-    domains = [d.strip() for d in domains if d.strip()]
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
+
+    raw_domains = file.read_text().splitlines()
     
-    console.print(f"[bold green]Found {len(domains)} domains to process.[/bold green]")
+    # Pre-flight: normalize, dedupe and drop dead/mail-less domains before any browser starts
+    if settings.PREFLIGHT_ENABLED:
+        verdicts = asyncio.run(triage_domains(raw_domains))
+        domains = [v.domain for v in verdicts if v.runnable]
+        skipped = len(verdicts) - len(domains)
+    else:
+        domains = normalize_domains(raw_domains)
+        skipped = 0
+    
+    get_console().print(f"[bold green]Found {len(domains)} domains to process.[/bold green]")
+    if skipped:
+        get_console().print(f"[yellow]Skipped {skipped} dead or mail-less domains.[/yellow]")
     
     all_results = []
+    deferred = []
+    source_reports = []
+    
+    async def process_all(progress, task):
+        # One event loop for the whole run, so the supervised browser is reused across domains.
+        # SMTP tempfails from every domain share one retry queue that works in the background.
+        retry_queue = new_retry_queue(fresh=fresh)
+        # Cross-domain dedup on disk, so memory stays flat however many domains run.
+        # A named seen-set persists across runs; otherwise a scratch one is used.
+        with tempfile.TemporaryDirectory() as scratch:
+            seen = SeenSet(dedup) if dedup else SeenSet("run", path=os.path.join(scratch, "seen.sqlite3"))
+            try:
+                for domain in domains:
+                    progress.update(task, description=f"[cyan]Scraping {domain}...")
+                    
+                    try:
+                        # Run pipeline for each domain
+                        domain_results = await run_lead_pipeline(
+                            domain, preflight=False, refresh=refresh, retry_queue=retry_queue, profile=profile,
+                            fresh=fresh, seen=seen, source_reports=source_reports
+                        )
+                        # Keep only compact records: bulk runs can hold millions of leads.
+                        # Deferred leads stay dicts until their retry settles them.
+                        for lead in domain_results:
+                            if lead["status"] == "deferred":
+                                deferred.append(lead)
+                            else:
+                                all_results.append(LeadRecord.from_dict(lead))
+                        
+                    except Exception as e:
+                        get_console().print(f"[bold red]Error processing {domain}: {e}[/bold red]")
+                    
+                    progress.advance(task)
+            finally:
+                seen.close()
+        
+        progress.update(task, description="[cyan]Settling deferred SMTP checks...")
+        await retry_queue.drain(settings.SMTP_RETRY_BULK_MAX_WAIT)
+        all_results.extend(LeadRecord.from_dict(lead) for lead in deferred)
     
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         BarColumn(),
         TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-        console=console
+        console=get_console()
     ) as progress:
         task = progress.add_task("[cyan]Processing domains...", total=len(domains))
-        
-        for domain in domains:
-            progress.update(task, description=f"[cyan]Scraping {domain}...")
-            
-            try:
-                # Run pipeline for each domain
-                domain_results = asyncio.run(run_lead_pipeline(domain))
-                all_results.extend(domain_results)
-                
-            except Exception as e:
-                console.print(f"[bold red]Error processing {domain}: {e}[/bold red]")
-            
-            progress.advance(task)
+        run_async(process_all(progress, task))
             
+    print_source_table(source_reports)
     if all_results:
         print_summary_table(all_results)
         save_results(all_results, output, format)
     else:
-        console.print("[yellow]No results found in bulk process.[/yellow]")
+        get_console().print("[yellow]No results found in bulk process.[/yellow]")
+
+@app.command()
+def enrich(
+    file: Path = typer.Argument(..., exists=True, help="CSV file with 'name' and 'domain' columns"),
+    output: str = typer.Option("enriched_leads", help="Output filename base"),
+    format: str = typer.Option("csv", help="Output format: csv, json, excel, parquet, arrow (combine, e.g. csv,parquet)"),
+    timeout: Optional[float] = typer.Option(None, help="Overall time limit in seconds; partial results are saved when it passes"),
+    discover_format: bool = typer.Option(True, help="Scrape domains with an unknown email format before guessing"),
+    fresh: bool = typer.Option(False, "--fresh", help=FRESH_HELP)
+):
+    """
+    Find emails for people from a CSV of (name, domain) rows.
+    Rows are grouped by domain so each domain's email format is learned once
+    and then only the matching address is probed for every other name.
+    """
+    with file.open(newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        columns = {c.strip().lower(): c for c in reader.fieldnames or []}
+        if "name" not in columns or "domain" not in columns:
+            get_console().print("[bold red]CSV must have 'name' and 'domain' columns.[/bold red]")
+            raise typer.Exit(code=1)
+        rows = [(row[columns["name"]] or "", row[columns["domain"]] or "") for row in reader]
+
+    get_console().print(f"[bold green]Enriching {len(rows)} rows...[/bold green]")
+    results = run_async(run_name_enrichment(
+        rows, deadline=Deadline(timeout), discover_format=discover_format, fresh=fresh
+    ))
+    results = [LeadRecord.from_dict(lead) for lead in results]
+
+    if not results:
+        get_console().print("[yellow]No addresses could be guessed.[/yellow]")
+        return
+
+    found = [r for r in results if r.status == LeadStatus.VALID]
+    get_console().print(f"[bold green]Found valid addresses for {len(found)} people.[/bold green]")
+    print_summary_table(results)
+    save_results(results, output, format)
+
+def parse_day(value: Optional[str]) -> Optional[date]:
+    """Typer callback for YYYY-MM-DD options."""
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise typer.BadParameter(f"'{value}' is not a YYYY-MM-DD date")
+
+@app.command()
+def replay(
+    files: Optional[List[Path]] = typer.Argument(None, exists=True, help="Archive files (default: every file in PAGE_ARCHIVE_DIR)"),
+    since: Optional[str] = typer.Option(None, help="First archive day to replay (YYYY-MM-DD)", callback=parse_day),
+    until: Optional[str] = typer.Option(None, help="Last archive day to replay (YYYY-MM-DD)", callback=parse_day),
+    domain: Optional[List[str]] = typer.Option(None, "--domain", help="Only replay these domains (repeatable)"),
+    output: str = typer.Option("replayed_leads", help="Output filename base"),
+    format: str = typer.Option("csv", help="Output format: csv, json, excel, parquet, arrow (combine, e.g. csv,parquet)"),
+    workers: Optional[int] = typer.Option(None, help="Extraction processes (default: CPU count)"),
+    verify: bool = typer.Option(False, "--verify", help="Verify the candidates afterwards (cached verdicts are reused)"),
+    fresh: bool = typer.Option(False, "--fresh", help=FRESH_HELP)
+):
+    """
+    Re-run extraction and candidate scoring over archived pages, offline.
+    Pages are archived while scraping when PAGE_ARCHIVE_ENABLED is set.
+    """
+    from src.modules.discovery.page_archive import iter_archive, page_archive
+
+    paths = [str(f) for f in files] if files else page_archive.files(since, until)
+    if not paths:
+        get_console().print(f"[yellow]No archive files found in {page_archive.directory}.[/yellow]")
+        raise typer.Exit(code=1)
+
+    get_console().print(f"[bold green]Replaying {len(paths)} archive files...[/bold green]")
+    results = replay_archive(iter_archive(paths, domain), workers=workers)
+    if verify and results:
+        get_console().print(f"[cyan]Verifying {len(results)} candidates...[/cyan]")
+        results = run_async(verify_leads(results, fresh=fresh))
+    results = [LeadRecord.from_dict(lead) for lead in results]
 
-def print_summary_table(results: list):
+    if not results:
+        get_console().print("[yellow]No candidates found in the archive.[/yellow]")
+        return
+
+    print_summary_table(results)
+    save_results(results, output, format)
+
+queue_app = typer.Typer(help="Distributed bulk processing: a shared task queue that any number of workers drain")
+app.add_typer(queue_app, name="queue")
+
+@queue_app.command("add")
+def queue_add(
+    file: Path = typer.Argument(..., exists=True, help="Path to text file with domains (one per line)"),
+    queue: str = typer.Option("default", help="Queue name"),
+    refresh: bool = typer.Option(False, "--refresh", help="Workers run an incremental re-scan for these domains"),
+    profile: Optional[str] = typer.Option(None, help=PROFILE_HELP, callback=check_profile),
+    fresh: bool = typer.Option(False, "--fresh", help=FRESH_HELP)
+):
+    """
+    Add domains to the shared queue (normalized and deduplicated).
+    """
+    from src.utils.work_queue import WorkQueue
+
+    domains = normalize_domains(file.read_text().splitlines())
+    payload = {key: value for key, value in (("refresh", refresh), ("profile", profile), ("fresh", fresh)) if value}
+    added = WorkQueue(queue).enqueue(domains, payload or None)
+    get_console().print(f"[bold green]Queued {added} domains[/bold green] ({len(domains) - added} already queued).")
+
+@queue_app.command("status")
+def queue_status(queue: str = typer.Option("default", help="Queue name")):
+    """
+    Show task counts and the workers currently holding leases.
+    """
+    from src.utils.work_queue import WorkQueue
+
+    work_queue = WorkQueue(queue)
+    counts = work_queue.counts()
+    get_console().print(
+        f"[bold]{queue}[/bold]: " + ", ".join(f"{status} {counts.get(status, 0)}" for status in ("pending", "leased", "done", "failed"))
+    )
+    for worker_id, leased in work_queue.workers().items():
+        get_console().print(f"  {worker_id}: {leased} task(s)")
+
+@queue_app.command("retry-failed")
+def queue_retry_failed(queue: str = typer.Option("default", help="Queue name")):
+    """
+    Put failed tasks back in the queue.
+    """
+    from src.utils.work_queue import WorkQueue
+
+    get_console().print(f"Requeued {WorkQueue(queue).retry_failed()} failed tasks.")
+
+@queue_app.command("export")
+def queue_export(
+    queue: str = typer.Option("default", help="Queue name"),
+    output: str = typer.Option("queue_leads", help="Output filename base"),
+    format: str = typer.Option("csv", help="Output format: csv, json, excel, parquet, arrow (combine, e.g. csv,parquet)")
+):
+    """
+    Save the leads of every finished task.
+    """
+    from src.utils.work_queue import WorkQueue
+
+    results = [LeadRecord.from_dict(lead) for lead in WorkQueue(queue).results()]
+    if not results:
+        get_console().print("[yellow]No leads in finished tasks yet.[/yellow]")
+        return
+    save_results(results, output, format)
+
+@app.command()
+def worker(
+    queue: str = typer.Option("default", help="Queue name"),
+    concurrency: int = typer.Option(1, help="Domains processed at once by this worker"),
+    exit_when_empty: bool = typer.Option(False, "--exit-when-empty", help="Stop when no task is available instead of polling")
+):
+    """
+    Pull domains from the shared queue and process them until stopped.
+    Run one per host (or several); crashed workers' tasks are picked up again.
+    """
+    from src.utils.work_queue import WorkQueue
+    from src.worker import run_worker
+
+    stats = run_async(run_worker(WorkQueue(queue), concurrency=concurrency, exit_when_empty=exit_when_empty))
+    get_console().print(f"[bold green]Worker finished:[/bold green] {stats}")
+
+def print_summary_table(results: List[LeadRecord]):
     """Prints a summary table of the findings."""
+    from rich.table import Table
+
     table = Table(title="Lead Generation Summary")
     table.add_column("Email", style="cyan")
     table.add_column("Domain", style="magenta")
@@ -104,40 +370,72 @@ def print_summary_table(results: list):
     table.add_column("SMTP", style="yellow")
     
     for item in results:
-        smtp_status = str(item.get("verification", {}).get("smtp", "N/A"))
-        status_color = "green" if item['status'] == 'valid' else "red"
-        if item['status'] == 'catch_all': status_color = "yellow"
+        status_color = "green" if item.status == LeadStatus.VALID else "red"
+        if item.status == LeadStatus.CATCH_ALL: status_color = "yellow"
         
         table.add_row(
-            item.get("email", "Unknown"),
-            item.get("domain", "Unknown"),
-            f"[{status_color}]{item.get('status', 'Unknown')}[/{status_color}]",
-            smtp_status
+            item.email,
+            item.domain,
+            f"[{status_color}]{item.status.label}[/{status_color}]",
+            item.smtp.label
         )
     
-    console.print(table)
+    get_console().print(table)
+
+def print_source_table(reports: List[dict]):
+    """Prints what each discovery source yielded and cost, summed over every domain it ran for."""
+    from rich.table import Table
 
-def save_results(results: list, filename_base: str, format: str):
+    totals = {}
+    for report in reports:
+        entry = totals.setdefault(report["source"], {"runs": 0, "yield": 0, "latency": 0.0, "failed": 0})
+        entry["runs"] += 1
+        entry["yield"] += report["yield"]
+        entry["latency"] += report["latency"]
+        entry["failed"] += report["status"] != "ok"
+    if not totals:
+        return
 
+    table = Table(title="Discovery Sources")
+    table.add_column("Source", style="cyan")
+    table.add_column("Emails", justify="right")
+    table.add_column("Avg latency", justify="right")
+    table.add_column("Timeouts/errors", justify="right", style="red")
+    for source, entry in totals.items():
+        table.add_row(
+            source, str(entry["yield"]), f"{entry['latency'] / entry['runs']:.2f}s", str(entry["failed"])
+        )
+    get_console().print(table)
 
+def save_results(results: List[LeadRecord], filename_base: str, format: str):
     """Helper to save results in requested format."""
-    console.print(f"\n[bold green]Saving {len(results)} results...[/bold green]")
+    get_console().print(f"\n[bold green]Saving {len(results)} results...[/bold green]")
     
     if "json" in format:
         file_path = f"{filename_base}.json"
         with open(file_path, "w") as f:
-            json.dump(results, f, indent=2)
-        console.print(f"Saved to {file_path}")
+            json.dump([record.to_dict() for record in results], f, indent=2)
+        get_console().print(f"Saved to {file_path}")
         
     if "csv" in format:
         file_path = f"{filename_base}.csv"
         export_to_csv(results, file_path)
-        console.print(f"Saved to {file_path}")
+        get_console().print(f"Saved to {file_path}")
         
     if "excel" in format or "xlsx" in format:
         file_path = f"{filename_base}.xlsx"
         export_to_excel(results, file_path)
-        console.print(f"Saved to {file_path}")
+        get_console().print(f"Saved to {file_path}")
+        
+    if "parquet" in format:
+        file_path = f"{filename_base}.parquet"
+        export_to_parquet(results, file_path)
+        get_console().print(f"Saved to {file_path}")
+        
+    if "arrow" in format or "feather" in format:
+        file_path = f"{filename_base}.arrow"
+        export_to_arrow(results, file_path)
+        get_console().print(f"Saved to {file_path}")
 
 if __name__ == "__main__":
     app()
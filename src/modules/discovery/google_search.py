@@ -1,20 +1,34 @@
 import asyncio
 import logging
 import random
+import re
 import urllib.parse
-from typing import Set, List
-from playwright.async_api import async_playwright
+from typing import Set, List, Optional
 
 from src.modules.enrichment.extractor import extract_emails_from_text
 from src.modules.verification.syntax import validate_email_syntax
-from src.utils.browser import browser_utils
+from src.utils.browser_pool import get_browser_supervisor
+from src.utils.cache import PersistentCache
+from src.config.settings import settings
+from src.core.deadline import Deadline
+from src.core.tracing import span
 
 logger = logging.getLogger(__name__)
 
+# Candidate emails per executed query, shared across runs and processes.
+query_cache = PersistentCache(
+    "google_queries", ttl=settings.QUERY_CACHE_TTL, max_entries=settings.QUERY_CACHE_MAX_ENTRIES
+)
+
+def normalize_query(query: str) -> str:
+    """Canonical cache key for a query: lowercased with collapsed whitespace."""
+    return re.sub(r"\s+", " ", query.strip().lower())
+
 class GoogleSearcher:
     # ... (init unchanged) ...
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, use_cache: bool = settings.QUERY_CACHE_ENABLED):
         self.headless = headless
+        self.use_cache = use_cache
 
     async def _human_type(self, page, selector: str, text: str):
         # ... (unchanged) ...
@@ -23,71 +37,92 @@ class GoogleSearcher:
             await page.keyboard.type(char)
             await asyncio.sleep(random.uniform(0.05, 0.2)) # Random typing speed
 
-    async def search(self, queries: List[str], max_results: int = 15) -> Set[str]:
+    async def search(self, queries: List[str], max_results: int = 15, deadline: Optional[Deadline] = None) -> Set[str]:
         # ... (docstring unchanged) ...
+        deadline = deadline or Deadline()
         found_emails = set()
         
-        async with async_playwright() as p:
-            # Persistent context not needed if we want rotation per session
-            browser = await p.chromium.launch(headless=self.headless)
-            
-            # Safe Context with Rotation
-            context = await browser_utils.new_safe_context(browser)
-            
-            page = await context.new_page()
+        # Serve repeat queries from the cache; only misses need a browser session
+        pending_queries = []
+        for query in queries:
+            if len(found_emails) >= max_results:
+                break
+            cached = query_cache.get(normalize_query(query)) if self.use_cache else None
+            if cached is None:
+                pending_queries.append(query)
+            else:
+                logger.info(f"Cache hit for Google Dork: {query} ({len(cached)} emails)")
+                found_emails.update(cached)
+        
+        if not pending_queries:
+            return found_emails
+        
+        supervisor = get_browser_supervisor(self.headless)
+        async with supervisor.lease(block_requests=False) as lease:
+            page = lease.page
             
             # Go to Google once
             try:
-                await page.goto("https://www.google.com", timeout=15000)
-                await asyncio.sleep(random.uniform(1, 3))
+                with span("google.load"):
+                    await lease.goto("https://www.google.com", timeout=deadline.cap_ms(15))
+                    await asyncio.sleep(deadline.cap(random.uniform(1, 3)))
             except Exception as e:
                 logger.error(f"Failed to load Google: {e}")
-                await browser.close()
                 return found_emails
 
-            for query in queries:
+            for query in pending_queries:
+                if len(found_emails) >= max_results:
+                    logger.info(f"Found {len(found_emails)} emails, skipping remaining Google Dorks")
+                    break
+                if deadline.expired:
+                    logger.warning("Deadline reached, skipping remaining Google Dorks")
+                    break
                 try:
                     logger.info(f"Executing Google Dork: {query}")
-                    
+                
                     # Type query into the search box
                     search_box = page.locator('textarea[name="q"]').first
                     if not await search_box.is_visible():
                          # Fallback for some regions/versions
                          search_box = page.locator('input[name="q"]').first
-                         
-                    await search_box.clear()
-                    await self._human_type(page, 'textarea[name="q"]', query)
-                    await asyncio.sleep(random.uniform(0.5, 1.0))
-                    await page.keyboard.press("Enter")
-                    
+                     
+                    with span("google.type", query=query):
+                        await search_box.clear()
+                        await self._human_type(page, 'textarea[name="q"]', query)
+                        await asyncio.sleep(random.uniform(0.5, 1.0))
+                        await page.keyboard.press("Enter")
+                
                     # Wait for results
-                    await page.wait_for_selector('#search', timeout=10000)
-                    await asyncio.sleep(random.uniform(2, 4)) # Read results like a human
-                    
+                    with span("google.results", query=query):
+                        await page.wait_for_selector('#search', timeout=deadline.cap_ms(10))
+                        await asyncio.sleep(deadline.cap(random.uniform(2, 4))) # Read results like a human
+                
                     # Extract content from the results container
                     content = await page.inner_text('#search')
-                    
+                
                     # Extract emails
                     emails = extract_emails_from_text(content)
-                    
+                
                     # Clean and validate
-                    valid_for_query = 0
+                    query_emails = set()
                     for email in emails:
                         # Extra cleanup for google formatting (e.g. 'user@domain.com...' -> 'user@domain.com')
                         clean_email = email.rstrip('.,:;')
                         if validate_email_syntax(clean_email):
-                            found_emails.add(clean_email)
-                            valid_for_query += 1
-                            
-                    logger.info(f"Found {valid_for_query} potential emails for query: {query}")
-                    
+                            query_emails.add(clean_email)
+                
+                    found_emails.update(query_emails)
+                    if self.use_cache:
+                        query_cache.set(normalize_query(query), sorted(query_emails))
+                        
+                    logger.info(f"Found {len(query_emails)} potential emails for query: {query}")
+                
                     # Random sleep between queries
-                    await asyncio.sleep(random.uniform(3, 7))
-                    
+                    with span("google.pause"):
+                        await asyncio.sleep(deadline.cap(random.uniform(3, 7)))
+                
                 except Exception as e:
                     logger.error(f"Error during search '{query}': {str(e)}")
                     continue
             
-            await browser.close()
-            
         return found_emails
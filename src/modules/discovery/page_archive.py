@@ -0,0 +1,96 @@
+import asyncio
+import glob
+import gzip
+import json
+import logging
+import os
+import threading
+import zlib
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class PageArchive:
+    """
+    Append-only archive of scraped pages, for re-running extraction offline.
+
+    Pages go to one gzip file per UTC day (ARCHIVE_DIR/pages-YYYY-MM-DD.jsonl.gz).
+    Each page is one JSON line (url, final_url, domain, status, headers, html,
+    fetched_at) compressed as its own gzip member. Readers see the file as a
+    single stream, and a write torn by a crash only loses that last page.
+    """
+
+    def __init__(self, directory: Optional[str] = None, level: Optional[int] = None):
+        self.directory = str(directory or settings.PAGE_ARCHIVE_DIR)
+        self.level = level or settings.PAGE_ARCHIVE_COMPRESSION_LEVEL
+        self._lock = threading.Lock()
+
+    def path_for(self, day: date) -> str:
+        return os.path.join(self.directory, f"pages-{day.isoformat()}.jsonl.gz")
+
+    def append(self, url: str, domain: str, status: int, headers: Dict[str, str], html: str,
+               final_url: Optional[str] = None):
+        """Archives one page (blocking; compression releases the GIL, so call it via a thread)."""
+        fetched_at = datetime.utcnow()
+        record = {
+            "url": url,
+            "final_url": final_url or url,
+            "domain": domain,
+            "status": status,
+            "headers": headers,
+            "html": html,
+            "fetched_at": fetched_at.isoformat(),
+        }
+        member = gzip.compress(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n", self.level)
+        path = self.path_for(fetched_at.date())
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "ab") as f:
+                f.write(member)
+
+    async def record(self, url: str, domain: str, status: int, headers: Dict[str, str], html: str,
+                     final_url: Optional[str] = None):
+        """Archives a page without blocking the event loop; failures are only logged."""
+        try:
+            await asyncio.to_thread(self.append, url, domain, status, headers, html, final_url)
+        except Exception as e:
+            logger.warning(f"Could not archive {url}: {e}")
+
+    def files(self, since: Optional[date] = None, until: Optional[date] = None) -> List[str]:
+        """Archive files in date order, optionally limited to a day range (inclusive)."""
+        selected = []
+        for path in sorted(glob.glob(os.path.join(self.directory, "pages-*.jsonl.gz"))):
+            try:
+                day = date.fromisoformat(Path(path).name[len("pages-"):-len(".jsonl.gz")])
+            except ValueError:
+                continue
+            if (since and day < since) or (until and day > until):
+                continue
+            selected.append(path)
+        return selected
+
+def iter_archive(paths: List[str], domains: Optional[List[str]] = None) -> Iterator[dict]:
+    """
+    Streams archived page records from the given files, in write order.
+    A truncated last member (crash mid-write) ends that file early.
+    """
+    wanted = {d.lower() for d in domains} if domains else None
+    for path in paths:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Skipping a corrupt record in {path}")
+                        continue
+                    if wanted is None or record.get("domain", "").lower() in wanted:
+                        yield record
+        except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+            logger.warning(f"Archive {path} ends with a damaged record, stopped there: {e}")
+
+page_archive = PageArchive()
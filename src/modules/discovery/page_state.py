@@ -0,0 +1,85 @@
+import hashlib
+import logging
+from typing import Dict, Optional
+
+from src.config.settings import settings
+from src.core.deadline import Deadline
+from src.utils.cache import PersistentCache
+
+logger = logging.getLogger(__name__)
+
+# Per-URL validators and extraction results from the last successful visit.
+# Written by --refresh runs only, so the first refresh of a domain crawls it in full.
+page_state = PersistentCache(
+    "page_state", ttl=settings.PAGE_STATE_TTL, max_entries=settings.PAGE_STATE_MAX_ENTRIES
+)
+
+def content_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+def record_page(url: str, headers: Dict[str, str], body: bytes, emails: Dict[str, str]):
+    """Remembers a page's ETag, Last-Modified, body hash and the emails (with evidence) extracted from it."""
+    page_state.set(url, {
+        "etag": headers.get("etag"),
+        "last_modified": headers.get("last-modified"),
+        "hash": content_hash(body),
+        "emails": emails,
+    })
+
+def _stored_emails(state: dict) -> Dict[str, str]:
+    emails = state.get("emails") or {}
+    # States written before evidence tagging hold a plain list
+    return emails if isinstance(emails, dict) else {email: "page" for email in emails}
+
+class Revisit:
+    """
+    What a conditional request found for a previously visited page: the stored
+    `emails` if it is unchanged, otherwise the new `status`, `headers` and `body`.
+    """
+
+    def __init__(self, emails: Optional[Dict[str, str]] = None, status: int = 0,
+                 headers: Optional[Dict[str, str]] = None, body: bytes = b""):
+        self.emails = emails
+        self.status = status
+        self.headers = headers or {}
+        self.body = body
+
+    @property
+    def unchanged(self) -> bool:
+        return self.emails is not None
+
+async def fetch_if_changed(lease, url: str, deadline: Deadline) -> Optional[Revisit]:
+    """
+    Sends a conditional request for a previously visited page.
+
+    Returns:
+        Revisit | None: The stored emails if the page is unchanged (304, or same body
+        hash), its new content if it changed, or None if it was never seen or the
+        request failed and it must be re-crawled.
+    """
+    state = page_state.get(url)
+    if not state:
+        return None
+
+    headers = {}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+
+    # Goes through the lease's context, so it uses the same UA, proxy and cookies as a navigation
+    response = await lease.context.request.get(url, headers=headers, timeout=deadline.cap_ms(10))
+    try:
+        if response.status == 304:
+            logger.info(f"Unchanged (304): {url}")
+            return Revisit(_stored_emails(state))
+        if not response.ok:
+            return None
+        body = await response.body()
+        if content_hash(body) == state["hash"]:
+            logger.info(f"Unchanged (same content): {url}")
+            record_page(url, response.headers, body, _stored_emails(state))
+            return Revisit(_stored_emails(state))
+        return Revisit(status=response.status, headers=response.headers, body=body)
+    finally:
+        await response.dispose()
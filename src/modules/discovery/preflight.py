@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import time
+import urllib.parse
+from typing import Iterable, List, Optional
+
+from src.config.settings import settings
+from src.core.deadline import Deadline
+from src.core.tracing import span
+from src.utils.cache import PersistentCache
+
+logger = logging.getLogger(__name__)
+
+# Common multi-label public suffixes. Anything not listed is treated as a
+# single-label TLD, so 'www.shop.example.com' -> 'example.com' and
+# 'blog.empresa.com.br' -> 'empresa.com.br'.
+MULTI_LABEL_SUFFIXES = {
+    "com.br", "net.br", "org.br", "gov.br", "edu.br", "art.br", "blog.br", "eco.br", "ind.br", "inf.br",
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "ltd.uk", "plc.uk", "me.uk",
+    "com.au", "net.au", "org.au", "edu.au", "gov.au",
+    "co.nz", "org.nz", "co.za", "co.in", "net.in", "org.in", "co.jp", "ne.jp", "or.jp", "co.kr",
+    "com.ar", "com.mx", "com.co", "com.pe", "com.uy", "com.py", "com.ve", "com.ec", "cl.cl",
+    "com.pt", "com.es", "com.tr", "com.cn", "com.hk", "com.sg", "com.tw", "com.my", "com.ph",
+    "co.id", "co.il", "co.th",
+}
+
+# Domains known to be dead or mail-less, so later runs skip them without DNS.
+negative_cache = PersistentCache("preflight_negative", ttl=settings.PREFLIGHT_NEGATIVE_TTL)
+
+class DomainTriage:
+    """Pre-flight verdict for a domain."""
+
+    # ok: has MX. no_mail: resolves but has no MX. dead: does not resolve.
+    # unknown: DNS timed out or failed; the pipeline still runs.
+    RUNNABLE = {"ok", "unknown"}
+
+    def __init__(self, domain: str, status: str, has_address: bool = False, has_mx: bool = False,
+                 cached: bool = False, latency: float = 0.0):
+        self.domain = domain
+        self.status = status
+        self.has_address = has_address
+        self.has_mx = has_mx
+        self.cached = cached
+        self.latency = latency
+
+    @property
+    def runnable(self) -> bool:
+        return self.status in self.RUNNABLE
+
+    def __repr__(self) -> str:
+        return f"DomainTriage({self.domain!r}, {self.status!r})"
+
+def normalize_domain(raw: str) -> Optional[str]:
+    """
+    Reduces a raw input line (URL, host, 'www.' variant) to its registrable domain.
+
+    Args:
+        raw (str): Input such as 'https://www.Example.com/contact' or 'example.com.'.
+
+    Returns:
+        str | None: e.g. 'example.com' (IDNA-encoded), or None if unusable.
+    """
+    if not raw:
+        return None
+    value = raw.strip()
+    if not value or value.startswith("#"):
+        return None
+
+    if "://" not in value:
+        value = f"//{value}"
+    host = urllib.parse.urlsplit(value).hostname
+    if not host:
+        return None
+
+    host = host.strip(".").lower()
+    try:
+        host = host.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+
+    labels = host.split(".")
+    if len(labels) < 2 or not all(labels):
+        return None
+
+    keep = 3 if ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES else 2
+    return ".".join(labels[-keep:])
+
+def normalize_domains(raw_domains: Iterable[str]) -> List[str]:
+    """Normalizes and deduplicates input domains, preserving first-seen order."""
+    seen = {}
+    for raw in raw_domains:
+        domain = normalize_domain(raw)
+        if domain and domain not in seen:
+            seen[domain] = None
+        elif raw and raw.strip() and not domain:
+            logger.warning(f"Skipping unparseable domain input: {raw.strip()}")
+    return list(seen)
+
+async def _resolve(resolver, domain: str, rdtype: str) -> Optional[bool]:
+    """True if records exist, False if definitively absent, None if the lookup failed."""
+    import dns.exception
+    import dns.resolver
+
+    try:
+        answers = await resolver.resolve(domain, rdtype)
+        return len(answers) > 0
+    except dns.resolver.NXDOMAIN:
+        return False
+    except dns.resolver.NoAnswer:
+        return False
+    except (dns.exception.Timeout, dns.resolver.NoNameservers):
+        return None
+    except Exception as e:
+        logger.debug(f"{rdtype} lookup error for {domain}: {e}")
+        return None
+
+async def triage_domain(domain: str, use_cache: bool = True, deadline: Optional[Deadline] = None) -> DomainTriage:
+    """
+    Resolves A, AAAA and MX for a domain in parallel and classifies it.
+    Dead and mail-less verdicts are stored in the negative cache.
+    """
+    if use_cache:
+        cached_status = negative_cache.get(domain)
+        if cached_status:
+            return DomainTriage(domain, cached_status, cached=True)
+
+    import dns.asyncresolver
+
+    deadline = deadline or Deadline()
+    resolver = dns.asyncresolver.Resolver()
+    resolver.timeout = deadline.cap(settings.DNS_TIMEOUT)
+    resolver.lifetime = deadline.cap(settings.DNS_TIMEOUT)
+
+    start = time.perf_counter()
+    with span("dns.triage", domain=domain):
+        a, aaaa, mx = await asyncio.gather(
+            _resolve(resolver, domain, "A"),
+            _resolve(resolver, domain, "AAAA"),
+            _resolve(resolver, domain, "MX"),
+        )
+    latency = time.perf_counter() - start
+
+    has_address = bool(a or aaaa)
+    if mx:
+        status = "ok"
+    elif None in (a, aaaa, mx):
+        status = "unknown"
+    elif has_address:
+        status = "no_mail"
+    else:
+        status = "dead"
+
+    if status in ("dead", "no_mail") and use_cache:
+        negative_cache.set(domain, status)
+
+    return DomainTriage(domain, status, has_address=has_address, has_mx=bool(mx), latency=latency)
+
+async def triage_domains(raw_domains: Iterable[str], use_cache: bool = True) -> List[DomainTriage]:
+    """
+    Normalizes, deduplicates and triages a batch of domains concurrently.
+
+    Returns:
+        List[DomainTriage]: One verdict per unique registrable domain, in input order.
+    """
+    domains = normalize_domains(raw_domains)
+    semaphore = asyncio.Semaphore(settings.PREFLIGHT_CONCURRENCY)
+
+    async def _bounded(domain: str) -> DomainTriage:
+        async with semaphore:
+            return await triage_domain(domain, use_cache=use_cache)
+
+    verdicts = await asyncio.gather(*(_bounded(d) for d in domains))
+    for verdict in verdicts:
+        if not verdict.runnable:
+            logger.info(f"Pre-flight: skipping {verdict.domain} ({verdict.status}{', cached' if verdict.cached else ''})")
+    return list(verdicts)
@@ -1,122 +1,242 @@
 import asyncio
 import logging
-from typing import List, Set
-from playwright.async_api import async_playwright, Page, BrowserContext
+import re
+import urllib.parse
+from typing import Dict, List, Optional, Set
 
 from src.modules.enrichment.extractor import extract_emails_from_text
 from src.modules.verification.syntax import validate_email_syntax
-from src.utils.browser import browser_utils
+from src.modules.discovery.page_archive import page_archive
+from src.modules.discovery.page_state import Revisit, fetch_if_changed, record_page
+from src.utils.browser_pool import get_browser_supervisor, is_browser_failure
+from src.core.deadline import Deadline
+from src.core.offload import run_cpu_bound
+from src.config.settings import settings
+from src.core.tracing import span
 
 logger = logging.getLogger(__name__)
 
+# When an address is found several ways on a page, keep the strongest evidence.
+EVIDENCE_RANK = {"mailto": 3, "text": 2, "link": 1, "page": 0}
+
+def _merge_evidence(found: Dict[str, str], email: str, kind: str):
+    if EVIDENCE_RANK.get(kind, 0) >= EVIDENCE_RANK.get(found.get(email), -1):
+        found[email] = kind
+
+# Pages to check, most productive first (max_pages takes a prefix). The extra
+# ones are only tried on request (thorough profile): each costs a navigation
+# even when it 404s.
+COMMON_PATHS = ["/", "/contact", "/about", "/team", "/contato", "/sobre", "/equipe"]
+EXTRA_PATHS = ["/contact-us", "/fale-conosco", "/imprint", "/impressum", "/privacy", "/politica-de-privacidade"]
+
+MAILTO_REGEX = re.compile(r"mailto:([^\"'?>\s]+)", re.IGNORECASE)
+
+def extract_from_html(html: str) -> Dict[str, str]:
+    """
+    Syntax-valid emails in raw page HTML with their evidence: 'mailto' for
+    mailto: links, 'page' for anything else the regex finds. Runs on live pages
+    (where the DOM pass adds 'text' and 'link' evidence) and on archived pages
+    during replay.
+    """
+    found = {email: "page" for email in extract_emails_from_text(html)}
+    for target in MAILTO_REGEX.findall(html):
+        _merge_evidence(found, urllib.parse.unquote(target).strip(), "mailto")
+    return {email: kind for email, kind in found.items() if validate_email_syntax(email)}
+
 class DomainScraper:
     def __init__(self, headless: bool = True):
         self.headless = headless
-        
-    async def scrape_domain(self, domain: str, max_pages: int = 5) -> Set[str]:
+
+    async def scrape_domain(
+        self, domain: str, max_pages: int = 5, deadline: Optional[Deadline] = None, refresh: bool = False
+    ) -> Set[str]:
+        """Scrapes a domain for email addresses. See `scrape_domain_tagged`."""
+        return set(await self.scrape_domain_tagged(domain, max_pages, deadline, refresh))
+
+    async def scrape_domain_tagged(
+        self, domain: str, max_pages: int = 5, deadline: Optional[Deadline] = None, refresh: bool = False,
+        max_emails: Optional[int] = None, extra_paths: bool = False
+    ) -> Dict[str, str]:
         """
         Scrapes a domain for email addresses, visiting common pages.
-        
+
         Args:
             domain (str): The domain to scrape (e.g., 'example.com').
             max_pages (int): Maximum number of pages to visit.
-            
+            deadline (Deadline | None): Stop visiting pages once it passes and return what was found.
+            refresh (bool): Send conditional requests for pages seen before: reuse their
+                stored emails when unchanged, and extract changed ones from the response
+                body instead of rendering them. Also records page state for the next refresh.
+            max_emails (int | None): Stop visiting pages once this many emails were found.
+            extra_paths (bool): Also try the less common pages in EXTRA_PATHS.
+
         Returns:
-            Set[str]: A set of unique, syntax-valid emails found.
+            Dict[str, str]: Syntax-valid emails mapped to their strongest evidence
+            ('mailto', 'text', 'link' or 'page').
         """
         # Ensure protocol
         if not domain.startswith("http"):
             base_url = f"https://{domain}"
         else:
             base_url = domain
-            
-        found_emails = set()
+
+        deadline = deadline or Deadline()
+        found_emails: Dict[str, str] = {}
         visited_urls = set()
-        
-        # Common paths to check
-        paths_to_check = ["/", "/contact", "/about", "/team", "/contato", "/sobre", "/equipe"]
+        unchanged = 0
+
+        paths_to_check = COMMON_PATHS + EXTRA_PATHS if extra_paths else COMMON_PATHS
         urls_to_visit = [f"{base_url.rstrip('/')}{path}" for path in paths_to_check]
-        
-        async with async_playwright() as p:
-            # Optimize: Disable images and unnecessary resources
-            browser = await p.chromium.launch(headless=self.headless)
-            
-            # Use safe context with randomized UA/Proxy
-            context = await browser_utils.new_safe_context(browser)
-            
-            # Block resources for performance
-            await context.route("**/*", lambda route: route.abort() 
-                if route.request.resource_type in ["image", "media", "stylesheet", "font"] 
-                else route.continue_()
-            )
-            
-            page = await context.new_page()
-            
+
+        # Pages come from the shared, supervised browser. Resources and third-party
+        # trackers are blocked inside the browser (no per-request Python hop).
+        supervisor = get_browser_supervisor(self.headless)
+        async with supervisor.lease(exclude_domain=urllib.parse.urlsplit(base_url).hostname) as lease:
             for url in urls_to_visit:
                 if len(visited_urls) >= max_pages:
                     break
-                
-                try:
-                    logger.info(f"Visiting {url}...")
-                    # Wait for network idle to ensure SPAs are loaded
-                    response = None
+                if max_emails is not None and len(found_emails) >= max_emails:
+                    logger.info(f"Found {len(found_emails)} emails on {domain}, enough for this source")
+                    break
+                if deadline.expired:
+                    logger.warning(f"Deadline reached, stopping scrape of {domain} after {len(visited_urls)} pages")
+                    break
+
+                if refresh:
+                    try:
+                        with span("page.conditional_get", url=url):
+                            revisit = await fetch_if_changed(lease, url, deadline)
+                    except Exception as e:
+                        logger.debug(f"Conditional request failed for {url}: {e}")
+                        revisit = None
+                    if revisit is not None:
+                        if revisit.unchanged:
+                            emails = revisit.emails
+                            unchanged += 1
+                        else:
+                            emails = await self._extract_revisit(domain, url, revisit)
+                        # A changed page with no emails in its HTML may render them with JS: load it
+                        if revisit.unchanged or emails:
+                            for email, kind in emails.items():
+                                _merge_evidence(found_emails, email, kind)
+                            visited_urls.add(url)
+                            continue
+
+                for attempt in range(2):
                     try:
-                        response = await page.goto(url, timeout=15000, wait_until="domcontentloaded")
-                        await page.wait_for_load_state("networkidle", timeout=5000)
-                    except Exception:
-                        pass # Continue even if networkidle times out
-                    
-                    if not response or response.status >= 400:
-                        logger.warning(f"Failed to load {url} (Status: {response.status if response else 'Unknown'})")
-                        continue
-                        
-                    content = await page.content()
-                    
-                    # 1. Regex on full HTML content
-                    raw_emails = extract_emails_from_text(content)
-                    
-                    # 2. Advanced DOM Extraction (JS Execution)
-                    # Extracts from: mailto links, generic hrefs, and visible text nodes
-                    dom_emails = await page.evaluate("""() => {
-                        const emails = new Set();
-                        const emailRegex = /[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}/g;
-                        
-                        // 1. Scan all 'href' attributes
-                        document.querySelectorAll('*[href]').forEach(el => {
-                            const href = el.getAttribute('href');
-                            if (href && href.includes('mailto:')) {
-                                emails.add(href.replace('mailto:', '').split('?')[0]);
-                            } else if (href && href.match(emailRegex)) {
-                                const match = href.match(emailRegex);
-                                if (match) match.forEach(e => emails.add(e));
-                            }
-                        });
-
-                        // 2. Scan visible text
-                        const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT, null, false);
-                        let node;
-                        while (node = walker.nextNode()) {
-                            if (node.parentElement && node.parentElement.offsetParent !== null) { // Check visibility
-                                const matches = node.nodeValue.match(emailRegex);
-                                if (matches) matches.forEach(e => emails.add(e));
-                            }
-                        }
-                        
-                        return Array.from(emails);
-                    }""")
-                    raw_emails.update(dom_emails)
-                    
-                    # Filter valid emails
-                    for email in raw_emails:
-                        if validate_email_syntax(email):
-                            found_emails.add(email)
-                            
-                    visited_urls.add(url)
-                    
-                except Exception as e:
-                    logger.error(f"Error scraping {url}: {str(e)}")
-                    continue
-            
-            await browser.close()
-            
+                        with span("page.scrape", url=url, attempt=attempt):
+                            emails = await self._scrape_page(lease, domain, url, deadline, record_state=refresh)
+                        if emails is not None:
+                            for email, kind in emails.items():
+                                _merge_evidence(found_emails, email, kind)
+                            visited_urls.add(url)
+                        break
+                    except Exception as e:
+                        if attempt == 0 and is_browser_failure(e):
+                            # Browser crashed or was restarted under us: retry on a fresh page
+                            logger.warning(f"Browser failure on {url}, retrying on a fresh page: {e}")
+                            await lease.renew()
+                            continue
+                        logger.error(f"Error scraping {url}: {str(e)}")
+                        break
+
+        if refresh:
+            logger.info(f"Refresh of {domain}: {unchanged}/{len(visited_urls)} pages unchanged")
         return found_emails
+
+    async def _scrape_page(
+        self, lease, domain: str, url: str, deadline: Deadline, record_state: bool = False
+    ) -> Optional[Dict[str, str]]:
+        """Visits one URL and returns its syntax-valid emails with evidence, or None if it didn't load."""
+        page = lease.page
+        logger.info(f"Visiting {url}...")
+        # Wait for network idle to ensure SPAs are loaded
+        response = None
+        try:
+            with span("page.goto") as goto_span:
+                response = await lease.goto(url, timeout=deadline.cap_ms(15), wait_until="domcontentloaded")
+                if goto_span and response:
+                    goto_span.set(status=response.status)
+            with span("page.networkidle"):
+                await page.wait_for_load_state("networkidle", timeout=deadline.cap_ms(5))
+        except Exception as e:
+            if is_browser_failure(e):
+                raise
+            pass # Continue even if networkidle times out
+
+        if not response or response.status >= 400:
+            logger.warning(f"Failed to load {url} (Status: {response.status if response else 'Unknown'})")
+            return None
+
+        with span("page.extract"):
+            return await self._extract(lease, domain, url, page, response, record_state)
+
+    async def _extract_revisit(self, domain: str, url: str, revisit: Revisit) -> Dict[str, str]:
+        """Pulls emails out of a changed page's conditional-GET body, without rendering it."""
+        content = revisit.body.decode("utf-8", errors="replace")
+        if settings.PAGE_ARCHIVE_ENABLED:
+            await page_archive.record(url, domain, revisit.status, revisit.headers, content)
+        emails = await run_cpu_bound(extract_from_html, content, size=len(content))
+        logger.info(f"Changed: {url} ({len(emails)} emails in its HTML)")
+        if emails:
+            record_page(url, revisit.headers, revisit.body, emails)
+        return emails
+
+    async def _extract(self, lease, domain: str, url: str, page, response, record_state: bool = False) -> Dict[str, str]:
+        """Pulls emails (with evidence) out of a loaded page; with `record_state`, also records its validators."""
+        content = await page.content()
+        headers = await response.all_headers() if settings.PAGE_ARCHIVE_ENABLED or record_state else {}
+        if settings.PAGE_ARCHIVE_ENABLED:
+            # Raw HTML kept for offline re-extraction (`replay`)
+            await page_archive.record(url, domain, response.status, headers, content, final_url=page.url)
+
+        # 1. Regex on full HTML content (off the event loop for big pages)
+        raw_emails = await run_cpu_bound(extract_from_html, content, size=len(content))
+
+        # 2. Advanced DOM Extraction (JS Execution)
+        # Extracts from: mailto links, generic hrefs, and visible text nodes
+        dom_emails = await page.evaluate("""() => {
+            const emails = [];
+            const emailRegex = /[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}/g;
+
+            // 1. Scan all 'href' attributes
+            document.querySelectorAll('*[href]').forEach(el => {
+                const href = el.getAttribute('href');
+                if (href && href.includes('mailto:')) {
+                    emails.push([href.replace('mailto:', '').split('?')[0], 'mailto']);
+                } else if (href && href.match(emailRegex)) {
+                    const match = href.match(emailRegex);
+                    if (match) match.forEach(e => emails.push([e, 'link']));
+                }
+            });
+
+            // 2. Scan visible text
+            const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT, null, false);
+            let node;
+            while (node = walker.nextNode()) {
+                if (node.parentElement && node.parentElement.offsetParent !== null) { // Check visibility
+                    const matches = node.nodeValue.match(emailRegex);
+                    if (matches) matches.forEach(e => emails.push([e, 'text']));
+                }
+            }
+
+            return emails;
+        }""")
+        for email, kind in dom_emails:
+            _merge_evidence(raw_emails, email, kind)
+
+        if lease.request_stats:
+            allowed, blocked = await lease.request_stats.collect()
+            logger.debug(f"Requests on {url}: {allowed} allowed, {blocked} blocked")
+
+        # Filter valid emails
+        emails = {email: kind for email, kind in raw_emails.items() if validate_email_syntax(email)}
+
+        if record_state:
+            # Validators and the raw body's hash (what a conditional GET sees) for the next re-scan
+            try:
+                record_page(url, headers, await response.body(), emails)
+            except Exception as e:
+                logger.debug(f"Could not record page state for {url}: {e}")
+
+        return emails
@@ -0,0 +1,230 @@
+import abc
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Type
+
+from src.config.profiles import PipelineProfile, get_profile
+from src.config.settings import settings
+from src.core.deadline import Deadline
+from src.core.tracing import span
+from src.modules.discovery.scraper import DomainScraper
+from src.modules.discovery.google_search import GoogleSearcher
+from src.modules.enrichment.formats import format_store
+from src.modules.enrichment.patterns import generate_common_aliases, generate_name_patterns
+from src.modules.enrichment.scoring import SOURCE_PRIORS
+from src.modules.verification.syntax import validate_email_syntax
+
+logger = logging.getLogger(__name__)
+
+# Registry of available discovery sources, keyed by source name.
+SOURCE_REGISTRY: Dict[str, Type["DiscoverySource"]] = {}
+
+def register_source(cls: Type["DiscoverySource"]) -> Type["DiscoverySource"]:
+    """Class decorator that makes a discovery source available to the pipeline."""
+    if not cls.name:
+        raise ValueError(f"Discovery source {cls.__name__} must define a name")
+    SOURCE_REGISTRY[cls.name] = cls
+    return cls
+
+class DiscoveryRequest:
+    """What a source is asked to discover, and under which constraints."""
+
+    def __init__(self, domain: str, input_name: Optional[str] = None,
+                 deadline: Optional[Deadline] = None, refresh: bool = False,
+                 profile: Optional[PipelineProfile] = None):
+        self.domain = domain
+        self.input_name = input_name
+        self.deadline = deadline or Deadline()
+        self.refresh = refresh # Incremental re-scan: reuse unchanged pages
+        self.profile = profile or get_profile() # Page/query/alias budgets
+
+class DiscoverySource(abc.ABC):
+    """
+    Base class for anything that produces candidate emails for a domain.
+
+    Subclasses set `name` and implement `discover`, returning a mapping of
+    email -> evidence kind (e.g. 'page', 'dork', 'alias'). Sources should
+    honour the request deadline and return partial results when it passes,
+    and stop working once they have `max_results` addresses.
+    """
+    name: str = ""
+
+    def __init__(self, timeout: Optional[float] = None, max_results: Optional[int] = None):
+        self.timeout = timeout if timeout is not None else settings.DISCOVERY_SOURCE_TIMEOUTS.get(
+            self.name, settings.DISCOVERY_SOURCE_TIMEOUT
+        )
+        self.max_results = max_results if max_results is not None else settings.DISCOVERY_MAX_RESULTS
+
+    @abc.abstractmethod
+    async def discover(self, request: DiscoveryRequest) -> Dict[str, str]:
+        ...
+
+class SourceReport:
+    """Outcome of a single source run: what it yielded and what it cost."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.emails: Dict[str, str] = {}
+        self.latency: float = 0.0
+        self.status: str = "pending" # ok, timeout, error
+        self.error: Optional[str] = None
+
+    @property
+    def yield_count(self) -> int:
+        return len(self.emails)
+
+    def as_dict(self) -> dict:
+        return {
+            "source": self.name,
+            "status": self.status,
+            "yield": self.yield_count,
+            "latency": round(self.latency, 3),
+            "error": self.error,
+        }
+
+@register_source
+class ScraperSource(DiscoverySource):
+    """Visits the domain's common pages with a headless browser."""
+    name = "scraper"
+
+    async def discover(self, request: DiscoveryRequest) -> Dict[str, str]:
+        return await DomainScraper().scrape_domain_tagged(
+            request.domain, max_pages=request.profile.max_pages, deadline=request.deadline, refresh=request.refresh,
+            max_emails=self.max_results, extra_paths=request.profile.extra_paths
+        )
+
+@register_source
+class GoogleDorkSource(DiscoverySource):
+    """Runs search-engine dorks for the domain."""
+    name = "google"
+
+    @staticmethod
+    def build_dorks(domain: str) -> List[str]:
+        """Dorks in priority order; profiles run the first `max_queries`."""
+        return [
+            f'site:linkedin.com "{domain}" "email"',
+            f'site:{domain} "email"',
+            f'"{domain}" "contact" email',
+            f'"@{domain}" -site:{domain}',
+            f'site:{domain} "contato" OR "fale conosco" OR "e-mail"'
+        ]
+
+    async def discover(self, request: DiscoveryRequest) -> Dict[str, str]:
+        dorks = self.build_dorks(request.domain)[:request.profile.max_queries]
+        if not dorks:
+            return {}
+        emails = await GoogleSearcher().search(dorks, max_results=self.max_results, deadline=request.deadline)
+        return {email: "dork" for email in emails}
+
+@register_source
+class PatternSource(DiscoverySource):
+    """
+    Predicts role aliases and, when a name is given, personal address patterns.
+    If the domain's format is already known, only that pattern is generated
+    (the pipeline tries the others if the server rejects it).
+    """
+    name = "patterns"
+
+    async def discover(self, request: DiscoveryRequest) -> Dict[str, str]:
+        predicted = {}
+        if request.input_name:
+            known_format = format_store.dominant(request.domain)
+            logger.info(
+                f"Generating patterns for name: {request.input_name}"
+                + (f" (known format: {known_format})" if known_format else "")
+            )
+            predicted.update({
+                email: "pattern" for email in generate_name_patterns(
+                    request.input_name, request.domain, [known_format] if known_format else None
+                )
+            })
+
+        for email in generate_common_aliases(request.domain)[:request.profile.max_aliases]:
+            predicted.setdefault(email, "alias")
+
+        return {email: kind for email, kind in predicted.items() if validate_email_syntax(email)}
+
+def get_enabled_sources(names: Optional[List[str]] = None) -> List[DiscoverySource]:
+    """
+    Instantiates the requested sources (defaults to settings.DISCOVERY_SOURCES).
+    Unknown names are logged and skipped.
+    """
+    sources = []
+    for name in names if names is not None else settings.DISCOVERY_SOURCES:
+        source_cls = SOURCE_REGISTRY.get(name)
+        if not source_cls:
+            logger.warning(f"Unknown discovery source '{name}', skipping")
+            continue
+        sources.append(source_cls())
+    return sources
+
+def _strongest(emails: Dict[str, str], limit: int) -> Dict[str, str]:
+    """Keeps at most `limit` emails, strongest evidence first (a source may overshoot by one page or query)."""
+    if len(emails) <= limit:
+        return emails
+    ranked = sorted(emails.items(), key=lambda item: SOURCE_PRIORS.get(item[1], 0), reverse=True)
+    return dict(ranked[:limit])
+
+# Extra time a source gets past its deadline to wind down and hand back partial
+# results before it is cancelled outright.
+SOURCE_GRACE_SECONDS = 5
+
+async def _run_source(source: DiscoverySource, request: DiscoveryRequest) -> SourceReport:
+    report = SourceReport(source.name)
+    source_deadline = request.deadline.child(source.timeout)
+    source_request = DiscoveryRequest(
+        request.domain, request.input_name, source_deadline, request.refresh, request.profile
+    )
+    start = time.perf_counter()
+    try:
+        with span(f"source.{source.name}"):
+            emails = await asyncio.wait_for(
+                source.discover(source_request),
+                timeout=source_deadline.remaining() + SOURCE_GRACE_SECONDS
+            )
+        report.emails = _strongest(emails, source.max_results)
+        report.status = "timeout" if source_deadline.expired else "ok"
+    except asyncio.TimeoutError:
+        report.status = "timeout"
+        report.error = f"Exceeded {source.timeout}s deadline"
+    except Exception as e:
+        report.status = "error"
+        report.error = str(e)
+    report.latency = time.perf_counter() - start
+
+    logger.info(
+        f"Source '{report.name}': {report.yield_count} emails in {report.latency:.2f}s ({report.status})"
+        + (f" - {report.error}" if report.error else "")
+    )
+    return report
+
+async def run_discovery(
+    domain: str,
+    input_name: Optional[str] = None,
+    sources: Optional[List[DiscoverySource]] = None,
+    deadline: Optional[Deadline] = None,
+    refresh: bool = False,
+    profile: Optional[PipelineProfile] = None
+) -> List[SourceReport]:
+    """
+    Runs all enabled discovery sources concurrently, each under its own
+    deadline and result cap. A slow or failing source never blocks the others.
+
+    Args:
+        domain (str): The target domain.
+        input_name (str | None): Optional person name for pattern sources.
+        sources (list | None): Source instances to run (defaults to enabled sources).
+        deadline (Deadline | None): Overall deadline; per-source deadlines never exceed it.
+        refresh (bool): Incremental re-scan; sources may reuse unchanged content.
+        profile (PipelineProfile | None): Budgets; also picks the default sources.
+
+    Returns:
+        List[SourceReport]: One report per source, in the order they were given.
+    """
+    profile = get_profile(profile)
+    if sources is None:
+        sources = get_enabled_sources(profile.sources)
+    request = DiscoveryRequest(domain, input_name, deadline, refresh, profile)
+
+    return list(await asyncio.gather(*(_run_source(s, request) for s in sources)))
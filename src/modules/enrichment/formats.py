@@ -0,0 +1,156 @@
+import logging
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.config.settings import settings
+from src.modules.enrichment.patterns import NAME_FORMATS, ROLE_ALIASES, split_name
+from src.modules.enrichment.scoring import ROLE_PRIORS
+from src.utils.cache import PersistentCache
+
+logger = logging.getLogger(__name__)
+
+# Evidence kinds that come from a real page or search result, not a guess.
+OBSERVED_KINDS = {"mailto", "text", "link", "page", "dork"}
+
+NON_PERSONAL_LOCALS = set(ROLE_ALIASES) | set(ROLE_PRIORS)
+
+# Words that make a dotted/underscored local part a department, not a person
+# (customer.service@, fale_conosco@, no.reply@).
+NON_NAME_WORDS = NON_PERSONAL_LOCALS | {
+    "customer", "customers", "service", "services", "client", "clients", "cliente", "clientes",
+    "help", "helpdesk", "desk", "office", "mail", "email", "news", "newsletter", "press", "media",
+    "billing", "invoice", "invoices", "accounts", "accounting", "finance", "financeiro", "orders",
+    "order", "shop", "store", "loja", "jobs", "job", "careers", "career", "privacy", "legal", "dpo",
+    "partners", "partner", "events", "booking", "reservas", "reply", "no", "do", "not", "noreply",
+    "fale", "conosco", "sac", "ouvidoria", "rh", "compras", "pedidos", "faturamento", "cobranca",
+    "juridico", "imprensa", "parcerias", "social", "web", "online", "group", "general", "all",
+}
+
+# Distinct addresses remembered per format (hits and misses), enough to decide on.
+MAX_TRACKED_LOCALS = 50
+
+def match_format(local: str, full_name: str) -> Optional[str]:
+    """Which known format turns `full_name` into `local`, if any."""
+    first, last = split_name(full_name)
+    if not first:
+        return None
+    for format_name, build in NAME_FORMATS.items():
+        if format_name != "first" and not last:
+            continue
+        if build(first, last) == local:
+            return format_name
+    return None
+
+def guess_format(local: str) -> Optional[str]:
+    """
+    Infers the format of a personal address without knowing the name.
+    Only separator-based formats are unambiguous ('joao' could be first or flast),
+    and only when no part is a role or department word ('customer.service').
+    """
+    if local in NON_PERSONAL_LOCALS or any(part in NON_NAME_WORDS for part in re.split(r"[._]", local)):
+        return None
+    if re.fullmatch(r"[a-z]{2,}\.[a-z]{2,}", local):
+        return "first.last"
+    if re.fullmatch(r"[a-z]{2,}_[a-z]{2,}", local):
+        return "first_last"
+    return None
+
+class FormatStore:
+    """
+    Per-domain evidence for address formats, kept across runs.
+
+    Only verified addresses count: a 'valid' address in a format is a hit,
+    a guess in that format rejected by the server ('invalid') is a miss.
+    Each address counts once however often it is seen, so a format needs
+    FORMAT_MIN_EVIDENCE distinct addresses (net of misses) to be trusted,
+    and a wrong lock decays as its guesses keep being rejected.
+    """
+
+    def __init__(self):
+        self._cache = PersistentCache("email_formats", ttl=settings.FORMAT_TTL)
+
+    def _evidence(self, domain: str) -> Dict[str, Dict[str, List[str]]]:
+        evidence = self._cache.get(domain)
+        if not isinstance(evidence, dict) or "hits" not in evidence:
+            # Nothing yet, or a tally from before only verified addresses counted
+            return {"hits": {}, "misses": {}}
+        return evidence
+
+    def _record(self, domain: str, kind: str, format_name: Optional[str], local: str):
+        if not format_name:
+            return
+        evidence = self._evidence(domain)
+        locals_seen = evidence[kind].setdefault(format_name, [])
+        if local in locals_seen:
+            return
+        locals_seen.append(local)
+        del locals_seen[:-MAX_TRACKED_LOCALS]
+        self._cache.set(domain, evidence)
+
+    def observe(self, domain: str, format_name: Optional[str], local: str):
+        """Records a verified address `local`@domain written in `format_name`."""
+        self._record(domain, "hits", format_name, local)
+
+    def reject(self, domain: str, format_name: Optional[str], local: str):
+        """Records a guess in `format_name` that the domain's server rejected."""
+        self._record(domain, "misses", format_name, local)
+
+    def record_guess(self, domain: str, local: str, full_name: str, status: str):
+        """Learns from a verified name guess: 'valid' is a hit for its format, 'invalid' a miss."""
+        if status == "valid":
+            self.observe(domain, match_format(local, full_name), local)
+        elif status == "invalid":
+            self.reject(domain, match_format(local, full_name), local)
+
+    def counts(self, domain: str) -> Dict[str, Tuple[int, int]]:
+        """(hits, misses) per format with any evidence."""
+        evidence = self._evidence(domain)
+        formats = set(evidence["hits"]) | set(evidence["misses"])
+        return {
+            format_name: (len(evidence["hits"].get(format_name, [])), len(evidence["misses"].get(format_name, [])))
+            for format_name in formats
+        }
+
+    def dominant(self, domain: str) -> Optional[str]:
+        """The domain's format if enough verified addresses use it and few guesses in it failed, else None."""
+        counts = self.counts(domain)
+        total_hits = sum(hits for hits, _ in counts.values())
+        if not total_hits:
+            return None
+        format_name, (top, misses) = max(counts.items(), key=lambda item: item[1][0] - item[1][1])
+        if top - misses < settings.FORMAT_MIN_EVIDENCE or top / total_hits < settings.FORMAT_MIN_SHARE:
+            return None
+        return format_name
+
+    def ranked_formats(self, domain: str, prefer: Optional[str] = None) -> List[str]:
+        """
+        Every format, in the order to try them for a new name: the dominant
+        one first, then `prefer` (e.g. a format seen on the site but not
+        verified yet), then by net verified evidence.
+        """
+        counts = self.counts(domain)
+        first = [f for f in (self.dominant(domain), prefer) if f in NAME_FORMATS]
+        rest = sorted(
+            (f for f in NAME_FORMATS if f not in first),
+            key=lambda format_name: -(counts.get(format_name, (0, 0))[0] - counts.get(format_name, (0, 0))[1])
+        )
+        return list(dict.fromkeys(first)) + rest
+
+    def learn_from_leads(self, domain: str, leads: Iterable[dict], input_name: Optional[str] = None):
+        """
+        Updates the evidence from a pipeline run: verified guesses for the input
+        name are hits or misses for their format, and scraped/searched personal
+        addresses on the domain count once they verify as 'valid'.
+        """
+        for lead in leads:
+            local, _, email_domain = lead["email"].partition("@")
+            if email_domain != domain:
+                continue
+            if input_name and lead["status"] in ("valid", "invalid") and match_format(local, input_name):
+                self.record_guess(domain, local, input_name, lead["status"])
+                continue
+            kinds = set((lead.get("provenance") or {}).get("sources", {}).values())
+            if lead["status"] == "valid" and kinds & OBSERVED_KINDS:
+                self.observe(domain, guess_format(local), local)
+
+format_store = FormatStore()
@@ -0,0 +1,98 @@
+import logging
+import urllib.parse
+from typing import Dict, Iterator, Optional, Set
+
+from src.modules.verification.syntax import validate_email_syntax
+
+logger = logging.getLogger(__name__)
+
+def normalize_email(raw: str) -> Optional[str]:
+    """
+    Reduces a scraped spelling to a canonical address.
+
+    URL-decodes, strips 'mailto:' and any query/fragment residue, lowercases
+    (local parts are treated as case-insensitive, as virtually every mail
+    provider does) and IDNA-encodes the domain.
+
+    Args:
+        raw (str): e.g. 'mailto:Info@Example.com?subject=Hi' or '%20info@example.com'.
+
+    Returns:
+        str | None: e.g. 'info@example.com', or None if nothing valid remains.
+    """
+    if not raw or not isinstance(raw, str):
+        return None
+
+    value = urllib.parse.unquote(raw).strip()
+    if value.lower().startswith("mailto:"):
+        value = value[len("mailto:"):]
+    value = value.split("?", 1)[0].split("#", 1)[0]
+    value = value.strip(" \t\r\n<>\"'").rstrip(".,;:)]}")
+
+    if value.count("@") != 1:
+        return None
+    local, domain = value.split("@")
+    local = local.strip().lower()
+    domain = domain.strip().strip(".").lower()
+    if not local or not domain:
+        return None
+
+    try:
+        domain = domain.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+
+    email = f"{local}@{domain}"
+    return email if validate_email_syntax(email) else None
+
+class Candidate:
+    """One canonical address plus every spelling and source it was found under."""
+
+    def __init__(self, email: str):
+        self.email = email
+        self.originals: Set[str] = set()
+        self.sources: Dict[str, str] = {} # source name -> evidence kind
+
+    def provenance(self) -> dict:
+        return {
+            "originals": sorted(self.originals),
+            "sources": dict(sorted(self.sources.items())),
+        }
+
+class CandidatePool:
+    """
+    Canonicalizes discovered emails so each address is verified once,
+    however many spellings and sources produced it.
+    """
+
+    def __init__(self):
+        self._candidates: Dict[str, Candidate] = {}
+        self.raw_count = 0
+        self.rejected = 0
+
+    def add(self, raw: str, source: str, kind: str) -> Optional[Candidate]:
+        self.raw_count += 1
+        email = normalize_email(raw)
+        if not email:
+            self.rejected += 1
+            return None
+        candidate = self._candidates.get(email)
+        if candidate is None:
+            candidate = self._candidates[email] = Candidate(email)
+        candidate.originals.add(raw)
+        candidate.sources.setdefault(source, kind)
+        return candidate
+
+    def get(self, email: str) -> Optional[Candidate]:
+        return self._candidates.get(email)
+
+    def __iter__(self) -> Iterator[Candidate]:
+        return iter(self._candidates.values())
+
+    def __len__(self) -> int:
+        return len(self._candidates)
+
+    @property
+    def duplicates(self) -> int:
+        """Spellings merged into an existing candidate (each one a probe saved)."""
+        return self.raw_count - self.rejected - len(self._candidates)
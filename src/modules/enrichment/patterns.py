@@ -1,43 +1,55 @@
-from typing import List
+from typing import Callable, Dict, List, Optional, Tuple
 from unidecode import unidecode
 
+# Personal address formats, in the order guesses are generated.
+NAME_FORMATS: Dict[str, Callable[[str, str], str]] = {
+    "first": lambda first, last: first,                  # joao@
+    "first.last": lambda first, last: f"{first}.{last}", # joao.silva@
+    "firstlast": lambda first, last: f"{first}{last}",   # joaosilva@
+    "flast": lambda first, last: f"{first[0]}{last}",    # jsilva@
+    "first_last": lambda first, last: f"{first}_{last}", # joao_silva@
+}
+
+ROLE_ALIASES = [
+    "contact", "info", "admin", "sales", "support", "hello", "marketing", 
+    "team", "hr", "carreiras", "vendas", "contato", "comercial"
+]
+
 def clean_name(name: str) -> str:
     """Removes accents and converts to lowercase."""
     return unidecode(name).lower().strip()
 
+def split_name(full_name: str) -> Tuple[str, str]:
+    """Returns (first, last) from a full name; last is '' for single names."""
+    parts = clean_name(full_name).split()
+    if not parts:
+        return "", ""
+    return parts[0], parts[-1] if len(parts) > 1 else ""
+
 def generate_common_aliases(domain: str) -> List[str]:
     """Generates emails with common role-based aliases."""
-    aliases = [
-        "contact", "info", "admin", "sales", "support", "hello", "marketing", 
-        "team", "hr", "carreiras", "vendas", "contato", "comercial"
-    ]
-    return [f"{alias}@{domain}" for alias in aliases]
+    return [f"{alias}@{domain}" for alias in ROLE_ALIASES]
 
-def generate_name_patterns(full_name: str, domain: str) -> List[str]:
+def generate_name_patterns(full_name: str, domain: str, formats: Optional[List[str]] = None) -> List[str]:
     """
     Generates email patterns based on a person's name.
     Example: "João Silva" -> joao@, joao.silva@, jsilva@, etc.
+
+    Pass `formats` (e.g. the domain's known format) to generate only those patterns.
     """
     if not full_name:
         return []
 
-    parts = clean_name(full_name).split()
-    if len(parts) < 1:
+    first, last = split_name(full_name)
+    if not first:
         return []
 
-    first = parts[0]
-    last = parts[-1] if len(parts) > 1 else ""
-    
-    patterns = [
-        f"{first}@{domain}", # joao@
-    ]
-    
-    if last:
-        patterns.extend([
-            f"{first}.{last}@{domain}", # joao.silva@
-            f"{first}{last}@{domain}",  # joaosilva@
-            f"{first[0]}{last}@{domain}", # jsilva@
-            f"{first}_{last}@{domain}", # joao_silva@
-        ])
+    patterns = []
+    for format_name in formats or NAME_FORMATS:
+        if format_name not in NAME_FORMATS:
+            continue
+        if format_name != "first" and not last:
+            continue
+        patterns.append(f"{NAME_FORMATS[format_name](first, last)}@{domain}")
         
     return patterns
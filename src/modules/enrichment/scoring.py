@@ -0,0 +1,90 @@
+import logging
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from src.modules.enrichment.normalize import Candidate
+
+logger = logging.getLogger(__name__)
+
+# "TLDs" that are really file extensions: logo@2x.png, bundle@1.0.min.js, ...
+ASSET_EXTENSIONS = {
+    "png", "jpg", "jpeg", "gif", "svg", "webp", "avif", "ico", "bmp", "tif", "tiff",
+    "css", "js", "mjs", "map", "json", "xml", "woff", "woff2", "ttf", "otf", "eot",
+    "mp4", "webm", "mp3", "wav", "pdf", "zip", "php", "html", "htm", "aspx",
+}
+
+# Vendor, tooling and placeholder domains that show up in page source but are never leads.
+VENDOR_DOMAINS = {
+    "sentry.io", "ingest.sentry.io", "sentry-next.wixpress.com", "sentry.wixpress.com", "wixpress.com",
+    "example.com", "example.org", "example.net", "domain.com", "yourdomain.com", "seudominio.com.br",
+    "email.com", "exemplo.com", "exemplo.com.br", "test.com", "sentry.zendesk.com",
+}
+
+# Long hex / hash-like local parts (Sentry DSN keys, webpack chunk hashes).
+HASH_LOCAL_PART = re.compile(r"^[0-9a-f]{16,}$|^[0-9a-f]{8}-[0-9a-f]{4}-")
+
+# Prior weight of each kind of evidence; a candidate takes its strongest.
+SOURCE_PRIORS = {
+    "mailto": 30,  # Explicit mailto: link
+    "text": 25,    # Visible on the page
+    "link": 20,    # Inside some other href
+    "page": 15,    # Anywhere in the HTML source
+    "dork": 15,    # Search result snippet
+    "pattern": 10, # Predicted from a person's name
+    "alias": 5,    # Generic role alias guess
+}
+
+ROLE_PRIORS = {
+    "contact": 10, "contato": 10, "info": 10, "hello": 8, "sales": 8, "vendas": 8, "comercial": 8,
+    "support": 5, "suporte": 5, "marketing": 4, "atendimento": 6,
+    "noreply": -25, "no-reply": -25, "donotreply": -25, "do-not-reply": -25,
+    "postmaster": -15, "abuse": -15, "webmaster": -10, "mailer-daemon": -25,
+}
+
+def rejection_reason(email: str, target_domain: str) -> Optional[str]:
+    """Returns why a candidate is clearly not a lead, or None if it's plausible."""
+    local, _, domain = email.partition("@")
+    if domain.rsplit(".", 1)[-1] in ASSET_EXTENSIONS:
+        return "asset"
+    if HASH_LOCAL_PART.match(local):
+        return "hash"
+    if domain in VENDOR_DOMAINS and domain != target_domain:
+        return "vendor"
+    return None
+
+def score_candidate(candidate: Candidate, target_domain: str) -> int:
+    """Higher is likelier to be a real, on-target address."""
+    local, _, domain = candidate.email.partition("@")
+    score = 0
+
+    if domain == target_domain:
+        score += 50
+    elif domain.endswith(f".{target_domain}"):
+        score += 35
+
+    kinds = set(candidate.sources.values())
+    score += max((SOURCE_PRIORS.get(kind, 0) for kind in kinds), default=0)
+    score += 5 * (len(candidate.sources) - 1) # Corroborated by several sources
+
+    score += ROLE_PRIORS.get(local, 0)
+    return score
+
+def rank_candidates(candidates: Iterable[Candidate], target_domain: str) -> Tuple[List[Candidate], List[Tuple[Candidate, str]]]:
+    """
+    Drops asset-like, hash-like and vendor matches and ranks the rest.
+
+    Returns:
+        (ranked, rejected): candidates best-first, and (candidate, reason) pairs.
+    """
+    scored, rejected = [], []
+    for candidate in candidates:
+        reason = rejection_reason(candidate.email, target_domain)
+        if reason:
+            rejected.append((candidate, reason))
+            continue
+        scored.append((score_candidate(candidate, target_domain), candidate.email, candidate))
+
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    if rejected:
+        logger.info(f"Rejected {len(rejected)} non-lead matches: " + ", ".join(f"{c.email} ({r})" for c, r in rejected[:10]))
+    return [candidate for _, _, candidate in scored], rejected
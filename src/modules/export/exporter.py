@@ -1,14 +1,20 @@
-import pandas as pd
 import logging
-from typing import List, Any
+from typing import List, Any, Sequence, Union
 import os
 
+from src.core.records import LeadRecord, LeadStatus, SmtpResult, iso_timestamps
+
 logger = logging.getLogger(__name__)
 
-def flatten_lead_data(data: List[dict]) -> List[dict]:
-    """Flattens nested JSON structure for CSV/Excel export."""
+def flatten_lead_data(data: Sequence[Union[dict, LeadRecord]]) -> List[dict]:
+    """Flattens nested JSON structure (or compact records) for CSV/Excel export."""
+    records = [item for item in data if isinstance(item, LeadRecord)]
+    timestamps = iter(iso_timestamps(records)) if records else None
     flat_data = []
     for item in data:
+        if isinstance(item, LeadRecord):
+            flat_data.append(item.as_row(next(timestamps)))
+            continue
         # Basic fields
         flat_item = {
             "email": item.get("email"),
@@ -19,17 +25,23 @@ def flatten_lead_data(data: List[dict]) -> List[dict]:
             "valid_syntax": item.get("verification", {}).get("syntax"),
             "valid_mx": item.get("verification", {}).get("mx"),
             "valid_smtp": item.get("verification", {}).get("smtp"),
+            # Provenance (which discovery sources found it)
+            "sources": ",".join((item.get("provenance") or {}).get("sources", {})),
         }
+        if "name" in item: # Name enrichment rows
+            flat_item["name"] = item["name"]
         flat_data.append(flat_item)
     return flat_data
 
-def export_to_csv(data: List[dict], filename: str = "leads.csv"):
+def export_to_csv(data: Sequence[Union[dict, LeadRecord]], filename: str = "leads.csv"):
     """Exports data to CSV."""
     if not data:
         logger.warning("No data to export.")
         return
         
     try:
+        import pandas as pd
+
         flat_data = flatten_lead_data(data)
         df = pd.DataFrame(flat_data)
         df.to_csv(filename, index=False)
@@ -37,16 +49,74 @@ def export_to_csv(data: List[dict], filename: str = "leads.csv"):
     except Exception as e:
         logger.error(f"Failed to export CSV: {e}")
 
-def export_to_excel(data: List[dict], filename: str = "leads.xlsx"):
+def export_to_excel(data: Sequence[Union[dict, LeadRecord]], filename: str = "leads.xlsx"):
     """Exports data to Excel."""
     if not data:
         logger.warning("No data to export.")
         return
         
     try:
+        import pandas as pd
+
         flat_data = flatten_lead_data(data)
         df = pd.DataFrame(flat_data)
         df.to_excel(filename, index=False)
         logger.info(f"Exported {len(data)} rows to {filename}")
     except Exception as e:
         logger.error(f"Failed to export Excel: {e}")
+
+def leads_to_arrow(data: Sequence[Union[dict, LeadRecord]]):
+    """
+    Builds a typed Arrow table from leads: status and SMTP result as
+    dictionary-encoded categories, found_at as a UTC timestamp, sources as a
+    list column.
+    """
+    import pyarrow as pa
+
+    records = [item if isinstance(item, LeadRecord) else LeadRecord.from_dict(item) for item in data]
+
+    def categorical(codes: List[int], enum) -> "pa.DictionaryArray":
+        labels = pa.array([member.label for member in enum])
+        return pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int8()), labels)
+
+    columns = {
+        "email": pa.array([r.email for r in records], type=pa.string()),
+        "domain": pa.array([r.domain for r in records], type=pa.string()).dictionary_encode(),
+        "status": categorical([int(r.status) for r in records], LeadStatus),
+        "found_at": pa.array([r.found_at for r in records], type=pa.timestamp("us", tz="UTC")),
+        "valid_syntax": pa.array([r.syntax for r in records], type=pa.bool_()),
+        "valid_mx": pa.array([r.mx for r in records], type=pa.bool_()),
+        "valid_smtp": categorical([int(r.smtp) for r in records], SmtpResult),
+        "sources": pa.array([list(r.source_names) for r in records], type=pa.list_(pa.string())),
+    }
+    if any(r.name is not None for r in records):
+        columns["name"] = pa.array([r.name for r in records], type=pa.string())
+    return pa.table(columns)
+
+def export_to_parquet(data: Sequence[Union[dict, LeadRecord]], filename: str = "leads.parquet"):
+    """Exports data to a typed, compressed Parquet file."""
+    if not data:
+        logger.warning("No data to export.")
+        return
+        
+    try:
+        import pyarrow.parquet as pq
+
+        pq.write_table(leads_to_arrow(data), filename, compression="zstd")
+        logger.info(f"Exported {len(data)} rows to {filename}")
+    except Exception as e:
+        logger.error(f"Failed to export Parquet: {e}")
+
+def export_to_arrow(data: Sequence[Union[dict, LeadRecord]], filename: str = "leads.arrow"):
+    """Exports data to an Arrow IPC (Feather v2) file, memory-mappable by readers."""
+    if not data:
+        logger.warning("No data to export.")
+        return
+        
+    try:
+        import pyarrow.feather as feather
+
+        feather.write_feather(leads_to_arrow(data), filename, compression="uncompressed")
+        logger.info(f"Exported {len(data)} rows to {filename}")
+    except Exception as e:
+        logger.error(f"Failed to export Arrow: {e}")
@@ -1,32 +1,53 @@
-import dns.asyncresolver
-import dns.exception
 import logging
+from typing import Optional
 from src.config.settings import settings
+from src.core.deadline import Deadline
 from src.core.exceptions import DNSLookupError, ValidationTimeoutError
+from src.core.tracing import span
+from src.modules.verification.verdicts import mail_domain_store
 
 logger = logging.getLogger(__name__)
 
-async def check_mx_record(domain: str) -> bool:
+async def check_mx_record(domain: str, deadline: Optional[Deadline] = None, fresh: bool = False) -> bool:
     """
     Asynchronously checks if a domain has valid MX records.
+    Conclusive answers are cached per domain (see MailDomainStore).
     
     Args:
         domain (str): The domain to check.
+        deadline (Deadline | None): Caps the DNS timeout to the time remaining.
+        fresh (bool): Ignore the cached answer and query DNS.
         
     Returns:
         bool: True if MX records exist, False otherwise.
     """
+    if not fresh:
+        cached = mail_domain_store.get_mx(domain)
+        if cached is not None:
+            return cached["host"] is not None
+
+    import dns.asyncresolver
+    import dns.exception
+    import dns.resolver
+
+    deadline = deadline or Deadline()
     resolver = dns.asyncresolver.Resolver()
-    resolver.timeout = settings.DNS_TIMEOUT
-    resolver.lifetime = settings.DNS_TIMEOUT
+    resolver.timeout = deadline.cap(settings.DNS_TIMEOUT)
+    resolver.lifetime = deadline.cap(settings.DNS_TIMEOUT)
 
     try:
         # Query MX records
-        answers = await resolver.resolve(domain, 'MX')
-        return len(answers) > 0
+        with span("dns.mx", domain=domain):
+            answers = await resolver.resolve(domain, 'MX')
+        if len(answers) == 0:
+            return False
+        best = min(answers, key=lambda r: r.preference)
+        mail_domain_store.record_mx(domain, str(best.exchange).rstrip('.'))
+        return True
         
     except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
         # Domain exists but no MX validation, or Domain does not exist
+        mail_domain_store.record_mx(domain, None)
         return False
         
     except dns.exception.Timeout:
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from src.config.settings import settings
+from src.core.deadline import Deadline
+from src.core.tracing import span
+from src.modules.verification.smtp import get_mx_record, verify_email_smtp
+
+logger = logging.getLogger(__name__)
+
+class _DeferredProbe:
+    def __init__(self, lead_data: dict, due_at: float):
+        self.lead_data = lead_data
+        self.email = lead_data["email"]
+        self.due_at = due_at
+        self.attempts = 1 # The first (failed) attempt already happened
+        self.mx_host: Optional[str] = None
+
+class SMTPRetryQueue:
+    """
+    Re-probes addresses whose SMTP check got a temporary failure (greylisting,
+    4xx throttling, timeouts) in the background, so the verification loop
+    never waits in place.
+
+    Backoff is tracked per MX host: a tempfail from one MX pushes back every
+    pending probe to that server (SMTP_RETRY_BASE_DELAY, multiplied by
+    SMTP_RETRY_BACKOFF per attempt), while other servers are unaffected.
+    Each finished probe calls `resolve(lead_data, smtp_status)`; addresses still
+    failing after SMTP_RETRY_MAX_ATTEMPTS, when the deadline passes, or when
+    `drain` stops waiting, are resolved as 'tempfail'.
+    """
+
+    def __init__(self, resolve: Callable[[dict, str], None], deadline: Optional[Deadline] = None,
+                 verify: Callable[[str, Deadline], Awaitable[str]] = verify_email_smtp):
+        self._resolve = resolve
+        self._verify = verify
+        self.deadline = deadline or Deadline()
+        self._pending: List[_DeferredProbe] = []
+        self._mx_hosts: Dict[str, Optional[str]] = {} # email domain -> MX host
+        self._mx_not_before: Dict[str, float] = {}
+        self._mx_failures: Dict[str, int] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._probing = False # A retry probe is in flight
+        self.retried = 0
+        self.recovered = 0
+        self.given_up = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _delay(self, failures: int) -> float:
+        return settings.SMTP_RETRY_BASE_DELAY * settings.SMTP_RETRY_BACKOFF ** max(failures - 1, 0)
+
+    def defer(self, lead_data: dict):
+        """Schedules a retry for a lead whose SMTP check returned 'tempfail'."""
+        item = _DeferredProbe(lead_data, time.monotonic() + self._delay(1))
+        self._pending.append(item)
+        logger.info(f"Deferred SMTP retry for {item.email} in {self._delay(1):.0f}s")
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _mx_for(self, item: _DeferredProbe) -> str:
+        domain = item.email.rsplit("@", 1)[-1]
+        if domain not in self._mx_hosts:
+            self._mx_hosts[domain] = await get_mx_record(domain, self.deadline)
+        return self._mx_hosts[domain] or domain
+
+    def _due(self, item: _DeferredProbe) -> float:
+        return max(item.due_at, self._mx_not_before.get(item.mx_host, 0.0))
+
+    async def _run(self):
+        while self._pending and not self.deadline.expired:
+            for item in self._pending:
+                if item.mx_host is None:
+                    item.mx_host = await self._mx_for(item)
+            item = min(self._pending, key=self._due)
+            wait = self._due(item) - time.monotonic()
+            if wait > 0:
+                # Sleep until the next probe is due, waking early if a new one is deferred
+                self._wakeup.clear()
+                remaining = self.deadline.remaining()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait if remaining is None else min(wait, remaining))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._pending.remove(item)
+            self.retried += 1
+            self._probing = True
+            try:
+                with span("smtp.retry", email=item.email, attempt=item.attempts + 1):
+                    smtp_status = await self._verify(item.email, self.deadline)
+            except Exception as e:
+                logger.warning(f"SMTP retry for {item.email} failed: {e}")
+                smtp_status = "unknown"
+            finally:
+                self._probing = False
+
+            if smtp_status == "tempfail":
+                failures = self._mx_failures.get(item.mx_host, 0) + 1
+                self._mx_failures[item.mx_host] = failures
+                self._mx_not_before[item.mx_host] = time.monotonic() + self._delay(failures)
+                item.attempts += 1
+                if item.attempts < settings.SMTP_RETRY_MAX_ATTEMPTS:
+                    item.due_at = time.monotonic() + self._delay(item.attempts)
+                    self._pending.append(item)
+                    logger.info(f"{item.email} still deferred by {item.mx_host}, attempt {item.attempts}")
+                    continue
+                self.given_up += 1
+            else:
+                self._mx_failures.pop(item.mx_host, None)
+                self._mx_not_before.pop(item.mx_host, None)
+                self.recovered += 1
+            self._resolve(item.lead_data, smtp_status)
+
+    async def drain(self, max_wait: Optional[float] = None):
+        """
+        Waits until every deferred probe has resolved, the deadline passes, or
+        `max_wait` seconds (default SMTP_RETRY_MAX_WAIT) go by; whatever is
+        left is resolved as 'tempfail'. Retries run alongside the caller's
+        work, so by now most are settled; this only bounds the tail. When no
+        probe is running and none is due within the wait, it doesn't wait.
+        """
+        if self._worker is not None and not self._worker.done():
+            remaining = self.deadline.child(
+                settings.SMTP_RETRY_MAX_WAIT if max_wait is None else max_wait
+            ).remaining()
+            next_due = min((self._due(item) for item in self._pending), default=0.0) - time.monotonic()
+            if self._pending and not self._probing and next_due >= remaining:
+                logger.info(
+                    f"Next SMTP retry is due in {next_due:.0f}s, past the {remaining:.0f}s wait; "
+                    f"leaving {len(self._pending)} checks unresolved"
+                )
+                remaining = 0
+            elif self._pending:
+                logger.info(f"Waiting up to {remaining:.0f}s for {len(self._pending)} deferred SMTP checks")
+            try:
+                await asyncio.wait_for(asyncio.shield(self._worker), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                self._worker.cancel()
+                raise
+            if not self._worker.done():
+                self._worker.cancel()
+                try:
+                    await self._worker
+                except asyncio.CancelledError:
+                    pass
+        for item in self._pending:
+            self.given_up += 1
+            self._resolve(item.lead_data, "tempfail")
+        self._pending.clear()
+        if self.retried:
+            logger.info(f"SMTP retries: {self.retried} probes, {self.recovered} resolved, {self.given_up} still temporary")
@@ -1,93 +1,219 @@
 import asyncio
+import contextvars
 import smtplib
 import logging
 import random
+import socket
 import string
-import dns.asyncresolver
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 from src.config.settings import settings
+from src.core.deadline import Deadline
+from src.core.tracing import span
+from src.modules.verification.verdicts import mail_domain_store, verdict_store
 
 logger = logging.getLogger(__name__)
 
-async def get_mx_record(domain: str) -> Optional[str]:
-    """Resolves the highest priority MX record for a domain."""
+class SMTPProbe:
+    """
+    Handle on an in-flight SMTP conversation running in an executor thread.
+    Calling `abort` from the event loop closes the socket, so a cancelled
+    request doesn't leave the thread blocked until the SMTP timeout.
+    """
+
+    def __init__(self):
+        self.server: Optional[smtplib.SMTP] = None
+        self.aborted = False
+
+    def abort(self):
+        self.aborted = True
+        if self.server is not None:
+            try:
+                self.server.close()
+            except Exception:
+                pass
+
+# Probe outcomes returned by verify_smtp_sync
+ACCEPTED = "accepted"   # 250/251 to RCPT TO
+REJECTED = "rejected"   # 5xx to RCPT TO: the mailbox doesn't exist
+TEMPFAIL = "tempfail"   # 4xx (greylisting, rate limits) or a timeout: worth retrying later
+ERROR = "error"         # Couldn't hold the conversation at all (refused, sender blocked, aborted)
+
+# Greylisting keys on (client IP, sender, recipient), so the catch-all probe must
+# reuse one random address per domain or its retries would never get through.
+_catch_all_addresses: Dict[str, str] = {}
+
+def catch_all_address(domain: str) -> str:
+    """A random, surely non-existent address for the domain, stable within this process."""
+    if domain not in _catch_all_addresses:
+        random_prefix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=15))
+        _catch_all_addresses[domain] = f"{random_prefix}@{domain}"
+    return _catch_all_addresses[domain]
+
+def classify_reply(code: int) -> str:
+    if code in (250, 251):
+        return ACCEPTED
+    if 400 <= code < 500:
+        return TEMPFAIL
+    return REJECTED
+
+async def get_mx_record(domain: str, deadline: Optional[Deadline] = None, fresh: bool = False) -> Optional[str]:
+    """Resolves the highest priority MX record for a domain (cached per domain unless `fresh`)."""
+    if not fresh:
+        cached = mail_domain_store.get_mx(domain)
+        if cached is not None:
+            return cached["host"]
+
+    import dns.asyncresolver
+
+    deadline = deadline or Deadline()
     try:
         resolver = dns.asyncresolver.Resolver()
-        resolver.timeout = settings.DNS_TIMEOUT
-        resolver.lifetime = settings.DNS_TIMEOUT
-        answers = await resolver.resolve(domain, 'MX')
+        resolver.timeout = deadline.cap(settings.DNS_TIMEOUT)
+        resolver.lifetime = deadline.cap(settings.DNS_TIMEOUT)
+        with span("dns.mx_host", domain=domain):
+            answers = await resolver.resolve(domain, 'MX')
         # Sort by preference (lowest first)
         sorted_answers = sorted(answers, key=lambda r: r.preference)
-        return str(sorted_answers[0].exchange).rstrip('.')
+        mx_host = str(sorted_answers[0].exchange).rstrip('.')
+        mail_domain_store.record_mx(domain, mx_host)
+        return mx_host
     except Exception:
         return None
 
-def verify_smtp_sync(email: str, mx_host: str, timeout: int = 10) -> Tuple[bool, str]:
+def verify_smtp_sync(email: str, mx_host: str, timeout: int = 10, probe: Optional[SMTPProbe] = None) -> Tuple[str, str]:
     """
     Synchronous SMTP check to be run in executor.
-    Returns (is_valid, message).
+    Returns (outcome, message), outcome being ACCEPTED, REJECTED, TEMPFAIL or ERROR.
     """
+    probe = probe or SMTPProbe()
     try:
         # 1. Connect
-        server = smtplib.SMTP(mx_host, 25, timeout=timeout)
-        server.ehlo_or_helo_if_needed()
+        server = smtplib.SMTP(timeout=timeout)
+        probe.server = server
+        if probe.aborted:
+            return ERROR, "Aborted"
+        with span("smtp.connect", mx_host=mx_host):
+            server.connect(mx_host, 25)
+        with span("smtp.helo"):
+            server.ehlo_or_helo_if_needed()
         
         # 2. Mail From (use a fake but valid-looking source)
-        server.mail('verify@leadscraper-check.com')
+        with span("smtp.mail_from"):
+            code, message = server.mail('verify@leadscraper-check.com')
+        if code != 250:
+            server.close()
+            outcome = TEMPFAIL if 400 <= code < 500 else ERROR # 5xx: our sender is refused, not the mailbox
+            return outcome, f"MAIL FROM returned {code}"
         
         # 3. Rcpt To
-        code, message = server.rcpt(email)
-        server.quit()
+        with span("smtp.rcpt_to") as rcpt_span:
+            code, message = server.rcpt(email)
+            if rcpt_span:
+                rcpt_span.set(code=code)
+        with span("smtp.quit"):
+            try:
+                server.quit()
+            except smtplib.SMTPException:
+                server.close()
         
-        # 250 = OK, 251 = User not local; will forward
-        if code == 250 or code == 251:
-            return True, "OK"
-        else:
-            return False, f"Server returned {code}"
+        # 250 = OK, 251 = User not local; will forward; 4xx = try again later
+        return classify_reply(code), f"Server returned {code}"
             
-    except smtplib.SMTPConnectError:
-        return False, "Connection Failed"
+    except (smtplib.SMTPConnectError, smtplib.SMTPHeloError) as e:
+        # e.g. 421 at greeting: the server is busy or throttling us
+        outcome = TEMPFAIL if 400 <= e.smtp_code < 500 else ERROR
+        return outcome, f"Connection Failed ({e.smtp_code})"
+    except (socket.timeout, TimeoutError):
+        if probe.aborted:
+            return ERROR, "Aborted"
+        return TEMPFAIL, "Timed out"
     except smtplib.SMTPServerDisconnected:
-        return False, "Server Disconnected"
+        if probe.aborted:
+            return ERROR, "Aborted"
+        return TEMPFAIL, "Server Disconnected"
     except Exception as e:
-        return False, f"Error: {str(e)}"
+        if probe.aborted:
+            return ERROR, "Aborted"
+        return ERROR, f"Error: {str(e)}"
+
+async def _run_probe(email: str, mx_host: str, deadline: Deadline) -> Tuple[str, str]:
+    """Runs one SMTP probe in the executor, aborting it if the caller is cancelled."""
+    loop = asyncio.get_running_loop()
+    probe = SMTPProbe()
+    # Run in a copy of the current context so the thread's spans nest under this probe
+    context = contextvars.copy_context()
+    try:
+        with span("smtp.probe", email=email):
+            return await loop.run_in_executor(
+                None, context.run, verify_smtp_sync, email, mx_host, deadline.cap(settings.SMTP_TIMEOUT), probe
+            )
+    except asyncio.CancelledError:
+        probe.abort()
+        raise
 
-async def verify_email_smtp(email: str) -> str:
+async def verify_email_smtp(email: str, deadline: Optional[Deadline] = None, fresh: bool = False) -> str:
     """
     Verifies an email using SMTP.
-    Returns: 'valid', 'invalid', 'catch_all', 'unknown'
+    Returns: 'valid', 'invalid', 'catch_all', 'tempfail' (4xx/timeout, retry
+    later, see SMTPRetryQueue) or 'unknown'
+
+    A verdict cached from an earlier run (see VERDICT_TTLS) is returned without
+    opening a socket, and the domain's MX host and catch-all answer are reused
+    across addresses and runs. Fresh probe results are recorded. `fresh`
+    skips every cache lookup.
     """
+    if not fresh:
+        cached = verdict_store.smtp_result(email)
+        if cached:
+            logger.debug(f"Cached SMTP verdict for {email}: {cached}")
+            return cached
+
+    deadline = deadline or Deadline()
+    smtp_status = await _verify_email_smtp(email, deadline, fresh)
+    # Tempfails are retried, and an 'unknown' cut short by the deadline says nothing
+    if smtp_status != "tempfail" and not (smtp_status == "unknown" and deadline.expired):
+        verdict_store.record_smtp(email, smtp_status)
+    return smtp_status
+
+async def _verify_email_smtp(email: str, deadline: Deadline, fresh: bool) -> str:
     domain = email.split('@')[-1]
-    mx_host = await get_mx_record(domain)
+    mx_host = await get_mx_record(domain, deadline, fresh)
     
     if not mx_host:
         return "unknown" # No MX, can't verify SMTP
         
-    loop = asyncio.get_running_loop()
-    
     # 1. Catch-All Check
-    # Generate a random impossible email to test if server accepts everything
-    random_prefix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=15))
-    validation_email = f"{random_prefix}@{domain}"
-    
-    is_valid_catch_all, msg = await loop.run_in_executor(
-        None, verify_smtp_sync, validation_email, mx_host, settings.SMTP_TIMEOUT
-    )
+    # Probe an impossible address to test if the server accepts everything
+    known_catch_all = None if fresh else mail_domain_store.get_catch_all(domain)
+    if known_catch_all:
+        return "catch_all"
+    if deadline.expired:
+        return "unknown"
+    if known_catch_all is None:
+        catch_all_outcome, msg = await _run_probe(catch_all_address(domain), mx_host, deadline)
+        if catch_all_outcome in (ACCEPTED, REJECTED):
+            mail_domain_store.record_catch_all(domain, catch_all_outcome == ACCEPTED)
+    else:
+        catch_all_outcome = REJECTED # Known to reject unknown recipients
     
-    if is_valid_catch_all:
-        logger.info(f"Domain {domain} is Catch-All (Accepted {validation_email})")
+    if catch_all_outcome == ACCEPTED:
+        logger.info(f"Domain {domain} is Catch-All (Accepted {catch_all_address(domain)})")
         return "catch_all"
         
     # 2. Verify Target Email
-    is_valid, msg = await loop.run_in_executor(
-        None, verify_smtp_sync, email, mx_host, settings.SMTP_TIMEOUT
-    )
-    
-    if is_valid:
-        return "valid"
-    elif "Connection Failed" in msg or "timeout" in msg.lower():
-        # Distinguish between "User Unknown" (False) and "Can't Connect" (Unknown)
+    # Probed even if the catch-all check was greylisted, so both greylist timers start now
+    if deadline.expired:
         return "unknown"
-    else:
+    outcome, msg = await _run_probe(email, mx_host, deadline)
+    
+    if outcome == REJECTED:
         return "invalid"
+    if outcome == TEMPFAIL or catch_all_outcome == TEMPFAIL:
+        # An accept is only meaningful once we know the domain isn't catch-all
+        logger.info(f"Temporary failure verifying {email} via {mx_host}: {msg}")
+        return "tempfail"
+    if outcome == ACCEPTED:
+        return "valid"
+    # Distinguish between "User Unknown" (invalid) and "Can't Connect" (unknown)
+    return "unknown"
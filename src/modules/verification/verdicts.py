@@ -0,0 +1,86 @@
+import logging
+import time
+from typing import Optional
+
+from src.config.settings import settings
+from src.utils.cache import PersistentCache
+
+logger = logging.getLogger(__name__)
+
+# SMTP outcomes worth reusing; 'tempfail' never is
+REUSABLE_SMTP_RESULTS = ("valid", "invalid", "catch_all", "unknown")
+
+def status_for_smtp(smtp_status: str) -> str:
+    """Lead status implied by an SMTP outcome."""
+    return smtp_status if smtp_status in ("valid", "catch_all", "invalid") else "risky"
+
+class VerdictStore:
+    """
+    Remembers each email's last verification verdict, across runs.
+    Every entry expires after the TTL configured for its status (VERDICT_TTLS),
+    so stable verdicts are reused longer than inconclusive ones.
+    """
+
+    def __init__(self):
+        self._cache = PersistentCache(
+            "verdicts", ttl=max(settings.VERDICT_TTLS.values(), default=0),
+            max_entries=settings.VERDICT_CACHE_MAX_ENTRIES
+        )
+
+    def get(self, email: str) -> Optional[dict]:
+        """Returns {'status', 'verification', 'checked_at'} if a fresh verdict exists."""
+        return self._cache.get(email.lower())
+
+    def record(self, email: str, status: str, verification: dict):
+        ttl = settings.VERDICT_TTLS.get(status)
+        if not ttl:
+            return # Statuses without a TTL (e.g. 'unverified') are never reused
+        self._cache.set(
+            email.lower(),
+            {"status": status, "verification": verification, "checked_at": int(time.time())},
+            ttl=ttl
+        )
+
+    def smtp_result(self, email: str) -> Optional[str]:
+        """The cached SMTP outcome for an address, if one is fresh and conclusive enough to reuse."""
+        verdict = self.get(email)
+        if verdict is None:
+            return None
+        smtp_status = verdict["verification"].get("smtp")
+        return smtp_status if smtp_status in REUSABLE_SMTP_RESULTS else None
+
+    def record_smtp(self, email: str, smtp_status: str):
+        """Records the verdict implied by a fresh SMTP probe (the address has MX, or it wasn't probed)."""
+        self.record(email, status_for_smtp(smtp_status), {"syntax": True, "mx": True, "smtp": smtp_status})
+
+class MailDomainStore:
+    """
+    Per-domain mail server facts shared by every address at the domain: the
+    preferred MX host (or that there is none) and whether the server accepts
+    any recipient. Each fact has its own TTL (MX_CACHE_TTL, MX_NEGATIVE_TTL,
+    CATCH_ALL_TTL).
+    """
+
+    def __init__(self):
+        self._cache = PersistentCache(
+            "mail_domains", ttl=settings.MX_CACHE_TTL, max_entries=settings.MAIL_DOMAIN_CACHE_MAX_ENTRIES
+        )
+
+    def get_mx(self, domain: str) -> Optional[dict]:
+        """Returns {'host': str | None} if known; a None host means the domain has no MX."""
+        return self._cache.get(f"mx:{domain.lower()}")
+
+    def record_mx(self, domain: str, host: Optional[str]):
+        ttl = settings.MX_CACHE_TTL if host else settings.MX_NEGATIVE_TTL
+        self._cache.set(f"mx:{domain.lower()}", {"host": host}, ttl=ttl)
+
+    def get_catch_all(self, domain: str) -> Optional[bool]:
+        """True/False if the catch-all probe was conclusive recently, None if unknown."""
+        entry = self._cache.get(f"catch_all:{domain.lower()}")
+        return None if entry is None else entry["catch_all"]
+
+    def record_catch_all(self, domain: str, catch_all: bool):
+        self._cache.set(f"catch_all:{domain.lower()}", {"catch_all": catch_all}, ttl=settings.CATCH_ALL_TTL)
+
+verdict_store = VerdictStore()
+mail_domain_store = MailDomainStore()
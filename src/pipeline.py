@@ -1,102 +1,497 @@
 import asyncio
 import logging
-from typing import List, Optional
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Union
 from datetime import datetime
 
-from src.modules.discovery.scraper import DomainScraper
-from src.modules.discovery.google_search import GoogleSearcher
-from src.modules.verification.syntax import extract_domain, validate_email_syntax
+from src.config.profiles import PipelineProfile, get_profile
+from src.config.settings import settings
+from src.core.deadline import Deadline
+from src.core.tracing import span, start_trace
+from src.modules.discovery.preflight import normalize_domain, triage_domain
+from src.modules.discovery.scraper import extract_from_html
+from src.modules.discovery.sources import get_enabled_sources, run_discovery
+from src.modules.enrichment.formats import format_store, guess_format
+from src.modules.enrichment.normalize import Candidate, CandidatePool
+from src.modules.enrichment.patterns import generate_name_patterns
+from src.modules.enrichment.scoring import rank_candidates
+from src.modules.verification.syntax import extract_domain
 from src.modules.verification.mx import check_mx_record
+from src.modules.verification.retry import SMTPRetryQueue
 from src.modules.verification.smtp import verify_email_smtp
-from src.modules.enrichment.patterns import generate_common_aliases, generate_name_patterns
+from src.modules.verification.verdicts import mail_domain_store, status_for_smtp, verdict_store
+from src.utils.seen_set import SeenSet
 
 logger = logging.getLogger(__name__)
 
-async def run_lead_pipeline(domain: str, input_name: str = None) -> List[dict]:
+def new_lead(candidate: Candidate, domain: str) -> dict:
+    """A fresh, not yet verified lead record for a candidate."""
+    return {
+        "email": candidate.email,
+        "domain": domain,
+        "found_at": datetime.utcnow().isoformat(),
+        "status": "processing",
+        "verification": {
+            "syntax": True, # Regex checked implicitly
+            "mx": False,
+            "smtp": "unchecked"
+        },
+        "provenance": candidate.provenance()
+    }
+
+def _apply_smtp_status(lead_data: dict, smtp_status: str):
+    lead_data["verification"]["smtp"] = smtp_status
+    lead_data["status"] = status_for_smtp(smtp_status)
+
+def resolve_deferred(lead_data: dict, smtp_status: str):
+    """Retry-queue callback: settles a deferred lead once its SMTP retry resolves."""
+    _apply_smtp_status(lead_data, smtp_status)
+    logger.info(f"Processed (retry): {lead_data['email']} -> {lead_data['status']}")
+
+def new_retry_queue(deadline: Optional[Deadline] = None, fresh: bool = False) -> SMTPRetryQueue:
+    """A retry queue settling leads via `resolve_deferred`; with `fresh`, retries bypass the caches too."""
+    verify = partial(verify_email_smtp, fresh=True) if fresh else verify_email_smtp
+    return SMTPRetryQueue(resolve_deferred, deadline, verify=verify)
+
+async def verify_lead(
+    lead_data: dict, deadline: Deadline, retry_queue: Optional[SMTPRetryQueue] = None, fresh: bool = False
+) -> dict:
+    """
+    Runs the MX and SMTP checks on a lead, sets its status and records the verdict.
+    With a `retry_queue`, an SMTP tempfail leaves the lead 'deferred' and hands it
+    to the queue, which updates it in place when the retry resolves.
+    MX and SMTP answers come from the verification caches unless `fresh`.
+    """
+    email = lead_data["email"]
+    with span("verify", email=email) as verify_span:
+        await _check_lead(lead_data, deadline, fresh)
+        if verify_span:
+            verify_span.set(status=lead_data["status"])
+
+    if lead_data["verification"]["smtp"] == "tempfail" and retry_queue is not None:
+        lead_data["status"] = "deferred"
+        retry_queue.defer(lead_data)
+        return lead_data
+        
+    # SMTP verdicts are recorded by verify_email_smtp itself; 'invalid_mx' only
+    # when DNS really answered "no MX" rather than timing out
+    conclusive = lead_data["status"] != "invalid_mx" or mail_domain_store.get_mx(extract_domain(email)) is not None
+    if lead_data["verification"]["smtp"] == "unchecked" and conclusive:
+        verdict_store.record(email, lead_data["status"], lead_data["verification"])
+    logger.info(f"Processed: {email} -> {lead_data['status']}")
+    return lead_data
+
+async def _check_lead(lead_data: dict, deadline: Deadline, fresh: bool):
+    email = lead_data["email"]
+
+    # MX Check
+    email_domain = extract_domain(email)
+    if email_domain:
+        mx_valid = await check_mx_record(email_domain, deadline, fresh)
+        lead_data["verification"]["mx"] = mx_valid
+        
+        if mx_valid:
+            # SMTP Check
+            smtp_status = await verify_email_smtp(email, deadline, fresh)
+            _apply_smtp_status(lead_data, smtp_status)
+        elif deadline.expired:
+             lead_data["status"] = "unverified" # DNS cut short, not a real miss
+        else:
+             lead_data["status"] = "invalid_mx"
+    else:
+         lead_data["status"] = "invalid_format"
+
+async def run_lead_pipeline(
+    domain: str,
+    input_name: str = None,
+    preflight: bool = settings.PREFLIGHT_ENABLED,
+    deadline: Optional[Deadline] = None,
+    refresh: bool = False,
+    trace: Optional[bool] = None,
+    retry_queue: Optional[SMTPRetryQueue] = None,
+    profile: Union[str, PipelineProfile, None] = None,
+    fresh: bool = False,
+    seen: Optional[SeenSet] = None,
+    raise_errors: bool = False,
+    source_reports: Optional[List[dict]] = None
+) -> List[dict]:
     """
     Runs the full lead generation pipeline for a single domain.
     Returns a list of lead dictionaries.
+
+    With `preflight`, the domain is normalized and triaged via DNS first, and
+    dead or mail-less domains return immediately without launching a browser.
+    The `deadline` is passed down to every stage; when it passes, the leads
+    verified so far are returned and the rest are marked 'unverified'.
+    Leads whose previous verdict is still within its per-status TTL are not
+    re-verified, unless `fresh` forces new MX and SMTP checks. With `refresh`,
+    unchanged pages are not re-rendered either.
+    Sampled runs (see TRACE_SAMPLE_RATE, or force with `trace`) write a
+    span timeline to TRACE_DIR.
+    SMTP tempfails (greylisting) are retried in the background while the other
+    leads are verified, and waited for at most SMTP_RETRY_MAX_WAIT afterwards;
+    leads still pending then come back 'risky'. Pass a shared `retry_queue` to
+    return without waiting for them: those leads come back 'deferred' and are
+    updated in place once the caller drains the queue.
+    The `profile` (fast, standard, thorough; default settings.PIPELINE_PROFILE)
+    sets the page, query, alias, verification and time budgets.
+    With a `seen` set (bulk runs), addresses already in it are dropped before
+    verification, and addresses that got a verdict ('deferred' included) are
+    added after it, so each address is returned once across domains. Ones
+    left 'unverified' are not added and can be verified by a later domain or run.
+    Pass a `source_reports` list to get each discovery source's yield, latency
+    and status appended to it (see SourceReport.as_dict).
+    Errors are logged and give an empty result, unless `raise_errors` (callers
+    that retry failed domains, like queue workers).
     """
-    logger.info(f"Starting pipeline for domain: {domain}")
-    found_emails = set()
+    profile = get_profile(profile)
+    with start_trace(f"pipeline {domain}", force=trace, domain=domain, profile=profile.name) as root:
+        results = await _run_lead_pipeline(
+            domain, input_name, preflight, deadline, refresh, retry_queue, profile, fresh, seen, raise_errors,
+            source_reports
+        )
+        if root:
+            root.set(leads=len(results))
+        return results
+
+async def _run_lead_pipeline(
+    domain: str, input_name: Optional[str], preflight: bool, deadline: Optional[Deadline], refresh: bool,
+    retry_queue: Optional[SMTPRetryQueue], profile: PipelineProfile, fresh: bool, seen: Optional[SeenSet],
+    raise_errors: bool, source_reports: Optional[List[dict]]
+) -> List[dict]:
+    logger.info(f"Starting pipeline for domain: {domain} (profile: {profile.name})")
+    deadline = (deadline or Deadline()).child(profile.time_budget)
+    candidates = CandidatePool()
+    own_retries = retry_queue is None
+    if own_retries:
+        retry_queue = new_retry_queue(deadline, fresh)
     
     try:
-        # 1. Direct Scrape
-        scraper = DomainScraper()
-        scraped_emails = await scraper.scrape_domain(domain)
-        found_emails.update(scraped_emails)
-        
-        # 2. Google Search (Dorking)
-        logger.info("Starting Google Search (Dorking)...")
-        google_searcher = GoogleSearcher()
-        dorks = [
-            f'site:linkedin.com "{domain}" "email"',
-            f'site:{domain} "email"',
-            f'"{domain}" "contact" email'
-        ]
-        google_emails = await google_searcher.search(dorks)
-        found_emails.update(google_emails)
-        
-        logger.info(f"Total found via Scraping + Google: {len(found_emails)}")
+        # 0. Pre-flight triage
+        if preflight:
+            normalized = normalize_domain(domain)
+            if not normalized:
+                logger.warning(f"Invalid domain input: {domain}")
+                return []
+            domain = normalized
+            with span("preflight"):
+                verdict = await triage_domain(domain, deadline=deadline)
+            if not verdict.runnable:
+                logger.info(f"Pre-flight: {domain} is {verdict.status}, skipping pipeline")
+                return []
 
-        # 3. Predict (Enrichment)
-        predicted_emails = []
-        if input_name:
-            logger.info(f"Generating patterns for name: {input_name}")
-            predicted_emails.extend(generate_name_patterns(input_name, domain))
-            
-        predicted_emails.extend(generate_common_aliases(domain))
+        # 1. Discovery (the profile's sources, concurrently, within its discovery time)
+        with span("discovery"):
+            reports = await run_discovery(
+                domain, input_name, deadline=deadline.child(profile.discovery_time), refresh=refresh, profile=profile
+            )
+        for report in reports:
+            for raw_email, kind in report.emails.items():
+                candidates.add(raw_email, report.name, kind)
+        if source_reports is not None:
+            source_reports.extend(report.as_dict() for report in reports)
+
+        # 2. Normalize: one canonical lead per address, original spellings kept as provenance
+        logger.info(
+            f"Total candidates to verify: {len(candidates)} "
+            f"({candidates.duplicates} duplicate spellings merged, {candidates.rejected} rejected)"
+        )
         
-        for email in predicted_emails:
-            if validate_email_syntax(email):
-                found_emails.add(email)
-                
-        logger.info(f"Total candidates to verify: {len(found_emails)}")
+        # 3. Score: drop asset/vendor matches, verify the likeliest addresses first
+        ranked, _ = rank_candidates(candidates, domain)
+        if seen is not None:
+            # Cross-domain dedup: addresses already found elsewhere don't use the verify budget
+            was_seen = await asyncio.to_thread(seen.contains_many, [candidate.email for candidate in ranked])
+            repeated = sum(was_seen)
+            if repeated:
+                logger.info(f"Dedup: {repeated} of {len(ranked)} candidates were already seen")
+                ranked = [candidate for candidate, old in zip(ranked, was_seen) if not old]
+        budget = profile.verify_budget
+        if len(ranked) > budget:
+            logger.info(f"Verification budget: top {budget} of {len(ranked)} candidates will be probed")
         
         # 4. Verify
         results = []
-        for email in found_emails:
-            lead_data = {
-                "email": email,
-                "domain": domain,
-                "found_at": datetime.utcnow().isoformat(),
-                "status": "processing",
-                "verification": {
-                    "syntax": True, # Regex checked implicitly
-                    "mx": False,
-                    "smtp": "unchecked"
-                }
-            }
+        reused = 0
+        for rank, candidate in enumerate(ranked):
+            email = candidate.email
+            lead_data = new_lead(candidate, domain)
             
-            # MX Check
-            email_domain = extract_domain(email)
-            if email_domain:
-                mx_valid = await check_mx_record(email_domain)
-                lead_data["verification"]["mx"] = mx_valid
-                
-                if mx_valid:
-                    # SMTP Check
-                    smtp_status = await verify_email_smtp(email)
-                    lead_data["verification"]["smtp"] = smtp_status
-                    
-                    if smtp_status == "valid":
-                        lead_data["status"] = "valid"
-                    elif smtp_status == "catch_all":
-                        lead_data["status"] = "catch_all"
-                    elif smtp_status == "invalid":
-                        lead_data["status"] = "invalid"
-                    else:
-                        lead_data["status"] = "risky"
-                else:
-                     lead_data["status"] = "invalid_mx"
-            else:
-                 lead_data["status"] = "invalid_format"
-                
-            results.append(lead_data)
-            logger.info(f"Processed: {email} -> {lead_data['status']}")
+            if deadline.expired or rank >= budget:
+                lead_data["status"] = "unverified"
+                results.append(lead_data)
+                continue
+            
+            if not fresh:
+                previous = verdict_store.get(email)
+                if previous:
+                    lead_data["status"] = previous["status"]
+                    lead_data["verification"] = previous["verification"]
+                    results.append(lead_data)
+                    reused += 1
+                    continue
+            
+            results.append(await verify_lead(lead_data, deadline, retry_queue, fresh))
+
+        # 4a. The domain's known format was wrong for this name: try the others
+        if input_name and not deadline.expired:
+            results.extend(await _fallback_name_guesses(
+                domain, input_name, results, budget, deadline, retry_queue, fresh
+            ))
+            
+        # 4b. Settle greylisted/throttled addresses (retried in the background meanwhile;
+        # ones still pending after SMTP_RETRY_MAX_WAIT come back 'risky')
+        if own_retries:
+            await retry_queue.drain()
             
+        if reused:
+            logger.info(f"Reused {reused} of {len(results)} cached verdicts")
+        if deadline.expired:
+            logger.warning(f"Deadline reached for {domain}, returning partial results")
+
+        if seen is not None:
+            # Only addresses that got a verdict count as seen; ones past the budget or
+            # the deadline stay eligible for a later domain or run
+            await asyncio.to_thread(
+                seen.add_many, [lead["email"] for lead in results if lead["status"] != "unverified"]
+            )
+
+        # 5. Learn the domain's address format for future name guesses
+        format_store.learn_from_leads(domain, results, input_name)
         return results
 
     except Exception as e:
         logger.error(f"Pipeline failed for {domain}: {e}")
+        if raise_errors:
+            raise
+        return []
+
+async def _fallback_name_guesses(
+    domain: str, input_name: str, results: List[dict], budget: int, deadline: Deadline,
+    retry_queue: SMTPRetryQueue, fresh: bool
+) -> List[dict]:
+    """
+    When discovery only guessed the domain's known format for `input_name`
+    and the server rejected it, guesses the remaining formats (stopping at
+    the first valid one) with what is left of the verification budget.
+    Returns the extra leads.
+    """
+    known_format = format_store.dominant(domain)
+    guesses = generate_name_patterns(input_name, domain, [known_format]) if known_format else []
+    tried = {lead["email"]: lead["status"] for lead in results}
+    if not guesses or tried.get(guesses[0]) != "invalid":
+        return []
+    remaining = []
+    for format_name in format_store.ranked_formats(domain):
+        guess = generate_name_patterns(input_name, domain, [format_name])
+        if format_name != known_format and guess and guess[0] not in tried:
+            remaining.append(format_name)
+    probed = sum(1 for lead in results if lead["status"] != "unverified")
+    remaining = remaining[:max(0, budget - probed)]
+    if not remaining:
         return []
+    logger.info(f"Known format {known_format} rejected for {input_name}, trying {len(remaining)} other formats")
+    return await enrich_name(domain, input_name, deadline, retry_queue, fresh, formats=remaining)
+
+async def learn_domain_format(domain: str, deadline: Deadline) -> Optional[str]:
+    """
+    Scrapes the domain (no SMTP probes) and tallies the formats of the
+    personal addresses it publishes. Returns the most common one as a hint
+    for ordering guesses; it is not stored, since none of them was verified.
+    """
+    reports = await run_discovery(domain, sources=get_enabled_sources(["scraper"]), deadline=deadline)
+    pool = CandidatePool()
+    for report in reports:
+        for raw_email, kind in report.emails.items():
+            pool.add(raw_email, report.name, kind)
+    tally: Dict[str, int] = {}
+    for candidate in pool:
+        local, _, email_domain = candidate.email.partition("@")
+        format_name = guess_format(local) if email_domain == domain else None
+        if format_name:
+            tally[format_name] = tally.get(format_name, 0) + 1
+    return max(tally, key=tally.get) if tally else None
+
+async def enrich_name(
+    domain: str, full_name: str, deadline: Deadline, retry_queue: Optional[SMTPRetryQueue] = None,
+    fresh: bool = False, formats: Optional[List[str]] = None
+) -> List[dict]:
+    """
+    Guesses and verifies addresses for one person, trying the domain's known
+    format first (`formats` overrides the order). Stops at the first valid
+    address; a rejected guess is recorded against its format and the next
+    format is tried. A catch-all answer stops probing since no guess can be
+    told apart, and so does an inconclusive answer for the known format.
+    Every verified answer teaches the store about the domain's format.
+    """
+    known_format = format_store.dominant(domain)
+    results = []
+    for format_name in formats if formats is not None else format_store.ranked_formats(domain):
+        guesses = generate_name_patterns(full_name, domain, [format_name])
+        if not guesses:
+            continue
+        email = guesses[0]
+        candidate = Candidate(email)
+        candidate.sources["patterns"] = "pattern"
+        lead_data = new_lead(candidate, domain)
+        lead_data["name"] = full_name
+
+        if deadline.expired:
+            lead_data["status"] = "unverified"
+            results.append(lead_data)
+            continue
+
+        results.append(await verify_lead(lead_data, deadline, retry_queue, fresh))
+        format_store.record_guess(domain, email.partition("@")[0], full_name, lead_data["status"])
+        if lead_data["status"] in ("valid", "catch_all", "invalid_mx"):
+            break
+        if lead_data["status"] != "invalid" and format_name == known_format:
+            break # Couldn't check the likely address; don't spend probes on unlikely ones
+    return results
+
+async def run_name_enrichment(
+    rows: Iterable[tuple],
+    deadline: Optional[Deadline] = None,
+    discover_format: bool = True,
+    fresh: bool = False
+) -> List[dict]:
+    """
+    Finds addresses for (name, domain) rows, grouped by domain so every name
+    at a domain benefits from the format learned for it.
+
+    Args:
+        rows (Iterable[tuple]): (full_name, domain) pairs, in any order.
+        deadline (Deadline | None): Overall deadline; pending guesses end up 'unverified'.
+        discover_format (bool): Scrape domains whose format is still unknown before guessing.
+        fresh (bool): Ignore cached MX/SMTP answers and probe every guess.
+
+    Returns:
+        List[dict]: Lead dictionaries with an extra 'name' field.
+    """
+    deadline = deadline or Deadline()
+    groups: Dict[str, List[str]] = OrderedDict()
+    for full_name, raw_domain in rows:
+        domain = normalize_domain(raw_domain)
+        if not domain or not full_name or not full_name.strip():
+            logger.warning(f"Skipping invalid row: {full_name!r}, {raw_domain!r}")
+            continue
+        names = groups.setdefault(domain, [])
+        if full_name.strip() not in names:
+            names.append(full_name.strip())
+
+    results = []
+    for domain, names in groups.items():
+        try:
+            with start_trace(f"enrich {domain}", domain=domain, names=len(names)):
+                results.extend(await _enrich_domain(domain, names, deadline, discover_format, fresh))
+        except Exception as e:
+            logger.error(f"Enrichment failed for {domain}: {e}")
+    return results
+
+async def _enrich_domain(
+    domain: str, names: List[str], deadline: Deadline, discover_format: bool, fresh: bool
+) -> List[dict]:
+    with span("preflight"):
+        verdict = await triage_domain(domain, deadline=deadline)
+    if not verdict.runnable:
+        logger.info(f"Pre-flight: {domain} is {verdict.status}, skipping {len(names)} names")
+        return []
+
+    known_format = format_store.dominant(domain)
+    hint = None
+    if not known_format and discover_format and not deadline.expired:
+        with span("learn_format"):
+            hint = await learn_domain_format(domain, deadline)
+    logger.info(
+        f"Enriching {len(names)} names at {domain} (format: {known_format or 'unknown'}"
+        + (f", seen on site: {hint})" if hint else ")")
+    )
+
+    results = []
+    probes = 0
+    retry_queue = new_retry_queue(deadline, fresh)
+    for full_name in names:
+        with span("enrich_name", name=full_name):
+            leads = await enrich_name(
+                domain, full_name, deadline, retry_queue, fresh, formats=format_store.ranked_formats(domain, hint)
+            )
+        probes += sum(1 for lead in leads if lead["status"] != "unverified")
+        results.extend(leads)
+    deferred = [lead for lead in results if lead["status"] == "deferred"]
+    await retry_queue.drain()
+    for lead in deferred:
+        format_store.record_guess(domain, lead["email"].partition("@")[0], lead["name"], lead["status"])
+    logger.info(f"{domain}: {probes} probes for {len(names)} names")
+    return results
+
+def replay_archive(records: Iterable[dict], workers: Optional[int] = None, batch_size: int = 64) -> List[dict]:
+    """
+    Re-runs the current extraction, normalization and scoring over archived
+    pages (see PageArchive), offline: no browser and no network. Extraction is
+    spread over worker processes a batch of pages at a time, so memory stays
+    bounded however large the archive is.
+
+    Args:
+        records (Iterable[dict]): Archived page records, e.g. from `iter_archive`.
+        workers (int | None): Extraction processes (defaults to the CPU count).
+        batch_size (int): Pages handed to the workers at once.
+
+    Returns:
+        List[dict]: Lead dictionaries ('unverified'), ranked per domain as the live pipeline ranks them.
+    """
+    workers = workers or os.cpu_count() or 1
+    pools: Dict[str, CandidatePool] = OrderedDict()
+    pages = 0
+    html_bytes = 0
+    start = time.perf_counter()
+    # Only pages the live scraper would have used
+    usable = (record for record in records if record.get("status", 0) < 400 and record.get("html"))
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        while True:
+            batch = list(islice(usable, batch_size))
+            if not batch:
+                break
+            htmls = [record["html"] for record in batch]
+            chunksize = max(1, len(batch) // workers)
+            for record, emails in zip(batch, executor.map(extract_from_html, htmls, chunksize=chunksize)):
+                pool = pools.setdefault(record["domain"], CandidatePool())
+                for raw_email, kind in emails.items():
+                    pool.add(raw_email, "scraper", kind)
+            pages += len(batch)
+            html_bytes += sum(len(html) for html in htmls)
+
+    results = []
+    for domain, pool in pools.items():
+        ranked, _ = rank_candidates(pool, domain)
+        for candidate in ranked:
+            lead_data = new_lead(candidate, domain)
+            lead_data["status"] = "unverified"
+            results.append(lead_data)
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"Replayed {pages} pages ({html_bytes / 1e6:.1f} MB of HTML) from {len(pools)} domains in {elapsed:.1f}s "
+        f"({pages / elapsed if elapsed else 0:.0f} pages/s): {len(results)} candidates"
+    )
+    return results
+
+async def verify_leads(leads: List[dict], deadline: Optional[Deadline] = None, fresh: bool = False) -> List[dict]:
+    """
+    Verifies already-built leads in place (e.g. replayed ones), reusing cached
+    verdicts unless `fresh`. Leads left when the deadline passes stay 'unverified'.
+    """
+    deadline = deadline or Deadline()
+    retry_queue = new_retry_queue(deadline, fresh)
+    for lead_data in leads:
+        if deadline.expired:
+            break
+        await verify_lead(lead_data, deadline, retry_queue, fresh)
+    await retry_queue.drain()
+    return leads
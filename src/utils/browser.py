@@ -1,17 +1,26 @@
 import random
 import logging
-from typing import Optional, Dict
-from fake_useragent import UserAgent
-from playwright.async_api import Browser, BrowserContext
+from typing import Optional, Dict, TYPE_CHECKING
 
 from src.config.settings import settings
 
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext
+
 logger = logging.getLogger(__name__)
 
 class BrowserUtils:
     def __init__(self):
-        self.ua = UserAgent()
-        
+        self._ua = None
+
+    @property
+    def ua(self):
+        """User-Agent pool, loaded on first use (its data file is slow to read)."""
+        if self._ua is None:
+            from fake_useragent import UserAgent
+            self._ua = UserAgent()
+        return self._ua
+
     def get_random_user_agent(self) -> str:
         """Returns a random User-Agent string."""
         try:
@@ -31,7 +40,7 @@ class BrowserUtils:
         proxy_url = random.choice(settings.PROXIES)
         return {"server": proxy_url}
 
-    async def new_safe_context(self, browser: Browser, **kwargs) -> BrowserContext:
+    async def new_safe_context(self, browser: "Browser", **kwargs) -> "BrowserContext":
         """
         Creates a new browser context with randomized Anti-Fingerprinting settings.
         """
@@ -0,0 +1,350 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+from src.config.settings import settings
+from src.core.tracing import span
+from src.utils.browser import browser_utils
+from src.utils.request_policy import request_policy, PageRequestStats
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Page
+
+logger = logging.getLogger(__name__)
+
+def is_browser_failure(error: BaseException) -> bool:
+    """True if an error means the page/context/browser died (not a site problem)."""
+    message = str(error)
+    return (
+        type(error).__name__ == "TargetClosedError"
+        or "has been closed" in message
+        or "Target crashed" in message
+        or "Browser closed" in message
+    )
+
+class _PooledContext:
+    def __init__(self, context: "BrowserContext"):
+        self.context = context
+        self.navigations = 0
+
+class _BrowserHandle:
+    """One launched Chromium plus the idle contexts it can hand out."""
+
+    def __init__(self, browser: "Browser", generation: int):
+        self.browser = browser
+        self.generation = generation
+        self.idle_contexts: List[_PooledContext] = []
+        self.active_leases = 0
+        self.navigations = 0
+        self.draining = False
+        self.closed = False
+        self.cdp = None
+        self.pid: Optional[int] = None # Chromium's browser process, once known
+
+    def page_count(self) -> int:
+        try:
+            return sum(len(context.pages) for context in self.browser.contexts)
+        except Exception:
+            return 0
+
+class BrowserLease:
+    """
+    A page on a supervised browser, borrowed for one unit of work.
+    Navigate through `goto` so the supervisor can count navigations.
+    """
+
+    def __init__(self, supervisor: "BrowserSupervisor", handle: _BrowserHandle, pooled: _PooledContext,
+                 page: "Page", request_stats: Optional[PageRequestStats], block_requests: bool,
+                 exclude_domain: Optional[str]):
+        self._supervisor = supervisor
+        self._handle = handle
+        self._pooled = pooled
+        self.page = page
+        self.request_stats = request_stats
+        self._block_requests = block_requests
+        self._exclude_domain = exclude_domain
+
+    @property
+    def context(self) -> "BrowserContext":
+        return self._pooled.context
+
+    async def goto(self, url: str, **kwargs):
+        self._pooled.navigations += 1
+        self._handle.navigations += 1
+        return await self.page.goto(url, **kwargs)
+
+    async def renew(self):
+        """
+        Swaps in a fresh page on a healthy browser after the current one failed.
+        The broken page is only given back once the new one is open, so if
+        opening fails the lease still holds (and later releases) exactly one page.
+        """
+        fresh = await self._supervisor._acquire(self._block_requests, self._exclude_domain)
+        broken = BrowserLease(
+            self._supervisor, self._handle, self._pooled, self.page, self.request_stats,
+            self._block_requests, self._exclude_domain
+        )
+        self._handle, self._pooled = fresh._handle, fresh._pooled
+        self.page, self.request_stats = fresh.page, fresh.request_stats
+        await self._supervisor._release(broken, broken=True)
+
+class BrowserSupervisor:
+    """
+    Owns a long-lived Chromium and hands out pages from a pool of contexts.
+
+    - Contexts are recycled after BROWSER_CONTEXT_MAX_NAVIGATIONS navigations.
+    - A watchdog checks the browser periodically. Past BROWSER_MAX_RSS_MB the
+      browser is drained: new work goes to a fresh browser, and the old one
+      closes once its in-flight pages are returned. A browser that stops
+      answering is replaced immediately.
+    """
+
+    def __init__(self, headless: bool = True):
+        self.headless = headless
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._playwright = None
+        self._current: Optional[_BrowserHandle] = None
+        self._draining: List[_BrowserHandle] = []
+        self._watchdog: Optional[asyncio.Task] = None
+        self._generation = 0
+        self.restarts = 0
+        self.recycled_contexts = 0
+        self.last_rss: Dict[str, float] = {}
+
+    def _bind_loop(self):
+        """Playwright objects belong to one event loop; start over if it changed."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._loop is not None:
+                logger.debug("Event loop changed, discarding browser supervisor state")
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._playwright = None
+            self._current = None
+            self._draining = []
+            self._watchdog = None
+
+    async def _ensure_browser(self) -> _BrowserHandle:
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+        if self._current is None:
+            with span("browser.launch"):
+                browser = await self._playwright.chromium.launch(
+                    headless=self.headless, args=request_policy.launch_args()
+                )
+            self._generation += 1
+            handle = _BrowserHandle(browser, self._generation)
+            browser.on("disconnected", lambda _: self._on_disconnected(handle))
+            self._current = handle
+            logger.info(f"Launched browser generation {handle.generation}")
+        if self._watchdog is None or self._watchdog.done():
+            self._watchdog = asyncio.create_task(self._watch())
+        return self._current
+
+    def _on_disconnected(self, handle: _BrowserHandle):
+        handle.closed = True
+        if handle is self._current:
+            logger.warning(f"Browser generation {handle.generation} disconnected")
+            self._current = None
+
+    async def _acquire(self, block_requests: bool, exclude_domain: Optional[str]) -> BrowserLease:
+        self._bind_loop()
+        for attempt in range(2):
+            async with self._lock:
+                handle = await self._ensure_browser()
+                pooled = handle.idle_contexts.pop() if handle.idle_contexts else None
+                handle.active_leases += 1
+            try:
+                if pooled is None:
+                    pooled = _PooledContext(await browser_utils.new_safe_context(handle.browser))
+                page = await pooled.context.new_page()
+                stats = await request_policy.apply(page, exclude_domain) if block_requests else None
+                return BrowserLease(self, handle, pooled, page, stats, block_requests, exclude_domain)
+            except Exception as e:
+                handle.active_leases -= 1
+                if attempt or not is_browser_failure(e):
+                    raise
+                logger.warning(f"Browser generation {handle.generation} failed to open a page, restarting: {e}")
+                await self._retire(handle, force=True)
+
+    async def _release(self, lease: BrowserLease, broken: bool = False):
+        handle, pooled = lease._handle, lease._pooled
+        try:
+            await lease.page.close()
+        except Exception:
+            broken = True
+        handle.active_leases -= 1
+
+        if broken or handle.draining or handle.closed or pooled.navigations >= settings.BROWSER_CONTEXT_MAX_NAVIGATIONS:
+            if not (broken or handle.draining or handle.closed):
+                self.recycled_contexts += 1
+                logger.debug(f"Recycling context after {pooled.navigations} navigations")
+            try:
+                await pooled.context.close()
+            except Exception:
+                pass
+        else:
+            handle.idle_contexts.append(pooled)
+
+        if handle.draining and handle.active_leases <= 0:
+            await self._close_handle(handle)
+
+    @asynccontextmanager
+    async def lease(self, block_requests: bool = True, exclude_domain: Optional[str] = None):
+        """
+        Borrows a page for the duration of the block.
+
+        Args:
+            block_requests (bool): Install the request-blocking policy on the page.
+            exclude_domain (str | None): Domain being scraped, never blocked.
+        """
+        with span("browser.lease"):
+            lease = await self._acquire(block_requests, exclude_domain)
+        try:
+            yield lease
+        finally:
+            await self._release(lease)
+
+    async def _retire(self, handle: _BrowserHandle, force: bool = False):
+        if handle is self._current:
+            self._current = None
+            self.restarts += 1
+        handle.draining = True
+        if force or handle.active_leases <= 0:
+            await self._close_handle(handle)
+        elif handle not in self._draining:
+            self._draining.append(handle)
+
+    async def _close_handle(self, handle: _BrowserHandle):
+        if handle in self._draining:
+            self._draining.remove(handle)
+        if handle.closed:
+            return
+        handle.closed = True
+        try:
+            await handle.browser.close()
+        except Exception:
+            pass
+        logger.info(f"Closed browser generation {handle.generation} after {handle.navigations} navigations")
+
+    async def _ping(self, handle: _BrowserHandle) -> bool:
+        try:
+            if handle.cdp is None:
+                handle.cdp = await handle.browser.new_browser_cdp_session()
+            await asyncio.wait_for(handle.cdp.send("Browser.getVersion"), timeout=settings.BROWSER_HEALTH_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+    async def _browser_pid(self, handle: _BrowserHandle) -> Optional[int]:
+        """PID of the handle's own browser process, asked over its CDP session."""
+        if handle.pid is None and handle.cdp is not None:
+            try:
+                info = await asyncio.wait_for(
+                    handle.cdp.send("SystemInfo.getProcessInfo"), timeout=settings.BROWSER_HEALTH_TIMEOUT
+                )
+                handle.pid = next((p["id"] for p in info.get("processInfo", []) if p.get("type") == "browser"), None)
+            except Exception as e:
+                logger.debug(f"Could not get the PID of browser generation {handle.generation}: {e}")
+        return handle.pid
+
+    def _measure_rss(self, pid: int) -> Dict[str, float]:
+        """
+        RSS (MB) of one browser's process tree, split by role. Only that tree
+        counts: draining browsers and the other supervisor's are not included.
+        """
+        try:
+            import psutil
+        except ImportError:
+            return {}
+        totals = {"total": 0.0, "renderer": 0.0, "max_renderer": 0.0}
+        try:
+            root = psutil.Process(pid)
+            processes = [root, *root.children(recursive=True)]
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return {}
+        for proc in processes:
+            try:
+                rss = proc.memory_info().rss / (1024 * 1024)
+                totals["total"] += rss
+                if "--type=renderer" in proc.cmdline():
+                    totals["renderer"] += rss
+                    totals["max_renderer"] = max(totals["max_renderer"], rss)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return totals
+
+    async def check_health(self):
+        """Pings the current browser and replaces or drains it if needed."""
+        handle = self._current
+        if handle is None or handle.closed:
+            return
+        if not await self._ping(handle):
+            logger.warning(f"Browser generation {handle.generation} is unresponsive, restarting")
+            await self._retire(handle, force=True)
+            return
+        pid = await self._browser_pid(handle)
+        self.last_rss = self._measure_rss(pid) if pid else {}
+        total = self.last_rss.get("total", 0.0)
+        logger.debug(f"Browser health: {total:.0f} MB RSS, {handle.page_count()} pages, {handle.navigations} navigations")
+        if total > settings.BROWSER_MAX_RSS_MB:
+            logger.warning(
+                f"Browser generation {handle.generation} at {total:.0f} MB RSS "
+                f"(limit {settings.BROWSER_MAX_RSS_MB} MB), draining"
+            )
+            await self._retire(handle)
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(settings.BROWSER_HEALTH_INTERVAL)
+            try:
+                await self.check_health()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Browser health check failed: {e}")
+
+    def snapshot(self) -> dict:
+        """Current supervisor state for health reporting."""
+        handle = self._current
+        return {
+            "generation": handle.generation if handle else None,
+            "active_pages": handle.active_leases if handle else 0,
+            "open_pages": handle.page_count() if handle else 0,
+            "idle_contexts": len(handle.idle_contexts) if handle else 0,
+            "draining_browsers": len(self._draining),
+            "restarts": self.restarts,
+            "recycled_contexts": self.recycled_contexts,
+            "rss_mb": {k: round(v, 1) for k, v in self.last_rss.items()},
+        }
+
+    async def close(self):
+        """Closes all browsers and stops Playwright."""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        if self._watchdog:
+            self._watchdog.cancel()
+            self._watchdog = None
+        for handle in [self._current, *self._draining]:
+            if handle:
+                await self._close_handle(handle)
+        self._current = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+_supervisors: Dict[bool, BrowserSupervisor] = {}
+
+def get_browser_supervisor(headless: bool = True) -> BrowserSupervisor:
+    """Process-wide supervisor for headless (or headed) browsers."""
+    if headless not in _supervisors:
+        _supervisors[headless] = BrowserSupervisor(headless=headless)
+    return _supervisors[headless]
+
+async def close_browser_supervisors():
+    """Shuts down every supervised browser. Call before the event loop closes."""
+    for supervisor in _supervisors.values():
+        await supervisor.close()
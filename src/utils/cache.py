@@ -0,0 +1,119 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class PersistentCache:
+    """
+    Small on-disk key/value cache backed by SQLite.
+
+    Values are stored as JSON with an expiry timestamp. When the cache grows
+    past `max_entries`, the least recently used entries are evicted.
+    Several caches can share one database file by using different namespaces.
+    """
+
+    def __init__(self, namespace: str, ttl: float, max_entries: int = 10000, path: Optional[str] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = str(path or Path(settings.CACHE_DIR) / "cache.sqlite3")
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_lru ON cache (namespace, accessed_at)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value, or None if missing or expired."""
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[1] <= now:
+                    conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+                    conn.commit()
+                    return None
+                conn.execute(
+                    "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, key)
+                )
+                conn.commit()
+                return json.loads(row[0])
+        except sqlite3.Error as e:
+            logger.warning(f"Cache read failed ({self.namespace}): {e}")
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Stores a JSON-serializable value, evicting LRU entries if over capacity."""
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttl)
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value), expires_at, now)
+                )
+                self._evict(conn, now)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache write failed ({self.namespace}): {e}")
+
+    def delete(self, key: str):
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache delete failed ({self.namespace}): {e}")
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM cache WHERE namespace = ? AND expires_at <= ?", (self.namespace, now))
+        (count,) = conn.execute("SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)).fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE rowid IN ("
+                "SELECT rowid FROM cache WHERE namespace = ? ORDER BY accessed_at ASC LIMIT ?)",
+                (self.namespace, overflow)
+            )
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,135 @@
+import logging
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from src.config.settings import settings
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+logger = logging.getLogger(__name__)
+
+# URL patterns per Playwright resource type. Chromium's blocklist matches URLs,
+# not resource types, so types are approximated by file extension.
+RESOURCE_TYPE_PATTERNS: Dict[str, List[str]] = {
+    "image": ["png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"],
+    "font": ["woff", "woff2", "ttf", "otf", "eot"],
+    "stylesheet": ["css"],
+    "media": ["mp4", "webm", "ogg", "mp3", "wav", "m4a", "mov", "m3u8"],
+}
+
+# Third-party hosts that never carry contact data, grouped by category.
+HOST_CATEGORIES: Dict[str, List[str]] = {
+    "analytics": [
+        "google-analytics.com", "googletagmanager.com", "analytics.google.com", "hotjar.com",
+        "segment.io", "segment.com", "mixpanel.com", "clarity.ms", "amplitude.com",
+        "fullstory.com", "newrelic.com", "nr-data.net", "mouseflow.com", "heap.io",
+    ],
+    "ads": [
+        "doubleclick.net", "googlesyndication.com", "googleadservices.com", "adservice.google.com",
+        "connect.facebook.net", "ads-twitter.com", "ads.linkedin.com", "snap.licdn.com",
+        "bat.bing.com", "criteo.com", "taboola.com", "outbrain.com", "adnxs.com",
+    ],
+    "chat": [
+        "intercom.io", "intercomcdn.com", "widget.intercom.io", "drift.com", "driftt.com",
+        "zdassets.com", "zopim.com", "tawk.to", "crisp.chat", "livechatinc.com",
+        "tidio.co", "jivosite.com", "olark.com",
+    ],
+    "video": [
+        "youtube.com", "youtube-nocookie.com", "ytimg.com", "googlevideo.com",
+        "vimeo.com", "vimeocdn.com", "wistia.com", "wistia.net", "jwplayer.com",
+    ],
+}
+
+BLOCKED_BY_CLIENT = "net::ERR_BLOCKED_BY_CLIENT"
+
+class PageRequestStats:
+    """
+    Per-page counts of allowed vs blocked requests.
+
+    Blocked requests are counted from 'requestfailed' notifications, which are
+    one-way events and never hold a request up. Allowed requests are read from
+    the page's own Performance API when the counts are collected.
+    """
+
+    def __init__(self, page: "Page"):
+        self.page = page
+        self.blocked = 0
+        page.on("requestfailed", self._on_request_failed)
+
+    def _on_request_failed(self, request):
+        if request.failure == BLOCKED_BY_CLIENT:
+            self.blocked += 1
+
+    async def collect(self) -> Tuple[int, int]:
+        """Returns (allowed, blocked) for the current document and resets the blocked count."""
+        try:
+            allowed = await self.page.evaluate(
+                "() => performance.getEntriesByType('resource').length + 1"
+            )
+        except Exception:
+            allowed = 0
+        blocked, self.blocked = self.blocked, 0
+        return allowed, blocked
+
+class RequestPolicy:
+    """
+    Request-blocking policy enforced inside Chromium via the DevTools
+    `Network.setBlockedURLs` blocklist, so no request waits on a Python handler.
+    """
+
+    def __init__(
+        self,
+        resource_types: Optional[List[str]] = None,
+        host_categories: Optional[List[str]] = None,
+        extra_hosts: Optional[List[str]] = None,
+    ):
+        self.resource_types = resource_types if resource_types is not None else settings.BLOCKED_RESOURCE_TYPES
+        self.host_categories = host_categories if host_categories is not None else settings.BLOCKED_HOST_CATEGORIES
+        self.extra_hosts = extra_hosts if extra_hosts is not None else settings.BLOCKED_HOSTS
+
+    def blocked_hosts(self, exclude_domain: Optional[str] = None) -> List[str]:
+        hosts = []
+        for category in self.host_categories:
+            if category not in HOST_CATEGORIES:
+                logger.warning(f"Unknown blocked host category '{category}'")
+                continue
+            hosts.extend(HOST_CATEGORIES[category])
+        hosts.extend(self.extra_hosts)
+
+        # Never block the site being scraped (e.g. when scraping vimeo.com itself)
+        if exclude_domain:
+            hosts = [h for h in hosts if not (h == exclude_domain or h.endswith(f".{exclude_domain}")
+                                               or exclude_domain.endswith(f".{h}"))]
+        return sorted(set(hosts))
+
+    def url_patterns(self, exclude_domain: Optional[str] = None) -> List[str]:
+        """Builds the Chromium blocklist patterns for this policy."""
+        patterns = []
+        for resource_type in self.resource_types:
+            for ext in RESOURCE_TYPE_PATTERNS.get(resource_type, []):
+                patterns.extend([f"*.{ext}", f"*.{ext}?*"])
+        for host in self.blocked_hosts(exclude_domain):
+            patterns.extend([f"*://{host}/*", f"*://*.{host}/*"])
+        return patterns
+
+    def launch_args(self) -> List[str]:
+        """Chromium flags that complement the blocklist (images without extensions)."""
+        return ["--blink-settings=imagesEnabled=false"] if "image" in self.resource_types else []
+
+    async def apply(self, page: "Page", exclude_domain: Optional[str] = None) -> PageRequestStats:
+        """
+        Installs the blocklist on a page and starts counting its requests.
+
+        Args:
+            page (Page): A Chromium page.
+            exclude_domain (str | None): The domain being scraped, never blocked.
+
+        Returns:
+            PageRequestStats: Counters for the page's requests.
+        """
+        cdp = await page.context.new_cdp_session(page)
+        await cdp.send("Network.enable")
+        await cdp.send("Network.setBlockedURLs", {"urls": self.url_patterns(exclude_domain)})
+        return PageRequestStats(page)
+
+request_policy = RequestPolicy()
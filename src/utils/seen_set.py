@@ -0,0 +1,220 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+def _digest(key: str) -> bytes:
+    return hashlib.blake2b(key.lower().encode("utf-8"), digest_size=16).digest()
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over 16-byte digests. Sized for `capacity` items at
+    `error_rate` false positives; it never grows, so its memory is flat however
+    many items are added (only the false-positive rate rises past capacity).
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2)) # Bits
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest: bytes):
+        # Double hashing: two 64-bit halves of the digest give every probe position
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, digest: bytes):
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+class SeenSet:
+    """
+    Disk-backed set of addresses, for deduplicating leads across domains and
+    runs without holding every address in memory.
+
+    Addresses are stored as 16-byte digests in a SQLite table. A Bloom filter
+    in front answers most lookups for new addresses without touching disk; its
+    hits are confirmed against the table, so answers are exact. Memory stays
+    at the filter's size (about 1.2 bytes per address of SEEN_SET_CAPACITY at
+    a 1% error rate) plus one small write batch. The filter is saved next to
+    the database on flush, and rebuilt from the table if it is missing or stale.
+
+    Meant for one process at a time: another process's additions aren't in
+    this process's filter.
+    """
+
+    def __init__(self, namespace: str = "default", path: Optional[str] = None,
+                 capacity: Optional[int] = None, error_rate: Optional[float] = None):
+        self.namespace = namespace
+        self.path = str(path or Path(settings.CACHE_DIR) / "seen.sqlite3")
+        self.capacity = capacity or settings.SEEN_SET_CAPACITY
+        self.error_rate = error_rate or settings.SEEN_SET_ERROR_RATE
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._bloom: Optional[BloomFilter] = None
+        self._pending: Set[bytes] = set()
+        self._count = 0
+        self._warned_full = False
+        self.confirmations = 0 # Filter hits that needed a disk lookup
+
+    @property
+    def _bloom_path(self) -> str:
+        return f"{self.path}.{self.namespace}.bloom"
+
+    def _open(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS seen (namespace TEXT NOT NULL, key BLOB NOT NULL, "
+                "PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+            )
+            self._conn.commit()
+            (self._count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM seen WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+            self._bloom = self._load_bloom() or self._rebuild_bloom()
+        return self._conn
+
+    def _load_bloom(self) -> Optional[BloomFilter]:
+        try:
+            with open(self._bloom_path, "rb") as f:
+                header = json.loads(f.readline())
+                bloom = BloomFilter(self.capacity, self.error_rate)
+                if (header["count"], header["size"], header["hashes"]) != (self._count, bloom.size, bloom.hashes):
+                    return None # Written by a different run or sizing
+                f.readinto(bloom.bits)
+                return bloom
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _rebuild_bloom(self) -> BloomFilter:
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        if self._count:
+            logger.info(f"Rebuilding seen-set filter '{self.namespace}' from {self._count} stored addresses")
+            cursor = self._conn.execute("SELECT key FROM seen WHERE namespace = ?", (self.namespace,))
+            while True:
+                rows = cursor.fetchmany(10000)
+                if not rows:
+                    break
+                for (key,) in rows:
+                    bloom.add(key)
+        return bloom
+
+    def _stored(self, conn: sqlite3.Connection, digests: List[bytes]) -> Set[bytes]:
+        """Which digests are already written; only filter hits can be, so only those are looked up."""
+        maybe = [d for d in digests if d in self._bloom and d not in self._pending]
+        stored = set()
+        if maybe:
+            self.confirmations += len(maybe)
+            for start in range(0, len(maybe), 500):
+                chunk = maybe[start:start + 500]
+                stored.update(row[0] for row in conn.execute(
+                    f"SELECT key FROM seen WHERE namespace = ? AND key IN ({','.join('?' * len(chunk))})",
+                    (self.namespace, *chunk)
+                ))
+        return stored
+
+    def contains_many(self, addresses: Iterable[str]) -> List[bool]:
+        """For each address, whether it was added before (without adding it)."""
+        digests = [_digest(address) for address in addresses]
+        with self._lock:
+            stored = self._stored(self._open(), digests)
+            return [digest in stored or digest in self._pending for digest in digests]
+
+    def add_many(self, addresses: Iterable[str]) -> List[bool]:
+        """
+        Adds addresses, returning for each whether it was new (not seen in this
+        or an earlier run, nor earlier in the same call).
+        """
+        digests = [_digest(address) for address in addresses]
+        with self._lock:
+            conn = self._open()
+            stored = self._stored(conn, digests)
+            new = []
+            for digest in digests:
+                is_new = digest not in stored and digest not in self._pending
+                if is_new:
+                    self._pending.add(digest)
+                    self._bloom.add(digest)
+                new.append(is_new)
+            if len(self._pending) >= settings.SEEN_SET_BATCH_SIZE:
+                self._write_pending(conn)
+        return new
+
+    def add(self, address: str) -> bool:
+        """Adds one address; True if it hadn't been seen before."""
+        return self.add_many([address])[0]
+
+    def __contains__(self, address: str) -> bool:
+        digest = _digest(address)
+        with self._lock:
+            conn = self._open()
+            if digest not in self._bloom:
+                return False
+            if digest in self._pending:
+                return True
+            self.confirmations += 1
+            return conn.execute(
+                "SELECT 1 FROM seen WHERE namespace = ? AND key = ?", (self.namespace, digest)
+            ).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._open()
+            return self._count + len(self._pending)
+
+    def _write_pending(self, conn: sqlite3.Connection):
+        if not self._pending:
+            return
+        conn.executemany(
+            "INSERT OR IGNORE INTO seen (namespace, key) VALUES (?, ?)",
+            ((self.namespace, digest) for digest in self._pending)
+        )
+        conn.commit()
+        self._count += len(self._pending)
+        self._pending.clear()
+        if self._count > self.capacity and not self._warned_full:
+            self._warned_full = True
+            logger.warning(
+                f"Seen-set '{self.namespace}' holds {self._count} addresses, over its capacity of {self.capacity}; "
+                f"raise SEEN_SET_CAPACITY to keep lookups off disk"
+            )
+
+    def flush(self):
+        """Writes pending addresses and saves the filter."""
+        with self._lock:
+            if self._conn is None:
+                return
+            self._write_pending(self._conn)
+            tmp_path = f"{self._bloom_path}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    header = {"count": self._count, "size": self._bloom.size, "hashes": self._bloom.hashes}
+                    f.write(json.dumps(header).encode("utf-8") + b"\n")
+                    f.write(self._bloom.bits)
+                os.replace(tmp_path, self._bloom_path)
+            except OSError as e:
+                logger.warning(f"Could not save seen-set filter '{self.namespace}': {e}")
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self._bloom = None
@@ -0,0 +1,224 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+class Task:
+    """A claimed domain task; valid while its lease is kept alive with heartbeats."""
+
+    def __init__(self, id: int, domain: str, payload: dict, attempts: int, worker: str, lease_id: str):
+        self.id = id
+        self.domain = domain
+        self.payload = payload
+        self.attempts = attempts
+        self.worker = worker
+        self.lease_id = lease_id # Unique per claim, so a stale holder can't touch a reclaimed task
+
+    def __repr__(self) -> str:
+        return f"Task({self.id}, {self.domain!r}, attempt {self.attempts})"
+
+class WorkQueue:
+    """
+    Domain task queue in a SQLite file, shared by any number of worker processes.
+
+    A worker claims a task with a lease (QUEUE_LEASE_SECONDS) and renews it with
+    heartbeats while the pipeline runs. A task whose lease runs out (the worker
+    crashed, hung or lost its host) becomes claimable again, until it has used
+    QUEUE_MAX_ATTEMPTS attempts and is marked failed. Leads are written back
+    into the task row.
+
+    Claims happen inside an IMMEDIATE transaction, so two workers never get the
+    same task. To spread work over several hosts, point QUEUE_PATH at storage
+    every host can lock reliably. The rollback journal is used (not WAL)
+    because WAL needs shared memory on a single host.
+    """
+
+    def __init__(self, name: str = "default", path: Optional[str] = None,
+                 lease_seconds: Optional[float] = None, max_attempts: Optional[int] = None):
+        self.name = name
+        self.path = str(path or settings.QUEUE_PATH or Path(settings.CACHE_DIR) / "queue.sqlite3")
+        self.lease_seconds = lease_seconds or settings.QUEUE_LEASE_SECONDS
+        self.max_attempts = max_attempts or settings.QUEUE_MAX_ATTEMPTS
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Autocommit mode: transactions are opened explicitly where needed
+            self._conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False, isolation_level=None)
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    queue TEXT NOT NULL,
+                    domain TEXT NOT NULL,
+                    payload TEXT NOT NULL DEFAULT '{}',
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    lease_id TEXT,
+                    lease_expires REAL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    UNIQUE (queue, domain)
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks (queue, status, lease_expires)")
+        return self._conn
+
+    def enqueue(self, domains: Iterable[str], payload: Optional[dict] = None) -> int:
+        """Adds domain tasks, skipping domains already in this queue. Returns how many were added."""
+        now = time.time()
+        rows = [(self.name, domain, json.dumps(payload or {}), now, now) for domain in domains]
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO tasks (queue, domain, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                added = conn.total_changes - before
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def claim(self, worker: str) -> Optional[Task]:
+        """
+        Leases the oldest available task: pending, or leased with an expired lease.
+        Expired tasks that have used up their attempts are marked failed instead.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE tasks SET status = 'failed', error = COALESCE(error, 'Lease expired'), updated_at = ? "
+                    "WHERE queue = ? AND status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                    (now, self.name, now, self.max_attempts)
+                )
+                row = conn.execute(
+                    "SELECT id, domain, payload, attempts FROM tasks WHERE queue = ? AND "
+                    "(status = 'pending' OR (status = 'leased' AND lease_expires < ?)) "
+                    "ORDER BY id LIMIT 1",
+                    (self.name, now)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                task_id, domain, payload, attempts = row
+                lease_id = uuid.uuid4().hex
+                conn.execute(
+                    "UPDATE tasks SET status = 'leased', worker = ?, lease_id = ?, attempts = ?, lease_expires = ?, "
+                    "updated_at = ? WHERE id = ?",
+                    (worker, lease_id, attempts + 1, now + self.lease_seconds, now, task_id)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        if attempts:
+            logger.info(f"Reclaimed {domain} (attempt {attempts + 1}/{self.max_attempts})")
+        return Task(task_id, domain, json.loads(payload), attempts + 1, worker, lease_id)
+
+    def _update_owned(self, task: Task, sql: str, params: tuple) -> bool:
+        """Runs an update only if the worker still holds the task's lease."""
+        with self._lock:
+            cursor = self._connect().execute(
+                f"{sql} WHERE id = ? AND lease_id = ? AND status = 'leased'", params + (task.id, task.lease_id)
+            )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, task: Task) -> bool:
+        """Extends the lease. False means it was lost (expired and reclaimed) and the work should stop."""
+        now = time.time()
+        return self._update_owned(
+            task, "UPDATE tasks SET lease_expires = ?, updated_at = ?", (now + self.lease_seconds, now)
+        )
+
+    def complete(self, task: Task, leads: List[dict]) -> bool:
+        return self._update_owned(
+            task, "UPDATE tasks SET status = 'done', result = ?, error = NULL, lease_expires = NULL, updated_at = ?",
+            (json.dumps(leads), time.time())
+        )
+
+    def fail(self, task: Task, error: str) -> bool:
+        """Releases the task for another attempt, or marks it failed when out of attempts."""
+        status = "failed" if task.attempts >= self.max_attempts else "pending"
+        return self._update_owned(
+            task, "UPDATE tasks SET status = ?, error = ?, lease_expires = NULL, updated_at = ?",
+            (status, error[:1000], time.time())
+        )
+
+    def retry_failed(self) -> int:
+        """Puts failed tasks back in the queue with fresh attempts. Returns how many."""
+        with self._lock:
+            cursor = self._connect().execute(
+                "UPDATE tasks SET status = 'pending', attempts = 0, updated_at = ? WHERE queue = ? AND status = 'failed'",
+                (time.time(), self.name)
+            )
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Number of tasks per status (pending, leased, done, failed)."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT status, COUNT(*) FROM tasks WHERE queue = ? GROUP BY status", (self.name,)
+            ).fetchall()
+        return dict(rows)
+
+    def workers(self) -> Dict[str, int]:
+        """Workers currently holding live leases, with how many tasks each."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT worker, COUNT(*) FROM tasks WHERE queue = ? AND status = 'leased' AND lease_expires >= ? "
+                "GROUP BY worker", (self.name, time.time())
+            ).fetchall()
+        return dict(rows)
+
+    def release(self, task: Task) -> bool:
+        """Hands a task back untouched (worker shutting down); the attempt isn't counted."""
+        return self._update_owned(
+            task, "UPDATE tasks SET status = 'pending', attempts = attempts - 1, lease_expires = NULL, updated_at = ?",
+            (time.time(),)
+        )
+
+    def results(self, page_size: int = 500) -> Iterator[dict]:
+        """Yields the leads of every finished task, a page of tasks at a time."""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._connect().execute(
+                    "SELECT id, result FROM tasks WHERE queue = ? AND status = 'done' AND id > ? ORDER BY id LIMIT ?",
+                    (self.name, last_id, page_size)
+                ).fetchall()
+            if not rows:
+                return
+            for task_id, result in rows:
+                last_id = task_id
+                yield from json.loads(result or "[]")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from src.config.settings import settings
+from src.core.deadline import Deadline
+from src.pipeline import run_lead_pipeline
+from src.utils.work_queue import Task, WorkQueue, default_worker_id
+
+logger = logging.getLogger(__name__)
+
+async def _keep_lease(queue: WorkQueue, task: Task, pipeline: asyncio.Task) -> bool:
+    """Renews the lease while the pipeline runs; cancels it and returns True if the lease is lost."""
+    while not pipeline.done():
+        await asyncio.sleep(settings.QUEUE_HEARTBEAT_INTERVAL)
+        try:
+            alive = await asyncio.to_thread(queue.heartbeat, task)
+        except Exception as e:
+            logger.warning(f"Heartbeat for {task.domain} failed: {e}")
+            continue # Transient (e.g. locked database); the lease has slack
+        if not alive:
+            logger.warning(f"Lost lease on {task.domain}, abandoning it")
+            pipeline.cancel()
+            return True
+    return False
+
+async def process_task(queue: WorkQueue, task: Task) -> str:
+    """
+    Runs the pipeline for one claimed task and writes the leads back.
+
+    Returns:
+        str: 'done', 'failed', or 'lost' (lease expired; another worker owns it now).
+    """
+    logger.info(f"Processing {task.domain} ({task})")
+    pipeline = asyncio.create_task(run_lead_pipeline(
+        task.domain,
+        task.payload.get("name"),
+        deadline=Deadline(settings.QUEUE_TASK_TIMEOUT),
+        refresh=task.payload.get("refresh", False),
+        profile=task.payload.get("profile"),
+        fresh=task.payload.get("fresh", False),
+        raise_errors=True # Failures go to queue.fail, which retries up to QUEUE_MAX_ATTEMPTS
+    ))
+    heartbeat = asyncio.create_task(_keep_lease(queue, task, pipeline))
+    try:
+        leads = await pipeline
+    except asyncio.CancelledError:
+        if heartbeat.done() and not heartbeat.cancelled() and heartbeat.result():
+            return "lost"
+        # Worker shutting down: hand the task back without spending an attempt
+        pipeline.cancel()
+        await asyncio.to_thread(queue.release, task)
+        raise
+    except Exception as e:
+        logger.error(f"Task {task.domain} failed: {e}")
+        await asyncio.to_thread(queue.fail, task, str(e))
+        return "failed"
+    finally:
+        heartbeat.cancel()
+
+    if not await asyncio.to_thread(queue.complete, task, leads):
+        logger.warning(f"Lease on {task.domain} expired before completion, result discarded")
+        return "lost"
+    logger.info(f"Finished {task.domain}: {len(leads)} leads")
+    return "done"
+
+async def run_worker(
+    queue: WorkQueue,
+    worker_id: Optional[str] = None,
+    concurrency: int = 1,
+    exit_when_empty: bool = False
+) -> Dict[str, int]:
+    """
+    Pulls domain tasks from the queue until stopped (or, with `exit_when_empty`,
+    until no task is available), running up to `concurrency` pipelines at once
+    on this process's shared browser.
+
+    Returns:
+        Dict[str, int]: How many tasks ended done, failed or lost.
+    """
+    worker_id = worker_id or default_worker_id()
+    stats = {"done": 0, "failed": 0, "lost": 0}
+    logger.info(f"Worker {worker_id} started on queue '{queue.name}' ({concurrency} slots)")
+
+    async def _slot():
+        while True:
+            task = await asyncio.to_thread(queue.claim, worker_id)
+            if task is None:
+                if exit_when_empty:
+                    return
+                await asyncio.sleep(settings.QUEUE_POLL_INTERVAL)
+                continue
+            outcome = await process_task(queue, task)
+            stats[outcome] += 1
+
+    await asyncio.gather(*(_slot() for _ in range(concurrency)))
+    logger.info(f"Worker {worker_id} stopping: {stats}")
+    return stats
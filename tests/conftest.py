@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Settings are read when src is first imported: point every on-disk cache at a
+# throwaway directory so tests never touch (or depend on) a real .cache.
+os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="leadscraper-tests-")
+os.environ.setdefault("TRACE_ENABLED", "false")
+os.environ.setdefault("PAGE_ARCHIVE_ENABLED", "false")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from src.core.admission import AdmissionController
+from src.core.exceptions import Overloaded
+
+def test_admits_up_to_the_limit_without_waiting():
+    async def run():
+        admission = AdmissionController(max_concurrent=2, max_queue=0, queue_timeout=1)
+        assert await admission.acquire() == 0.0
+        assert await admission.acquire() == 0.0
+        with pytest.raises(Overloaded):
+            await admission.acquire()
+        return admission
+    admission = asyncio.run(run())
+    assert (admission.active, admission.admitted, admission.rejected) == (2, 2, 1)
+
+def test_waiters_are_admitted_in_order_as_slots_free():
+    async def run():
+        admission = AdmissionController(max_concurrent=1, max_queue=5, queue_timeout=5)
+        order = []
+
+        async def job(name):
+            async with admission.slot():
+                order.append(name)
+                await asyncio.sleep(0.01)
+        await asyncio.gather(*(job(name) for name in "abcd"))
+        return admission, order
+    admission, order = asyncio.run(run())
+    assert order == list("abcd")
+    assert admission.active == 0 and admission.queued == 0
+    assert admission.max_wait > 0
+
+def test_queue_wait_times_out_with_retry_after():
+    async def run():
+        admission = AdmissionController(max_concurrent=1, max_queue=5, queue_timeout=0.02)
+        await admission.acquire()
+        with pytest.raises(Overloaded) as rejected:
+            await admission.acquire()
+        return admission, rejected.value
+    admission, error = asyncio.run(run())
+    assert error.retry_after >= 1
+    assert admission.timed_out == 1 and admission.queued == 0
+
+def test_patient_callers_ignore_queue_limit_and_timeout():
+    async def run():
+        admission = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=0.01)
+        await admission.acquire()
+        waiter = asyncio.create_task(admission.acquire(patient=True))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        admission.release(0.05)
+        return await waiter, admission
+    waited, admission = asyncio.run(run())
+    assert waited >= 0.04
+    assert admission.active == 1
+
+def test_cancelled_waiter_does_not_leak_its_slot():
+    async def run():
+        admission = AdmissionController(max_concurrent=1, max_queue=5, queue_timeout=5)
+        await admission.acquire()
+
+        async def job():
+            async with admission.slot():
+                pass
+        gone, stays = asyncio.create_task(job()), asyncio.create_task(job())
+        await asyncio.sleep(0)
+        admission.release(0.1) # Hands the slot to `gone`...
+        gone.cancel() # ...which is cancelled before it runs and must pass it on
+        await asyncio.gather(gone, stays, return_exceptions=True)
+        return admission, stays
+    admission, stays = asyncio.run(run())
+    assert stays.done() and not stays.cancelled()
+    assert admission.active == 0 and admission.queued == 0
+
+def test_retry_after_grows_with_queue_depth():
+    admission = AdmissionController(max_concurrent=2, max_queue=10, queue_timeout=1)
+    admission.release(10.0) # Records a 10s service time
+    admission.active = 2
+    shallow = admission.retry_after()
+    admission._waiters.extend([None] * 4)
+    assert admission.retry_after() > shallow
@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import Response
+
+import src.api
+from src.api import BatchScrapeRequest, ScrapeRequest, _run_scrape, _stream_batch
+from src.config.settings import settings
+from src.modules.discovery.preflight import DomainTriage
+
+@pytest.fixture
+def pipeline_calls(monkeypatch):
+    calls = []
+
+    async def run_lead_pipeline(domain, **kwargs):
+        calls.append(domain)
+        return [{"email": f"info@{domain}"}]
+    monkeypatch.setattr(src.api, "run_lead_pipeline", run_lead_pipeline)
+    return calls
+
+def collect(domains):
+    async def run():
+        return [json.loads(line) async for line in _stream_batch(BatchScrapeRequest(domains=domains))]
+    lines = asyncio.run(run())
+    results = {line["domain"]: line for line in lines if line["type"] == "result"}
+    return results, lines[-1]
+
+def test_variants_run_once_and_echo_their_inputs(pipeline_calls, monkeypatch):
+    monkeypatch.setattr(settings, "PREFLIGHT_ENABLED", False)
+    results, summary = collect(["Acme.com", "https://www.acme.com/about", "not a domain", "beta.io"])
+
+    assert sorted(pipeline_calls) == ["acme.com", "beta.io"]
+    assert results["acme.com"]["inputs"] == ["Acme.com", "https://www.acme.com/about"]
+    assert results["acme.com"]["status"] == "ok"
+    assert results["beta.io"]["inputs"] == ["beta.io"]
+    assert results["not a domain"]["status"] == "invalid"
+    assert summary["by_status"] == {"invalid": 1, "ok": 2}
+
+def test_preflight_disabled_skips_triage(pipeline_calls, monkeypatch):
+    async def triage_domains(domains, **kwargs):
+        raise AssertionError("triage should not run")
+    monkeypatch.setattr(src.api, "triage_domains", triage_domains)
+    monkeypatch.setattr(settings, "PREFLIGHT_ENABLED", False)
+
+    results, _ = collect(["acme.com"])
+    assert results["acme.com"]["status"] == "ok"
+
+def test_preflight_skips_dead_domains(pipeline_calls, monkeypatch):
+    async def triage_domains(domains, **kwargs):
+        return [DomainTriage(d, "dead" if d == "dead.com" else "ok") for d in domains]
+    monkeypatch.setattr(src.api, "triage_domains", triage_domains)
+    monkeypatch.setattr(settings, "PREFLIGHT_ENABLED", True)
+
+    results, _ = collect(["www.dead.com", "acme.com"])
+    assert pipeline_calls == ["acme.com"]
+    assert results["dead.com"]["status"] == "skipped"
+    assert results["dead.com"]["inputs"] == ["www.dead.com"]
+
+class FakeConnection:
+    def __init__(self, disconnected=False):
+        self.disconnected = disconnected
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+@pytest.fixture
+def hanging_pipeline(monkeypatch):
+    async def run_lead_pipeline(domain, *args, **kwargs):
+        await asyncio.sleep(60)
+    monkeypatch.setattr(src.api, "run_lead_pipeline", run_lead_pipeline)
+    monkeypatch.setattr(settings, "DISCONNECT_POLL_INTERVAL", 0.01)
+
+def test_client_disconnect_returns_499(hanging_pipeline):
+    request = ScrapeRequest(domain="acme.com", timeout=5)
+    response = asyncio.run(_run_scrape(request, FakeConnection(disconnected=True), Response(), None))
+    assert response.status_code == 499
+
+def test_cancelled_handler_propagates_cancellation(hanging_pipeline):
+    async def run():
+        request = ScrapeRequest(domain="acme.com", timeout=5)
+        handler = asyncio.create_task(_run_scrape(request, FakeConnection(), Response(), None))
+        await asyncio.sleep(0.05)
+        handler.cancel() # e.g. server shutdown, with the client still connected
+        with pytest.raises(asyncio.CancelledError):
+            await handler
+    asyncio.run(run())
@@ -0,0 +1,100 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+import src.modules.discovery.page_state
+import src.modules.discovery.scraper as scraper
+from src.core.deadline import Deadline
+from src.modules.discovery.page_state import content_hash, fetch_if_changed, record_page
+from src.utils.cache import PersistentCache
+
+class FakeResponse:
+    def __init__(self, status, body=b"", headers=None):
+        self.status = status
+        self.ok = 200 <= status < 300
+        self.headers = headers or {}
+        self._body = body
+
+    async def body(self):
+        return self._body
+
+    async def dispose(self):
+        pass
+
+class FakeLease:
+    """Answers conditional GETs from `pages` (url -> FakeResponse); navigations are recorded."""
+
+    def __init__(self, pages):
+        self.sent, self.navigated = [], []
+        self.page, self.request_stats = None, None
+
+        async def get(url, headers=None, timeout=None):
+            self.sent.append((url, headers))
+            return pages[url]
+        self.context = type("Context", (), {})()
+        self.context.request = type("Request", (), {"get": staticmethod(get)})()
+
+    async def goto(self, url, **kwargs):
+        self.navigated.append(url)
+        return None # Counts as a failed load
+
+@pytest.fixture(autouse=True)
+def page_state(tmp_path, monkeypatch):
+    state = PersistentCache("page_state", ttl=3600, path=str(tmp_path / "page_state.sqlite3"))
+    monkeypatch.setattr(src.modules.discovery.page_state, "page_state", state)
+    yield state
+    state.close()
+
+def check(lease, url):
+    return asyncio.run(fetch_if_changed(lease, url, Deadline()))
+
+def test_unseen_page_is_not_requested():
+    lease = FakeLease({})
+    assert check(lease, "https://a.com/") is None
+    assert lease.sent == []
+
+def test_not_modified_returns_stored_emails_and_sends_validators():
+    record_page("https://a.com/", {"etag": '"v1"'}, b"<html>", {"info@a.com": "mailto"})
+    lease = FakeLease({"https://a.com/": FakeResponse(304)})
+    revisit = check(lease, "https://a.com/")
+    assert revisit.unchanged and revisit.emails == {"info@a.com": "mailto"}
+    assert lease.sent == [("https://a.com/", {"If-None-Match": '"v1"'})]
+
+def test_same_body_counts_as_unchanged():
+    record_page("https://a.com/", {}, b"<html>", {"info@a.com": "page"})
+    revisit = check(FakeLease({"https://a.com/": FakeResponse(200, b"<html>")}), "https://a.com/")
+    assert revisit.emails == {"info@a.com": "page"}
+
+def test_changed_page_hands_back_its_body():
+    record_page("https://a.com/", {}, b"<html>", {})
+    revisit = check(FakeLease({"https://a.com/": FakeResponse(200, b"<html>new")}), "https://a.com/")
+    assert not revisit.unchanged
+    assert revisit.body == b"<html>new"
+
+def run_refresh(lease, pages, monkeypatch):
+    @asynccontextmanager
+    async def leased(**kwargs):
+        yield lease
+    supervisor = type("Supervisor", (), {"lease": staticmethod(leased)})()
+    monkeypatch.setattr(scraper, "get_browser_supervisor", lambda headless: supervisor)
+    return asyncio.run(scraper.DomainScraper().scrape_domain_tagged("a.com", max_pages=pages, refresh=True))
+
+def test_refresh_extracts_changed_pages_without_rendering_them(page_state, monkeypatch):
+    record_page("https://a.com/", {}, b"old", {"old@a.com": "page"})
+    record_page("https://a.com/contact", {}, b"same", {"sales@a.com": "mailto"})
+    lease = FakeLease({
+        "https://a.com/": FakeResponse(200, b'<a href="mailto:new@a.com">mail</a>'),
+        "https://a.com/contact": FakeResponse(200, b"same"),
+    })
+    emails = run_refresh(lease, 2, monkeypatch)
+
+    assert emails == {"new@a.com": "mailto", "sales@a.com": "mailto"}
+    assert lease.navigated == []
+    assert page_state.get("https://a.com/")["hash"] == content_hash(b'<a href="mailto:new@a.com">mail</a>')
+
+def test_refresh_renders_changed_pages_without_emails_in_their_html(monkeypatch):
+    record_page("https://a.com/", {}, b"old", {"old@a.com": "page"})
+    lease = FakeLease({"https://a.com/": FakeResponse(200, b"<div id=app></div>")})
+    run_refresh(lease, 1, monkeypatch)
+    assert lease.navigated[0] == "https://a.com/"
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+import src.pipeline
+from src.config.profiles import PipelineProfile
+from src.modules.discovery.sources import SourceReport
+from src.modules.verification.verdicts import VerdictStore
+from src.pipeline import run_lead_pipeline
+from src.utils.cache import PersistentCache
+from src.utils.seen_set import SeenSet
+
+def report(name, status="ok", latency=0.5, emails=None):
+    result = SourceReport(name)
+    result.status, result.latency, result.emails = status, latency, emails or {}
+    return result
+
+@pytest.fixture
+def discovery(monkeypatch):
+    """Makes discovery return whatever reports the test puts in the list."""
+    reports = []
+
+    async def run_discovery(domain, *args, **kwargs):
+        return reports
+    monkeypatch.setattr(src.pipeline, "run_discovery", run_discovery)
+    return reports
+
+@pytest.fixture
+def probes(tmp_path, monkeypatch):
+    """Fakes the MX/SMTP checks (every address is valid) and records which addresses were probed."""
+    probed = []
+
+    store = VerdictStore()
+    store._cache = PersistentCache("verdicts", ttl=3600, path=str(tmp_path / "verdicts.sqlite3"))
+    monkeypatch.setattr(src.pipeline, "verdict_store", store)
+
+    async def check_lead(lead_data, deadline, fresh):
+        probed.append(lead_data["email"])
+        lead_data["status"] = "valid"
+        lead_data["verification"].update(mx=True, smtp="valid")
+        store.record_smtp(lead_data["email"], "valid") # As verify_email_smtp does
+    monkeypatch.setattr(src.pipeline, "_check_lead", check_lead)
+    return probed
+
+def run(domain, verify_budget=10, **kwargs):
+    profile = PipelineProfile(
+        "test", sources=[], max_pages=1, max_queries=0, max_aliases=0, verify_budget=verify_budget,
+        time_budget=None, discovery_time=None
+    )
+    return asyncio.run(run_lead_pipeline(domain, preflight=False, profile=profile, **kwargs))
+
+def test_source_reports_are_handed_back(discovery):
+    discovery.extend([report("scraper", latency=1.234), report("google", status="timeout", latency=8.0)])
+    source_reports = []
+    asyncio.run(run_lead_pipeline("acme.com", preflight=False, source_reports=source_reports))
+    assert source_reports == [
+        {"source": "scraper", "status": "ok", "yield": 0, "latency": 1.234, "error": None},
+        {"source": "google", "status": "timeout", "yield": 0, "latency": 8.0, "error": None},
+    ]
+
+def test_seen_addresses_are_dropped_and_unverified_ones_stay_eligible(discovery, probes, tmp_path):
+    seen = SeenSet("run", path=str(tmp_path / "seen.sqlite3"), capacity=1000)
+    discovery.append(report("scraper", emails={"info@acme.com": "mailto", "sales@acme.com": "mailto"}))
+    first = {lead["email"]: lead["status"] for lead in run("acme.com", verify_budget=1, seen=seen)}
+    assert sorted(first.values()) == ["unverified", "valid"]
+    (probed,) = probes
+    (skipped,) = [email for email, status in first.items() if status == "unverified"]
+
+    probes.clear()
+    second = run("acme.com", seen=seen)
+    assert [lead["email"] for lead in second] == [skipped] # The verified one was dropped as seen
+    assert probes == [skipped]
+    assert seen.contains_many([probed, skipped]) == [True, True]
+    seen.close()
+
+def test_fresh_verdicts_are_reused_unless_forced(discovery, probes):
+    discovery.append(report("scraper", emails={"info@acme.com": "mailto"}))
+    assert run("acme.com")[0]["status"] == "valid"
+    assert probes == ["info@acme.com"]
+
+    probes.clear()
+    (lead,) = run("acme.com")
+    assert lead["status"] == "valid" and lead["verification"]["smtp"] == "valid"
+    assert probes == []
+
+    run("acme.com", fresh=True)
+    assert probes == ["info@acme.com"]
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+import src.modules.discovery.preflight as preflight
+from src.modules.discovery.preflight import normalize_domain, normalize_domains, triage_domain, triage_domains
+from src.utils.cache import PersistentCache
+
+@pytest.mark.parametrize("raw, expected", [
+    ("example.com", "example.com"),
+    ("https://www.Example.com/contact?x=1", "example.com"),
+    ("  shop.example.com.  ", "example.com"),
+    ("blog.empresa.com.br", "empresa.com.br"),
+    ("user@mail.example.co.uk", "example.co.uk"),
+    ("http://example.com:8080", "example.com"),
+    ("bücher.de", "xn--bcher-kva.de"),
+])
+def test_normalize_domain(raw, expected):
+    assert normalize_domain(raw) == expected
+
+@pytest.mark.parametrize("raw", ["", "   ", "# comment", "localhost", "not a domain", "a..com"])
+def test_normalize_domain_rejects_unusable_input(raw):
+    assert normalize_domain(raw) is None
+
+def test_normalize_domains_dedupes_in_first_seen_order():
+    assert normalize_domains(["b.com", "www.a.com", "B.com", "bad input", "https://a.com/x"]) == ["b.com", "a.com"]
+
+@pytest.fixture
+def dns(tmp_path, monkeypatch):
+    """Answers lookups from a dict: domain -> {rdtype: True/False/None}; unlisted records are absent."""
+    records, lookups = {}, []
+
+    async def resolve(resolver, domain, rdtype):
+        lookups.append((domain, rdtype))
+        return records.get(domain, {}).get(rdtype, False)
+    monkeypatch.setattr(preflight, "_resolve", resolve)
+    cache = PersistentCache("preflight_negative", ttl=3600, path=str(tmp_path / "negative.sqlite3"))
+    monkeypatch.setattr(preflight, "negative_cache", cache)
+    yield records, lookups
+    cache.close()
+
+@pytest.mark.parametrize("answers, status", [
+    ({"A": True, "MX": True}, "ok"),
+    ({"MX": True}, "ok"),
+    ({"A": True}, "no_mail"),
+    ({}, "dead"),
+    ({"A": True, "MX": None}, "unknown"),
+])
+def test_triage_classifies_dns_answers(dns, answers, status):
+    records, _ = dns
+    records["acme.com"] = answers
+    verdict = asyncio.run(triage_domain("acme.com"))
+    assert verdict.status == status
+    assert verdict.runnable == (status in ("ok", "unknown"))
+
+def test_negative_verdicts_are_cached(dns):
+    records, lookups = dns
+    records["gone.com"] = {}
+    asyncio.run(triage_domain("gone.com"))
+    lookups.clear()
+    verdict = asyncio.run(triage_domain("gone.com"))
+    assert verdict.status == "dead" and verdict.cached
+    assert lookups == []
+    assert not asyncio.run(triage_domain("gone.com", use_cache=False)).cached
+
+def test_triage_domains_normalizes_and_dedupes(dns):
+    records, _ = dns
+    records["acme.com"] = {"MX": True}
+    verdicts = asyncio.run(triage_domains(["www.acme.com", "https://acme.com/", "gone.com", "??"]))
+    assert [(v.domain, v.status) for v in verdicts] == [("acme.com", "ok"), ("gone.com", "dead")]
@@ -0,0 +1,48 @@
+from src.core.records import LeadRecord, LeadStatus, SmtpResult
+from src.modules.enrichment.normalize import CandidatePool
+from src.modules.export.exporter import flatten_lead_data
+from src.pipeline import new_lead
+
+def pipeline_lead(*spellings, **sources):
+    pool = CandidatePool()
+    for spelling in spellings:
+        for source, kind in sources.items():
+            pool.add(spelling, source, kind)
+    (candidate,) = list(pool)
+    lead = new_lead(candidate, "acme.com")
+    lead["status"] = "valid"
+    lead["verification"] = {"syntax": True, "mx": True, "smtp": "valid"}
+    return lead
+
+def test_round_trip_keeps_every_field():
+    lead = pipeline_lead("Info@Acme.com", "info@acme.com", scraper="mailto", google="dork")
+    assert LeadRecord.from_dict(lead).to_dict() == lead
+
+def test_round_trip_single_spelling_and_name():
+    lead = pipeline_lead("ana@acme.com", patterns="pattern")
+    lead["name"] = "Ana Lima"
+    record = LeadRecord.from_dict(lead)
+    assert record.originals == () # Not stored when it's just the address
+    assert record.to_dict() == lead
+
+def test_round_trip_whole_second_timestamp():
+    lead = pipeline_lead("ana@acme.com", patterns="pattern")
+    lead["found_at"] = "2026-01-01T12:00:00"
+    assert LeadRecord.from_dict(lead).to_dict()["found_at"] == "2026-01-01T12:00:00"
+
+def test_unknown_labels_fall_back_instead_of_raising():
+    lead = pipeline_lead("ana@acme.com", patterns="pattern")
+    lead["status"] = "greylisted"
+    lead["verification"]["smtp"] = "weird"
+    record = LeadRecord.from_dict(lead)
+    assert record.status == LeadStatus.UNVERIFIED
+    assert record.smtp == SmtpResult.UNKNOWN
+
+def test_rows_match_between_records_and_dicts():
+    lead = pipeline_lead("Info@Acme.com", scraper="mailto", google="dork")
+    (row,) = flatten_lead_data([LeadRecord.from_dict(lead)])
+    assert row["email"] == "info@acme.com"
+    assert row["status"] == "valid"
+    assert row["valid_smtp"] == "valid"
+    assert row["sources"] == "google,scraper"
+    assert row["found_at"].startswith(lead["found_at"][:19])
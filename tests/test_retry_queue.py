@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+from src.config.settings import settings
+from src.core.deadline import Deadline
+from src.modules.verification.retry import SMTPRetryQueue
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "SMTP_RETRY_BASE_DELAY", 0.05)
+    monkeypatch.setattr(settings, "SMTP_RETRY_BACKOFF", 2.0)
+    monkeypatch.setattr(settings, "SMTP_RETRY_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(settings, "SMTP_RETRY_MAX_WAIT", 5.0)
+
+def make_queue(answers, deadline=None):
+    """A queue whose probes answer from `answers` (email -> list of statuses), with no DNS."""
+    resolved, probes = {}, []
+
+    async def verify(email, deadline):
+        probes.append(email)
+        return answers[email].pop(0)
+
+    queue = SMTPRetryQueue(lambda lead, status: resolved.__setitem__(lead["email"], status), deadline, verify=verify)
+
+    async def mx_for(item):
+        return "mx." + item.email.rsplit("@", 1)[-1]
+    queue._mx_for = mx_for
+    return queue, resolved, probes
+
+def test_retry_resolves_greylisted_address():
+    async def run():
+        queue, resolved, probes = make_queue({"a@x.com": ["valid"]})
+        queue.defer({"email": "a@x.com"})
+        await queue.drain()
+        return queue, resolved, probes
+    queue, resolved, probes = asyncio.run(run())
+    assert resolved == {"a@x.com": "valid"}
+    assert probes == ["a@x.com"]
+    assert (queue.retried, queue.recovered, queue.given_up) == (1, 1, 0)
+
+def test_gives_up_after_max_attempts():
+    async def run():
+        queue, resolved, probes = make_queue({"a@x.com": ["tempfail", "tempfail"]})
+        queue.defer({"email": "a@x.com"})
+        await queue.drain()
+        return queue, resolved, probes
+    queue, resolved, probes = asyncio.run(run())
+    assert resolved == {"a@x.com": "tempfail"}
+    assert len(probes) == 2 # The first attempt happened before defer
+    assert queue.given_up == 1
+
+def test_tempfail_backs_off_every_address_on_the_same_mx():
+    async def run():
+        queue, resolved, probes = make_queue({"a@x.com": ["tempfail", "valid"], "b@x.com": ["valid"]})
+        queue.defer({"email": "a@x.com"})
+        queue.defer({"email": "b@x.com"})
+        start = time.monotonic()
+        await queue.drain()
+        return resolved, time.monotonic() - start
+    resolved, elapsed = asyncio.run(run())
+    assert resolved == {"a@x.com": "valid", "b@x.com": "valid"}
+    assert elapsed >= 0.05 + 0.05 # b waited out the MX backoff caused by a
+
+def test_drain_does_not_wait_for_retries_due_after_the_wait(monkeypatch):
+    monkeypatch.setattr(settings, "SMTP_RETRY_BASE_DELAY", 60.0)
+    monkeypatch.setattr(settings, "SMTP_RETRY_MAX_WAIT", 30.0)
+
+    async def run():
+        queue, resolved, probes = make_queue({"a@x.com": ["valid"]})
+        queue.defer({"email": "a@x.com"})
+        start = time.monotonic()
+        await queue.drain()
+        return resolved, probes, time.monotonic() - start
+    resolved, probes, elapsed = asyncio.run(run())
+    assert resolved == {"a@x.com": "tempfail"}
+    assert probes == []
+    assert elapsed < 1
+
+def test_drain_stops_at_max_wait():
+    async def run():
+        queue, resolved, _ = make_queue({"a@x.com": ["tempfail"] * 5}, deadline=Deadline())
+        queue.defer({"email": "a@x.com"})
+        start = time.monotonic()
+        await queue.drain(max_wait=0.08)
+        return resolved, time.monotonic() - start
+    resolved, elapsed = asyncio.run(run())
+    assert resolved == {"a@x.com": "tempfail"}
+    assert elapsed < 0.5
@@ -0,0 +1,57 @@
+import pytest
+
+from src.utils.seen_set import SeenSet
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "seen.sqlite3")
+
+def test_add_reports_new_addresses_case_insensitively(path):
+    seen = SeenSet("run", path=path, capacity=1000)
+    assert seen.add_many(["a@x.com", "b@x.com", "A@X.com"]) == [True, True, False]
+    assert seen.add("b@x.com") is False
+    assert "a@x.com" in seen and "c@x.com" not in seen
+    assert len(seen) == 2
+    seen.close()
+
+def test_contains_many_does_not_add(path):
+    seen = SeenSet("run", path=path, capacity=1000)
+    seen.add("a@x.com")
+    assert seen.contains_many(["a@x.com", "b@x.com"]) == [True, False]
+    assert seen.contains_many(["b@x.com"]) == [False]
+    assert len(seen) == 1
+    seen.close()
+
+def test_persists_across_instances_and_keeps_namespaces_apart(path):
+    seen = SeenSet("campaign", path=path, capacity=1000)
+    seen.add_many(["a@x.com", "b@x.com"])
+    seen.close()
+
+    again = SeenSet("campaign", path=path, capacity=1000)
+    assert again.contains_many(["a@x.com", "b@x.com", "c@x.com"]) == [True, True, False]
+    other = SeenSet("other", path=path, capacity=1000)
+    assert "a@x.com" not in other
+    again.close()
+    other.close()
+
+def test_stale_filter_is_rebuilt_from_the_table(path):
+    seen = SeenSet("run", path=path, capacity=1000)
+    seen.add("a@x.com")
+    seen.close()
+    with open(f"{path}.run.bloom", "wb") as f:
+        f.write(b'{"count": 99, "size": 1, "hashes": 1}\n') # Left behind by another run
+
+    again = SeenSet("run", path=path, capacity=1000)
+    assert "a@x.com" in again
+    assert again.add("a@x.com") is False
+    again.close()
+
+def test_answers_stay_exact_past_capacity(path):
+    seen = SeenSet("run", path=path, capacity=10, error_rate=0.5)
+    added = [f"user{i}@x.com" for i in range(500)]
+    seen.add_many(added)
+    seen.flush()
+    assert seen.contains_many(added) == [True] * 500
+    assert not any(seen.contains_many([f"other{i}@x.com" for i in range(500)]))
+    assert seen.confirmations > 0 # The overfull filter sent lookups to disk
+    seen.close()
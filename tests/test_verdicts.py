@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from src.modules.verification.verdicts import VerdictStore
+from src.utils.cache import PersistentCache
+
+@pytest.fixture
+def store(tmp_path):
+    store = VerdictStore()
+    store._cache = PersistentCache("verdicts", ttl=3600, path=str(tmp_path / "verdicts.sqlite3"))
+    yield store
+    store._cache.close()
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A controllable time.time; advance it with clock[0] += seconds."""
+    now = [time.time()]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+VALID = {"syntax": True, "mx": True, "smtp": "valid"}
+
+def test_verdict_is_reused_until_its_status_ttl(store, clock):
+    store.record("Ana@Acme.com", "valid", VALID)
+    clock[0] += 29 * 24 * 3600
+    assert store.get("ana@acme.com")["status"] == "valid"
+    clock[0] += 2 * 24 * 3600
+    assert store.get("ana@acme.com") is None
+
+def test_inconclusive_verdicts_expire_sooner(store, clock):
+    store.record("ana@acme.com", "risky", {"syntax": True, "mx": True, "smtp": "unknown"})
+    store.record("bob@acme.com", "catch_all", {"syntax": True, "mx": True, "smtp": "catch_all"})
+    clock[0] += 2 * 24 * 3600
+    assert store.get("ana@acme.com") is None
+    assert store.get("bob@acme.com")["status"] == "catch_all"
+
+def test_statuses_without_ttl_are_not_stored(store):
+    store.record("ana@acme.com", "unverified", {"syntax": True, "mx": None, "smtp": "unchecked"})
+    assert store.get("ana@acme.com") is None
+
+def test_tempfail_smtp_results_are_never_reused(store):
+    store.record_smtp("ana@acme.com", "valid")
+    store.record("bob@acme.com", "risky", {"syntax": True, "mx": True, "smtp": "tempfail"})
+    assert store.smtp_result("ana@acme.com") == "valid"
+    assert store.smtp_result("bob@acme.com") is None
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+import src.pipeline
+from src.utils.work_queue import WorkQueue
+from src.worker import run_worker
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue("test", path=str(tmp_path / "queue.sqlite3"), lease_seconds=60, max_attempts=2)
+    yield queue
+    queue.close()
+
+def test_claim_leases_each_task_once(queue):
+    assert queue.enqueue(["a.com", "b.com", "a.com"]) == 2
+    first, second = queue.claim("w1"), queue.claim("w2")
+    assert {first.domain, second.domain} == {"a.com", "b.com"}
+    assert queue.claim("w3") is None
+    assert queue.counts() == {"leased": 2}
+
+def test_complete_stores_leads(queue):
+    queue.enqueue(["a.com"])
+    task = queue.claim("w1")
+    assert queue.complete(task, [{"email": "info@a.com"}])
+    assert list(queue.results()) == [{"email": "info@a.com"}]
+    assert queue.counts() == {"done": 1}
+
+def test_fail_retries_until_out_of_attempts(queue):
+    queue.enqueue(["a.com"])
+    task = queue.claim("w1")
+    assert queue.fail(task, "boom")
+    assert queue.counts() == {"pending": 1}
+    task = queue.claim("w1")
+    assert task.attempts == 2
+    assert queue.fail(task, "boom again")
+    assert queue.counts() == {"failed": 1}
+    assert queue.claim("w1") is None
+    assert queue.retry_failed() == 1
+    assert queue.claim("w1").attempts == 1
+
+def test_expired_lease_is_reclaimed_and_stale_holder_locked_out(tmp_path):
+    queue = WorkQueue("test", path=str(tmp_path / "queue.sqlite3"), lease_seconds=0.01, max_attempts=3)
+    queue.enqueue(["a.com"])
+    stale = queue.claim("w1")
+    asyncio.run(asyncio.sleep(0.05))
+    fresh = queue.claim("w2")
+    assert fresh.domain == "a.com" and fresh.attempts == 2
+    assert not queue.heartbeat(stale)
+    assert not queue.complete(stale, [])
+    queue.close()
+
+def test_release_does_not_spend_an_attempt(queue):
+    queue.enqueue(["a.com"])
+    assert queue.release(queue.claim("w1"))
+    assert queue.claim("w1").attempts == 1
+
+def test_worker_retries_a_failing_pipeline_then_marks_it_failed(queue, monkeypatch):
+    async def broken_triage(domain, **kwargs):
+        raise RuntimeError("resolver exploded")
+    monkeypatch.setattr(src.pipeline, "triage_domain", broken_triage)
+
+    queue.enqueue(["a.com"])
+    stats = asyncio.run(run_worker(queue, "w1", exit_when_empty=True))
+
+    assert stats == {"done": 0, "failed": 2, "lost": 0}
+    assert queue.counts() == {"failed": 1}